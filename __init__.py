@@ -8,16 +8,30 @@ bl_info = {
     "category": "Mesh",
 }
 
-import bpy
-from . import ops, ui, updater
+# bpy yoksa (cli.py / core.py düz Python'dan) yalnızca NumPy çekirdeği yüklenir
+try:
+    import bpy  # noqa: F401
+except ImportError:
+    bpy = None
+
+if bpy is not None:
+    from . import ops, ui
+
+def _use_updater():
+    # Farm / komut satırı (blender -b) oturumlarında UI yok: updater hiç yüklenmez
+    return not bpy.app.background
 
 def register():
     ops.register()
     ui.register()
-    updater.register()
+    if _use_updater():
+        from . import updater
+        updater.register()
 
 def unregister():
-    updater.unregister()
+    if _use_updater():
+        from . import updater
+        updater.unregister()
     ui.unregister()
     ops.unregister()
 
@@ -0,0 +1,459 @@
+"""Headless benchmark for the straighten / propagate pipeline.
+
+Run with Blender in background mode (or any Python that has the ``bpy`` module):
+
+    blender -b --factory-startup --python benchmarks/bench_pipeline.py -- \
+        --sizes 10k,100k,1m --shapes grid,cylinder,islands --out bench.json
+
+    # compare against an older run, exit code 1 on regressions
+    blender -b --python benchmarks/bench_pipeline.py -- --baseline old.json
+
+Synthetic meshes are built with bulk ``foreach_set`` so even 5M vertices
+generate in seconds. Every case times the operator's phases separately
+(topology, loop detection, island labels, spatial index, loop flatten,
+influence / propagation, edit-mesh update) plus end-to-end operator runs
+(cold, and warm = redo-cache hit) and the Object Mode data path.
+
+Memory: one extra cold and one warm pass run under ``tracemalloc`` (NumPy
+buffers are traced; Blender's own mesh/BMesh storage is not) and report the
+pipeline's peak working set and the session-cache size in bytes per vertex.
+``--mem-target`` flags warm runs whose peak exceeds the per-vertex budget.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import bpy
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PKG_NAME = "edge_straighten_pro"
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "5m": 5_000_000}
+SHAPES = ("grid", "cylinder", "islands")
+
+
+# -----------------------------
+# Add-on import
+# -----------------------------
+def _load_addon():
+    """Import the add-on package from this checkout and register it."""
+    if PKG_NAME in sys.modules:
+        pkg = sys.modules[PKG_NAME]
+    else:
+        spec = importlib.util.spec_from_file_location(
+            PKG_NAME, os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR]
+        )
+        pkg = importlib.util.module_from_spec(spec)
+        sys.modules[PKG_NAME] = pkg
+        spec.loader.exec_module(pkg)
+    try:
+        pkg.register()
+    except ValueError:
+        pass  # already registered
+    # register() loads only the thin operators; the pipeline (NumPy, core, ...) is timed directly
+    importlib.import_module(f"{PKG_NAME}.pipeline")
+    return pkg
+
+
+# -----------------------------
+# Synthetic meshes
+# -----------------------------
+def _quad_grid(nx: int, ny: int, wrap_x: bool = False, offset=(0.0, 0.0, 0.0), seed: int = 0):
+    """(co, faces) for an nx * ny quad grid; ``wrap_x`` closes it into a cylinder."""
+    i, j = np.meshgrid(np.arange(nx), np.arange(ny))
+    i, j = i.ravel(), j.ravel()
+    if wrap_x:
+        a = 2.0 * np.pi * i / nx
+        co = np.c_[np.cos(a), np.sin(a), j * (2.0 * np.pi / nx)]
+    else:
+        co = np.c_[i / (nx - 1), j / (ny - 1), np.zeros(len(i))]
+    co += np.random.default_rng(seed).normal(scale=0.25 / max(nx, ny), size=co.shape)
+    co += offset
+
+    cols = nx if wrap_x else nx - 1
+    fi, fj = np.meshgrid(np.arange(cols), np.arange(ny - 1))
+    fi, fj = fi.ravel(), fj.ravel()
+    fi2 = (fi + 1) % nx
+    faces = np.c_[fj * nx + fi, fj * nx + fi2, (fj + 1) * nx + fi2, (fj + 1) * nx + fi]
+    return co, faces
+
+
+def _make_mesh(name: str, co: np.ndarray, faces: np.ndarray) -> bpy.types.Object:
+    me = bpy.data.meshes.new(name)
+    me.vertices.add(len(co))
+    me.vertices.foreach_set("co", co.astype(np.float32).ravel())
+    me.loops.add(faces.size)
+    me.loops.foreach_set("vertex_index", faces.astype(np.int32).ravel())
+    me.polygons.add(len(faces))
+    me.polygons.foreach_set("loop_start", (np.arange(len(faces)) * 4).astype(np.int32))
+    me.polygons.foreach_set("loop_total", np.full(len(faces), 4, dtype=np.int32))
+    me.update(calc_edges=True)
+    obj = bpy.data.objects.new(name, me)
+    bpy.context.scene.collection.objects.link(obj)
+    return obj
+
+
+def build_case(shape: str, n_verts: int):
+    """Create the benchmark object; returns (obj, seed edge vertex pair, axis)."""
+    if shape == "islands":
+        n_isl = 4
+        side = max(4, int(round((n_verts / n_isl) ** 0.5)))
+        parts, faces, base = [], [], 0
+        for k in range(n_isl):
+            co, f = _quad_grid(side, side, offset=(1.5 * k, 0.0, 0.0), seed=k)
+            parts.append(co)
+            faces.append(f + base)
+            base += len(co)
+        co, faces = np.concatenate(parts), np.concatenate(faces)
+        nx = side
+        axis = "Y"
+    elif shape == "cylinder":
+        nx = max(8, int(round((n_verts / 2) ** 0.5)))
+        ny = max(4, n_verts // nx)
+        co, faces = _quad_grid(nx, ny, wrap_x=True)
+        axis = "Z"
+    else:
+        nx = max(4, int(round(n_verts ** 0.5)))
+        co, faces = _quad_grid(nx, nx)
+        axis = "Y"
+
+    obj = _make_mesh(f"bench_{shape}_{n_verts}", co, faces)
+    # Seed: vertical edge in the middle column of the first grid/island
+    mid = nx // 2
+    return obj, (mid, nx + mid), axis
+
+
+def _find_edge(me, a: int, b: int) -> int:
+    ev = np.empty(len(me.edges) * 2, dtype=np.int32)
+    me.edges.foreach_get("vertices", ev)
+    ev = ev.reshape(-1, 2)
+    hit = np.flatnonzero(((ev[:, 0] == a) & (ev[:, 1] == b)) | ((ev[:, 0] == b) & (ev[:, 1] == a)))
+    return int(hit[0])
+
+
+def _select_only_edge(me, e: int):
+    sel = np.zeros(len(me.edges), dtype=bool)
+    sel[e] = True
+    me.edges.foreach_set("select", sel)
+    vsel = np.zeros(len(me.vertices), dtype=bool)
+    vsel[list(me.edges[e].vertices)] = True
+    me.vertices.foreach_set("select", vsel)
+    me.polygons.foreach_set("select", np.zeros(len(me.polygons), dtype=bool))
+
+
+def _set_mode(obj, mode: str):
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+    if obj.mode != mode:
+        bpy.ops.object.mode_set(mode=mode)
+
+
+def _clock():
+    return time.perf_counter()
+
+
+# -----------------------------
+# Phases
+# -----------------------------
+def _nbytes(*arrays) -> int:
+    return sum(a.nbytes for a in arrays if a is not None)
+
+
+def state_bytes(entry) -> int:
+    """Bytes held by the session cache for one loop: topology, loop state, index, influence."""
+    topo = entry.topology
+    total = _nbytes(topo.edges, topo.vert_indptr, topo.vert_edges, topo.edge_indptr, topo.edge_faces,
+                    topo._labels, topo._adj)
+    total += _nbytes(entry.loop_idx, entry.loop_ptr, entry.loop_closed, entry.loop_edges, entry.loop_world,
+                     entry.island_mask)
+    if entry.index is not None:
+        total += _nbytes(entry.index.pos, entry.index.order, entry.index.keys)
+    if entry.segments is not None:
+        total += _nbytes(entry.segments.pos, entry.segments.a, entry.segments.b)
+        total += sum(_nbytes(*level) for level in entry.segments._levels)
+    if entry.influence is not None:
+        total += entry.influence.nbytes
+    return total
+
+
+def run_phases(pkg, obj, seed_edge: int, axis: str, k: int, radius_frac: float, same_island: bool,
+               cold: bool = True, interpolation: str = "NEAREST"):
+    """Time the edit-mode pipeline phase by phase; ``cold`` empties the session cache first.
+
+    The original coordinates are restored afterwards so every run sees the
+    same input. Under tracemalloc, ``traced_peak`` is the peak traced
+    allocation above what was live when the pipeline started.
+    """
+    import bmesh
+
+    pipe, cache, spatial = pkg.pipeline, pkg.cache, pkg.spatial
+    props = pipe.Settings(axis=axis, k_nearest=k, only_same_island=same_island, interpolation=interpolation)
+    me = obj.data
+    phases = {}
+
+    _set_mode(obj, 'OBJECT')
+    _select_only_edge(me, seed_edge)
+    co0 = np.empty(len(me.vertices) * 3, dtype=np.float32)
+    me.vertices.foreach_get("co", co0)
+    _set_mode(obj, 'EDIT')
+    if cold:
+        cache.clear()
+    base = 0
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+
+    t = _clock()
+    bm = bmesh.from_edit_mesh(me)
+    obj.update_from_editmode()
+    co = pipe._read_coords(me)
+    sel = pipe._selected_edge_indices(me)
+    phases["edit_read"] = _clock() - t
+
+    t = _clock()
+    pipe._topology_for(obj, cache.topology_signature(me))
+    phases["topology"] = _clock() - t
+
+    t = _clock()
+    entry, err = pipe._resolve_loop(obj, sel, co)
+    phases["loop_detect"] = _clock() - t
+    if entry is None:
+        raise RuntimeError(err)
+
+    t = _clock()
+    island_mask = pkg.core.island_for(entry) if same_island else None
+    phases["island"] = _clock() - t
+
+    R = pipe._bbox_world_radius(obj, radius_frac)
+    t = _clock()
+    if interpolation == "POLYLINE":
+        if entry.segments is None or entry.segments.radius != R:
+            entry.segments = spatial.SegmentIndex(entry.loop_world, entry.loop_ptr, entry.loop_closed, R)
+    elif entry.index is None or entry.index.radius != R:
+        entry.index = spatial.LoopIndex(entry.loop_world, R)
+    phases["kd_build"] = _clock() - t
+
+    t = _clock()
+    flat_idxs, targets = pkg.core.flatten_targets(entry, axis, False)
+    phases["loop_flatten"] = _clock() - t
+
+    t = _clock()
+    co, affected, max_shift = pipe._solve_numpy(props, obj, bm, entry, co, island_mask, R, flat_idxs, targets)
+    phases["propagation"] = _clock() - t
+
+    t = _clock()
+    pipe._write_edit_coords(obj, bm, co)
+    phases["edit_update"] = _clock() - t
+
+    traced_peak = tracemalloc.get_traced_memory()[1] - base if tracemalloc.is_tracing() else None
+    del co, bm
+    _set_mode(obj, 'OBJECT')
+    me.vertices.foreach_set("co", co0)
+    me.update()
+
+    return phases, dict(loop_verts=len(entry.loop_idx), affected=affected, max_shift=max_shift, radius=R,
+                        state_bytes=state_bytes(entry), traced_peak=traced_peak)
+
+
+def measure_memory(pkg, obj, seed_edge: int, axis: str, k: int, radius_frac: float, same_island: bool,
+                   interpolation: str = "NEAREST"):
+    """Peak traced bytes per vertex of a cold and a warm (cached) run."""
+    n = max(1, len(obj.data.vertices))
+    tracemalloc.start()
+    try:
+        _, cold = run_phases(pkg, obj, seed_edge, axis, k, radius_frac, same_island, True, interpolation)
+        _, warm = run_phases(pkg, obj, seed_edge, axis, k, radius_frac, same_island, False, interpolation)
+    finally:
+        tracemalloc.stop()
+    return dict(
+        cold_peak_bytes=cold["traced_peak"], warm_peak_bytes=warm["traced_peak"],
+        cold_peak_per_vertex=cold["traced_peak"] / n, warm_peak_per_vertex=warm["traced_peak"] / n,
+        state_bytes=warm["state_bytes"], state_per_vertex=warm["state_bytes"] / n,
+    )
+
+
+def run_operator(pkg, obj, seed_edge: int, axis: str, k: int, radius: float, same_island: bool,
+                 interpolation: str = "NEAREST"):
+    """End-to-end operator timings: cold (empty cache) and warm (redo-cache hit)."""
+    out = {}
+    for label in ("op_cold", "op_warm"):
+        _set_mode(obj, 'OBJECT')
+        _select_only_edge(obj.data, seed_edge)
+        co0 = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+        obj.data.vertices.foreach_get("co", co0)
+        _set_mode(obj, 'EDIT')
+        if label == "op_cold":
+            pkg.cache.clear()
+        t = _clock()
+        bpy.ops.mesh.estraighten_loop(axis=axis, k_nearest=k, radius=radius, only_same_island=same_island,
+                                      interpolation=interpolation)
+        out[label] = _clock() - t
+        # restore the original shape so both runs see the same input
+        _set_mode(obj, 'OBJECT')
+        obj.data.vertices.foreach_set("co", co0)
+        obj.data.update()
+    return out
+
+
+def run_data_path(pkg, obj, seed_edge: int, axis: str, k: int, radius: float, same_island: bool,
+                  interpolation: str = "NEAREST"):
+    _set_mode(obj, 'OBJECT')
+    co0 = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+    obj.data.vertices.foreach_get("co", co0)
+    pkg.cache.clear()
+    t = _clock()
+    pkg.ops.straighten_object(obj, edges=[seed_edge], axis=axis, k_nearest=k, radius=radius,
+                              only_same_island=same_island, interpolation=interpolation)
+    elapsed = _clock() - t
+    obj.data.vertices.foreach_set("co", co0)
+    obj.data.update()
+    return {"object_mode": elapsed}
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+def _parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    p = argparse.ArgumentParser(prog="bench_pipeline")
+    p.add_argument("--sizes", default="10k,100k,1m", help=f"comma list of {','.join(SIZES)} or integers")
+    p.add_argument("--shapes", default=",".join(SHAPES))
+    p.add_argument("--k", default="5,32,128", help="k_nearest values")
+    p.add_argument("--radius", default="0.05,0.15", help="radius as fraction of the bbox diagonal")
+    p.add_argument("--island", default="on,off", help="only_same_island values (on/off)")
+    p.add_argument("--interpolation", default="NEAREST", help="comma list of NEAREST / POLYLINE")
+    p.add_argument("--repeat", type=int, default=1, help="runs per case (best time is kept)")
+    p.add_argument("--no-operator", action="store_true", help="skip end-to-end operator timings")
+    p.add_argument("--out", default="bench_output.json")
+    p.add_argument("--baseline", default="", help="previous JSON to compare against")
+    p.add_argument("--tolerance", type=float, default=1.25, help="slowdown ratio flagged as regression")
+    p.add_argument("--no-memory", action="store_true", help="skip the tracemalloc passes")
+    p.add_argument("--mem-target", type=float, default=48.0,
+                   help="warm-run peak budget in bytes per vertex (two float32 coordinate copies + a few bytes)")
+    return p.parse_args(argv)
+
+
+def _size(tok: str) -> int:
+    tok = tok.strip().lower()
+    return SIZES[tok] if tok in SIZES else int(tok)
+
+
+def _case_key(r) -> tuple:
+    return (r["shape"], r["verts_requested"], r["k"], r["radius_frac"], r["only_same_island"],
+            r.get("interpolation", "NEAREST"))
+
+
+def compare(results, baseline_path: str, tolerance: float) -> int:
+    """Print per-phase (and warm peak memory) ratios vs. a baseline JSON; returns the number of regressions."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        base = {_case_key(r): r for r in json.load(f)["results"]}
+    regressions = 0
+    for r in results:
+        b = base.get(_case_key(r))
+        if b is None:
+            continue
+        metrics = dict(r["timings"])
+        old_metrics = dict(b["timings"])
+        if r.get("memory") and b.get("memory"):
+            metrics["warm_peak_bytes"] = r["memory"]["warm_peak_bytes"]
+            old_metrics["warm_peak_bytes"] = b["memory"]["warm_peak_bytes"]
+        for metric, value in metrics.items():
+            old = old_metrics.get(metric)
+            if not old or old < 1e-3:
+                continue
+            ratio = value / old
+            if ratio > tolerance:
+                regressions += 1
+                print(f"REGRESSION {_case_key(r)} {metric}: {old:.4g} -> {value:.4g} (x{ratio:.2f})")
+    print(f"{regressions} regression(s) beyond x{tolerance:.2f}")
+    return regressions
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv if argv is None else argv)
+    pkg = _load_addon()
+
+    ks = [int(x) for x in args.k.split(",") if x]
+    fracs = [float(x) for x in args.radius.split(",") if x]
+    islands = [x.strip() == "on" for x in args.island.split(",") if x]
+    interps = [x.strip().upper() for x in args.interpolation.split(",") if x.strip()]
+    results = []
+
+    for shape in [s.strip() for s in args.shapes.split(",") if s.strip()]:
+        for n in [_size(s) for s in args.sizes.split(",") if s.strip()]:
+            t = _clock()
+            obj, (a, b), axis = build_case(shape, n)
+            build_time = _clock() - t
+            seed_edge = _find_edge(obj.data, a, b)
+            print(f"[{shape} {len(obj.data.vertices)} verts] built in {build_time:.2f}s")
+
+            for k in ks:
+                for frac in fracs:
+                    for same_island, interp in [(i, m) for i in islands for m in interps]:
+                        best, info = None, None
+                        for _ in range(max(1, args.repeat)):
+                            phases, info = run_phases(pkg, obj, seed_edge, axis, k, frac, same_island,
+                                                      interpolation=interp)
+                            if best is None:
+                                best = phases
+                            else:
+                                best = {p: min(best[p], phases[p]) for p in best}
+                        timings = dict(best)
+                        timings["pipeline_total"] = sum(best.values())
+                        if not args.no_operator:
+                            timings.update(run_operator(pkg, obj, seed_edge, axis, k, info["radius"], same_island,
+                                                        interp))
+                        timings.update(run_data_path(pkg, obj, seed_edge, axis, k, info["radius"], same_island, interp))
+
+                        memory = None
+                        if not args.no_memory:
+                            memory = measure_memory(pkg, obj, seed_edge, axis, k, frac, same_island, interp)
+                            memory["over_target"] = memory["warm_peak_per_vertex"] > args.mem_target
+
+                        info.pop("traced_peak", None)
+                        row = dict(
+                            shape=shape, verts_requested=n, verts=len(obj.data.vertices),
+                            edges=len(obj.data.edges), k=k, radius_frac=frac,
+                            only_same_island=same_island, interpolation=interp, timings=timings, memory=memory, **info,
+                        )
+                        results.append(row)
+                        print(f"  k={k:<3} R={frac:<5} island={'on ' if same_island else 'off'} {interp.lower():<8} "
+                              + " ".join(f"{p}={s:.3f}" for p, s in timings.items()))
+                        if memory:
+                            print(f"    memory B/vert: cold {memory['cold_peak_per_vertex']:.1f}"
+                                  f" warm {memory['warm_peak_per_vertex']:.1f}"
+                                  f" cache {memory['state_per_vertex']:.1f}"
+                                  + ("  OVER TARGET" if memory["over_target"] else ""))
+
+            _set_mode(obj, 'OBJECT')
+            me = obj.data
+            bpy.data.objects.remove(obj)
+            bpy.data.meshes.remove(me)
+
+    report = dict(
+        addon_version=list(pkg.bl_info["version"]),
+        blender=bpy.app.version_string,
+        numpy=np.__version__,
+        python=platform.python_version(),
+        machine=platform.machine(),
+        timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        mem_target_per_vertex=args.mem_target,
+        results=results,
+    )
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"wrote {args.out}")
+
+    if args.baseline:
+        return 1 if compare(results, args.baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Startup cost of the add-on: import + register time and which heavy modules it pulls in.
+
+Every sample runs in a fresh interpreter (imports are cached per process),
+timed from inside the child so Python / Blender's own startup is excluded:
+
+    # NumPy core / CLI only (any Python)
+    python benchmarks/bench_startup.py --repeat 20
+
+    # plus import + register() inside Blender (background) and the updater's first use
+    python benchmarks/bench_startup.py --blender /path/to/blender --repeat 10 --out startup.json
+
+    # compare against an older run, exit code 1 on regressions
+    python benchmarks/bench_startup.py --blender blender --baseline startup.json
+
+Cases:
+
+core             ``import edge_straighten_pro.core`` (scripts, farm workers)
+cli              ``import edge_straighten_pro.cli`` (batch OBJ/PLY)
+register         package import + ``register()`` in ``blender -b`` (no updater there)
+updater_first    first use of the updater (``updater._checker()``: network modules,
+                 cache folder, cached manifest), i.e. what the UI pays lazily
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PKG_NAME = "edge_straighten_pro"
+CASES = ("core", "cli", "register", "updater_first")
+BLENDER_CASES = ("register", "updater_first")
+# Startup'ta yüklenmesi istenmeyen (ya da bilinçli yüklenen) modüller
+WATCH = ("numpy", "urllib.request", "http.client", "ssl", "json", "tempfile", "cProfile", "bpy")
+MARKER = "STARTUP_RESULT "
+
+
+# -----------------------------
+# Child (one measurement per process)
+# -----------------------------
+def _import_pkg():
+    """Import the add-on package from this checkout (like bench_pipeline)."""
+    spec = importlib.util.spec_from_file_location(
+        PKG_NAME, os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR]
+    )
+    pkg = importlib.util.module_from_spec(spec)
+    sys.modules[PKG_NAME] = pkg
+    spec.loader.exec_module(pkg)
+    return pkg
+
+
+def measure(case: str) -> dict:
+    cache_dir = os.path.join(REPO_DIR, ".cache_updater")
+    had_cache_dir = os.path.isdir(cache_dir)
+    before = set(sys.modules)
+    t = time.perf_counter()
+    if case == "core":
+        _import_pkg()
+        importlib.import_module(f"{PKG_NAME}.core")
+    elif case == "cli":
+        _import_pkg()
+        importlib.import_module(f"{PKG_NAME}.cli")
+    elif case == "register":
+        _import_pkg().register()
+    elif case == "updater_first":
+        _import_pkg()
+        before = set(sys.modules)
+        t = time.perf_counter()
+        importlib.import_module(f"{PKG_NAME}.updater")._checker()
+    else:
+        raise ValueError(f"unknown case {case!r}")
+    ms = (time.perf_counter() - t) * 1000.0
+    new = set(sys.modules) - before
+    return dict(case=case, ms=ms, modules=len(new), heavy=[m for m in WATCH if m in new],
+                cache_dir_created=os.path.isdir(cache_dir) and not had_cache_dir)
+
+
+def _child(case: str):
+    print(MARKER + json.dumps(measure(case)), flush=True)
+
+
+# -----------------------------
+# Parent
+# -----------------------------
+def _run(cmd):
+    t = time.perf_counter()
+    out = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    wall = (time.perf_counter() - t) * 1000.0
+    for line in out.stdout.splitlines():
+        if line.startswith(MARKER):
+            res = json.loads(line[len(MARKER):])
+            res["process_ms"] = wall
+            return res
+    raise RuntimeError(f"{' '.join(cmd)} failed:\n{out.stdout[-2000:]}\n{out.stderr[-2000:]}")
+
+
+def _command(case: str, blender: str):
+    script = os.path.abspath(__file__)
+    if case in BLENDER_CASES:
+        return [blender, "-b", "--factory-startup", "--python", script, "--", "--child", case]
+    return [sys.executable, script, "--child", case]
+
+
+def compare(results, baseline_path: str, tolerance: float) -> int:
+    """Median import time per case vs. a baseline JSON; returns the number of regressions."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        base = {r["case"]: r for r in json.load(f)["results"]}
+    regressions = 0
+    for r in results:
+        b = base.get(r["case"])
+        if b is None or b["median_ms"] < 1e-3:
+            continue
+        ratio = r["median_ms"] / b["median_ms"]
+        if ratio > tolerance:
+            regressions += 1
+            print(f"REGRESSION {r['case']}: {b['median_ms']:.1f} -> {r['median_ms']:.1f} ms (x{ratio:.2f})")
+        for m in sorted(set(r["heavy"]) - set(b["heavy"])):
+            print(f"NEW IMPORT {r['case']}: {m}")
+    print(f"{regressions} regression(s) beyond x{tolerance:.2f}")
+    return regressions
+
+
+def _parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else argv[1:]
+    p = argparse.ArgumentParser(prog="bench_startup")
+    p.add_argument("--blender", default="", help="Blender executable for the register / updater cases")
+    p.add_argument("--cases", default=",".join(CASES))
+    p.add_argument("--repeat", type=int, default=10, help="fresh processes per case")
+    p.add_argument("--out", default="startup_output.json")
+    p.add_argument("--baseline", default="", help="previous JSON to compare against")
+    p.add_argument("--tolerance", type=float, default=1.25, help="slowdown ratio flagged as regression")
+    p.add_argument("--child", default="", help=argparse.SUPPRESS)
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv if argv is None else argv)
+    if args.child:
+        _child(args.child)
+        return 0
+
+    results = []
+    for case in [c.strip() for c in args.cases.split(",") if c.strip()]:
+        if case in BLENDER_CASES and not args.blender:
+            print(f"[{case}] skipped (needs --blender)")
+            continue
+        runs = [_run(_command(case, args.blender)) for _ in range(max(1, args.repeat))]
+        ms = [r["ms"] for r in runs]
+        row = dict(case=case, min_ms=min(ms), median_ms=statistics.median(ms),
+                   process_ms=statistics.median(r["process_ms"] for r in runs),
+                   modules=runs[-1]["modules"], heavy=runs[-1]["heavy"],
+                   cache_dir_created=any(r["cache_dir_created"] for r in runs))
+        results.append(row)
+        print(f"[{case:<13}] median {row['median_ms']:7.1f} ms  min {row['min_ms']:7.1f} ms  "
+              f"process {row['process_ms']:7.0f} ms  +{row['modules']} modules  heavy: {', '.join(row['heavy']) or '-'}"
+              + ("  (created cache dir)" if row["cache_dir_created"] else ""))
+
+    report = dict(
+        python=platform.python_version(),
+        machine=platform.machine(),
+        blender=args.blender,
+        timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        results=results,
+    )
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"wrote {args.out}")
+
+    if args.baseline:
+        return 1 if compare(results, args.baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
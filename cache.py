@@ -0,0 +1,110 @@
+"""Session cache shared by operator re-executions.
+
+With ``{'REGISTER', 'UNDO'}`` every redo-panel tweak undoes the operator
+and runs ``execute()`` again on the restored mesh. Everything that only
+depends on topology and the selected loop (loop vertices, island mask,
+original loop positions, spatial index, influence weights) is kept here so
+a parameter change only pays for the cheapest step that still depends on it.
+
+Entries hold plain indices/arrays, never BMesh elements (those die with
+the undo step). Keys are ``(object name, topology signature, selection)``;
+entries are additionally validated against the current loop positions.
+"""
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+MAX_ENTRIES = 8
+MAX_TOPOLOGIES = 4
+
+_entries = OrderedDict()
+_topologies = OrderedDict()
+
+
+class LoopEntry:
+    """Cached per-loop state (indices and world-space arrays only)."""
+
+    __slots__ = ("topology", "loop_idx", "loop_ptr", "loop_closed", "loop_edges", "loop_world",
+                 "island_mask", "index", "segments", "influence", "influence_key")
+
+    def __init__(self, topology, loop_idx: np.ndarray, loop_ptr: np.ndarray, loop_closed: np.ndarray,
+                 loop_edges: np.ndarray, loop_world: np.ndarray):
+        self.topology = topology          # topology.MeshTopology (shared, island labels cached on it)
+        self.loop_idx = loop_idx          # (L,) vertex indices of all loops, walk order when known
+        self.loop_ptr = loop_ptr          # (G+1,) loop g owns loop_idx[loop_ptr[g]:loop_ptr[g+1]]
+        self.loop_closed = loop_closed    # (G,) bool
+        self.loop_edges = loop_edges      # (E,) edge indices
+        self.loop_world = loop_world      # (L, 3) original world positions
+        self.island_mask = None           # (N,) bool, built on first use
+        self.index = None                 # spatial.LoopIndex, keyed by its radius
+        self.segments = None              # spatial.SegmentIndex (polyline mode), keyed by its radius
+        self.influence = None             # propagate.Influence over vertex indices
+        self.influence_key = None         # (R, K, smooth, metric, interpolation, island, weight mask, coords sig)
+
+    @property
+    def n_loops(self) -> int:
+        return len(self.loop_ptr) - 1
+
+    @property
+    def loop_ids(self) -> np.ndarray:
+        """(L,) loop number of every loop vertex."""
+        return np.repeat(np.arange(self.n_loops), np.diff(self.loop_ptr))
+
+
+def topology_signature(me) -> tuple:
+    """Cheap topology fingerprint: element counts + CRC of the edge table."""
+    ev = np.empty(len(me.edges) * 2, dtype=np.int32)
+    me.edges.foreach_get("vertices", ev)
+    return (len(me.vertices), len(me.edges), len(me.polygons), zlib.crc32(ev))
+
+
+def coords_signature(co: np.ndarray) -> int:
+    """CRC of a coordinate array; detects edits outside the loop between runs."""
+    return zlib.crc32(np.ascontiguousarray(co))
+
+
+def mask_signature(mask: np.ndarray) -> int:
+    """CRC of a bool vertex mask (e.g. the vertex-group cull set)."""
+    return zlib.crc32(np.packbits(mask))
+
+
+def _lru_get(table: OrderedDict, key):
+    value = table.get(key)
+    if value is not None:
+        table.move_to_end(key)
+    return value
+
+
+def _lru_put(table: OrderedDict, key, value, limit: int):
+    table[key] = value
+    table.move_to_end(key)
+    while len(table) > limit:
+        table.popitem(last=False)
+
+
+def get(key):
+    return _lru_get(_entries, key)
+
+
+def put(key, entry: LoopEntry):
+    _lru_put(_entries, key, entry, MAX_ENTRIES)
+
+
+def discard(key):
+    _entries.pop(key, None)
+
+
+def get_topology(key):
+    """topology.MeshTopology for ``(object name, topology signature)``."""
+    return _lru_get(_topologies, key)
+
+
+def put_topology(key, topo):
+    _lru_put(_topologies, key, topo, MAX_TOPOLOGIES)
+
+
+def clear():
+    _entries.clear()
+    _topologies.clear()
@@ -0,0 +1,189 @@
+"""Batch straighten OBJ/PLY files without Blender.
+
+    python -m edge_straighten_pro.cli mesh_*.obj --edges 12 13 14 --axis Y
+    python -m edge_straighten_pro.cli scan.ply --edge-verts 10-11 --radius 0.2 --jobs 8
+
+Edge indices follow :meth:`topology.MeshTopology.from_faces` numbering
+(order of first appearance along the faces); ``--edge-verts`` names the
+edges by their vertex pairs instead, which is stable across tools. One
+edge per loop is enough, it is grown to the full loop like in the
+operator. Files are processed in a process pool (``--jobs``); a JSON
+summary per file goes to stdout (or ``--summary``).
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import core, diskcache, mesh_io, stream, topology
+
+
+def _edge_pair(text: str):
+    a, sep, b = text.partition("-")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected A-B vertex pair, got {text!r}")
+    return int(a), int(b)
+
+
+def _out_path(path: str, out_dir: str, suffix: str) -> str:
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return os.path.join(out_dir or os.path.dirname(path), f"{stem}{suffix}{ext}")
+
+
+def process_file(path: str, out_path: str, edges, edge_verts, settings: dict, workers: int = 1,
+                 disk=None) -> dict:
+    """Load -> straighten -> write one file; returns a summary dict (never raises).
+
+    ``disk`` is an optional :class:`diskcache.DiskCache` shared by all files.
+    """
+    t0 = time.perf_counter()
+    try:
+        mesh = mesh_io.load(path)
+        topo = topology.MeshTopology.from_faces(len(mesh.co), mesh.face_verts, mesh.face_sizes)
+        sel = list(edges or ())
+        if edge_verts:
+            found = topo.find_edges(edge_verts)
+            missing = [f"{a}-{b}" for (a, b), e in zip(edge_verts, found) if e < 0]
+            if missing:
+                raise ValueError(f"No edge between vertices {', '.join(missing)}")
+            sel.extend(found.tolist())
+        co, info = core.straighten(mesh.co.copy(), topo, sel, workers=workers, disk=disk, **settings)
+        mesh.write(out_path, co)
+        info.update(file=path, out=out_path, verts=len(co), ok=True)
+    except Exception as e:   # bozuk bir dosya tüm batch'i (pool.map) durdurmamalı
+        info = dict(file=path, ok=False, error=f"{type(e).__name__}: {e}")
+    info["seconds"] = time.perf_counter() - t0
+    return info
+
+
+def process_file_stream(path: str, out_path: str, edge_verts, settings: dict, chunk: int,
+                        workers: int = 1) -> dict:
+    """Out-of-core variant: copy (or edit in place) and straighten through a memmap (never raises).
+
+    The copy is written to a temporary file next to ``out_path`` and only
+    renamed over it after a successful run, so a failure never replaces
+    an existing output.
+    """
+    t0 = time.perf_counter()
+    tmp = None
+    try:
+        target = out_path
+        if out_path != path:
+            # Kaynak önce doğrulanır (format / düzen); kopya ancak sonra yazılır
+            mesh_io.memmap_vertices(path, "r")
+            stem, ext = os.path.splitext(os.path.basename(out_path))
+            tmp = target = os.path.join(os.path.dirname(out_path), f".{stem}.tmp{os.getpid()}{ext}")
+            shutil.copyfile(path, tmp)
+        vmap = mesh_io.memmap_vertices(target, "r+")
+        loop_idx, loop_ptr, loop_closed = stream.loops_from_pairs(edge_verts,
+                                                                  settings.get("interpolation") != "POLYLINE")
+        settings = dict(settings, only_same_island=False)
+        info = stream.straighten_chunked(vmap.co, loop_idx, loop_ptr, loop_closed, chunk=chunk, workers=workers,
+                                         **settings)
+        vmap.flush()
+        verts = len(vmap.co)
+        del vmap   # Windows: eşlenmiş dosya yeniden adlandırılamaz
+        if tmp is not None:
+            os.replace(tmp, out_path)
+            tmp = None
+        info.update(file=path, out=out_path, verts=verts, ok=True)
+    except Exception as e:   # bozuk bir dosya tüm batch'i (pool.map) durdurmamalı
+        info = dict(file=path, ok=False, error=f"{type(e).__name__}: {e}")
+    finally:
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+    info["seconds"] = time.perf_counter() - t0
+    return info
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="edge_straighten_pro.cli", description="Straighten edge loops in OBJ/PLY files.")
+    p.add_argument("files", nargs="+", help="input .obj / .ply files")
+    p.add_argument("--edges", type=int, nargs="*", default=[], help="loop edge indices (face order numbering)")
+    p.add_argument("--edge-verts", type=_edge_pair, nargs="*", default=[], metavar="A-B",
+                   help="loop edges given as vertex index pairs (0-based)")
+    p.add_argument("--out-dir", default="", help="output folder (default: next to the input)")
+    p.add_argument("--suffix", default="_straight", help="output file name suffix (default: _straight)")
+    p.add_argument("--jobs", type=int, default=0, help="parallel processes (0 = all cores)")
+    p.add_argument("--summary", default="", help="write the JSON summary here instead of stdout")
+    p.add_argument("--cache-dir", default=None, nargs="?", const="",
+                   help="keep influence weights in this folder between runs (no value = the add-on's "
+                        ".cache_influence); repeat runs on the same mesh + settings skip the neighbour queries")
+    p.add_argument("--cache-size", type=int, default=1024, help="disk cache limit in MB (LRU eviction)")
+    p.add_argument("--stream", action="store_true",
+                   help="out-of-core mode for huge binary .ply / .npy files: positions are memory-mapped and "
+                        "processed in chunks; needs every loop edge in --edge-verts, Euclidean only, no islands")
+    p.add_argument("--chunk", type=int, default=stream.CHUNK, help="vertices per chunk in --stream mode")
+    p.add_argument("--in-place", action="store_true", help="--stream: modify the input files instead of copies")
+
+    s = p.add_argument_group("settings (same as the operator)")
+    s.add_argument("--axis", choices=sorted(core.AXES), default="Y")
+    s.add_argument("--flatten-to-zero", action="store_true")
+    s.add_argument("--radius", type=float, default=0.0, help="falloff radius (0 = auto)")
+    s.add_argument("--strength", type=float, default=1.0)
+    s.add_argument("--no-smooth", dest="smooth", action="store_false")
+    s.add_argument("--k-nearest", type=int, default=5)
+    s.add_argument("--all-islands", dest="only_same_island", action="store_false")
+    s.add_argument("--no-keep-y", dest="keep_Y_when_Y_axis", action="store_false")
+    s.add_argument("--falloff-metric", choices=("EUCLIDEAN", "GEODESIC"), default="EUCLIDEAN")
+    s.add_argument("--interpolation", choices=("NEAREST", "POLYLINE"), default="NEAREST")
+    s.add_argument("--relax", choices=("NONE", "LAPLACIAN", "TAUBIN"), default="NONE",
+                   help="smooth the moved region afterwards (not in --stream mode)")
+    s.add_argument("--relax-iterations", type=int, default=3)
+    s.add_argument("--relax-factor", type=float, default=0.5)
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.edges and not args.edge_verts:
+        print("error: give --edges and/or --edge-verts", file=sys.stderr)
+        return 2
+    if args.stream and (args.edges or not args.edge_verts):
+        print("error: --stream takes the loop as --edge-verts pairs only", file=sys.stderr)
+        return 2
+
+    settings = dict(axis=args.axis, flatten_to_zero=args.flatten_to_zero, radius=args.radius,
+                    strength=args.strength, smooth=args.smooth, k_nearest=args.k_nearest,
+                    only_same_island=args.only_same_island, keep_Y_when_Y_axis=args.keep_Y_when_Y_axis,
+                    falloff_metric=args.falloff_metric, interpolation=args.interpolation, relax=args.relax,
+                    relax_iterations=args.relax_iterations, relax_factor=args.relax_factor)
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(args.files)))
+    # Tek dosyada süreç yerine thread'ler (KNN / blend) kullanılır
+    workers = (os.cpu_count() or 1) if jobs == 1 else 1
+    if args.stream:
+        fn = process_file_stream
+        tasks = [(f, f if args.in_place else _out_path(f, args.out_dir, args.suffix), args.edge_verts,
+                  settings, args.chunk, workers) for f in args.files]
+    else:
+        fn = process_file
+        disk = None if args.cache_dir is None else diskcache.DiskCache(args.cache_dir, args.cache_size << 20)
+        tasks = [(f, _out_path(f, args.out_dir, args.suffix), args.edges, args.edge_verts, settings, workers, disk)
+                 for f in args.files]
+
+    if jobs == 1:
+        results = [fn(*t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(fn, *zip(*tasks)))
+
+    text = json.dumps(results, indent=2, default=lambda o: o.item() if isinstance(o, np.generic) else str(o))
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
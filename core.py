@@ -0,0 +1,330 @@
+"""Straighten + propagate on plain arrays (no bpy/bmesh/mathutils).
+
+The Blender operators are thin adapters around these functions: they read
+coordinates/topology with ``foreach_get``, call into here and write the
+result back. The same steps run unchanged from ``cli.py`` on OBJ/PLY files,
+on render-farm workers, or from any Python with NumPy.
+
+Coordinates are local (N, 3) arrays; ``mw`` is the 4x4 object-to-world
+matrix (identity for plain files). All distances (radius, falloff) are in
+world space, like in the operator.
+"""
+import numpy as np
+
+from . import cache, profiling, propagate, relax, spatial, topology
+
+
+AXES = {"X": 0, "Y": 1, "Z": 2}
+
+
+class Settings:
+    """Operator-equivalent settings for scripted runs (same names and defaults)."""
+
+    DEFAULTS = dict(
+        axis="Y", flatten_to_zero=False, radius=0.0, strength=1.0, smooth=True,
+        k_nearest=5, only_same_island=True, keep_Y_when_Y_axis=True,
+        use_vgroup=False, vgroup_name="", falloff_metric="EUCLIDEAN", interpolation="NEAREST",
+        output="MESH", output_name="Straighten",
+        relax="NONE", relax_iterations=3, relax_factor=0.5,
+    )
+
+    def __init__(self, **kwargs):
+        unknown = set(kwargs) - set(self.DEFAULTS)
+        if unknown:
+            raise TypeError(f"Unknown setting(s): {', '.join(sorted(unknown))}")
+        self.__dict__.update(self.DEFAULTS)
+        self.__dict__.update(kwargs)
+        self.messages = []
+
+    def report(self, level, message):
+        self.messages.append((set(level), message))
+
+
+# -----------------------------
+# Loop
+# -----------------------------
+def loop_world(co: np.ndarray, loop_idx: np.ndarray, mw: np.ndarray) -> np.ndarray:
+    """World positions of the loop vertices as an (L, 3) array (dtype of ``co``)."""
+    return propagate.transform_points(mw, co[loop_idx])
+
+
+def build_loop(topo: topology.MeshTopology, sel: np.ndarray, co: np.ndarray, mw: np.ndarray):
+    """Resolve the loops from the selected edge indices -> ``cache.LoopEntry`` or None."""
+    # ---- Loop'ları belirle: seçimi bağımsız bağlı loop'lara ayır ----
+    # Tek edge'lik parçalar topoloji üzerinde yürüyerek tam loop'a genişletilir (seçime dokunmadan).
+    seen = np.zeros(topo.n_verts, dtype=bool)
+    parts, ptr, closed, edges = [], [0], [], []
+    for verts, loop_edges, is_closed in topo.selected_loops(sel):
+        verts = np.asarray(verts, dtype=np.int32)
+        # Kesişen loop'larda ortak vertex ilk loop'ta kalır
+        verts = verts[~seen[verts]]
+        if len(verts) < 2:
+            continue
+        seen[verts] = True
+        parts.append(verts)
+        ptr.append(ptr[-1] + len(verts))
+        closed.append(is_closed)
+        edges.extend(loop_edges)
+
+    if not parts:
+        return None
+    loop_idx = np.concatenate(parts)
+    return cache.LoopEntry(
+        topo, loop_idx, np.array(ptr, dtype=np.int64), np.array(closed, dtype=bool),
+        np.array(edges, dtype=np.int32), loop_world(co, loop_idx, mw),
+    )
+
+
+def loop_chains(entry: cache.LoopEntry):
+    """The loop edges as simple chains over loop point indices -> ``(order, ptr, closed)``.
+
+    Polyline segments must join mesh neighbours: a branching or crossing
+    selection has no single walk order (and a vertex shared by two loops is
+    kept in the first one only), so the edges are split at branch points
+    with :func:`topology.split_chains` instead of following ``loop_ptr``.
+    """
+    local = np.full(entry.topology.n_verts, -1, dtype=np.int64)
+    local[entry.loop_idx] = np.arange(len(entry.loop_idx))
+    pairs = local[entry.topology.edges[entry.loop_edges]]
+    return topology.split_chains(len(entry.loop_idx), pairs[np.all(pairs >= 0, axis=1)])
+
+
+def island_for(entry: cache.LoopEntry) -> np.ndarray:
+    """Bool mask of the loop's island(s), from labels cached on the topology."""
+    if entry.island_mask is None:
+        entry.island_mask = entry.topology.island_mask(entry.loop_idx)
+    return entry.island_mask
+
+
+def flatten_targets(entry: cache.LoopEntry, axis: str, flatten_to_zero: bool):
+    """Flattened component indices and per-loop target values (loop centroid or 0).
+
+    Returns ``(flat_idxs, targets)`` with ``targets`` shaped (G, 3): every
+    loop gets its own line through its own centroid.
+    """
+    sums = np.add.reduceat(entry.loop_world, entry.loop_ptr[:-1], axis=0)
+    targets = sums / np.diff(entry.loop_ptr)[:, None]
+
+    keep_idx = AXES[axis]
+    flat_idxs = [i for i in (0, 1, 2) if i != keep_idx]
+
+    if flatten_to_zero:
+        targets[:, flat_idxs] = 0.0
+    return flat_idxs, targets
+
+
+def loop_deltas(entry: cache.LoopEntry, flat_idxs, targets):
+    """Flattened loop world positions and their deltas from the originals (float64, (L, 3))."""
+    after = entry.loop_world.astype(np.float64)
+    after[:, flat_idxs] = targets[entry.loop_ids][:, flat_idxs]
+    return after, after - entry.loop_world
+
+
+def world_bbox(lo, hi, mw: np.ndarray):
+    """World AABB ``(lo, hi)`` of the local box ``lo``..``hi`` (all 8 corners transformed)."""
+    lo, hi = np.asarray(lo, dtype=np.float64), np.asarray(hi, dtype=np.float64)
+    corners = np.array(np.meshgrid(*zip(lo, hi), indexing="ij")).reshape(3, -1).T
+    w = propagate.transform_points(mw, corners)
+    return w.min(axis=0), w.max(axis=0)
+
+
+def auto_radius(co: np.ndarray, mw: np.ndarray, frac: float = 0.15) -> float:
+    """``frac`` of the world-space diagonal of the transformed local bounding box."""
+    if len(co) == 0:
+        return 0.0
+    lo, hi = world_bbox(co.min(axis=0), co.max(axis=0), mw)
+    return float(np.linalg.norm(hi - lo) * frac)
+
+
+# -----------------------------
+# Influence
+# -----------------------------
+def reach_rows(entry: cache.LoopEntry, world: np.ndarray, R: float) -> np.ndarray:
+    """Vertices inside the loop's bbox inflated by ``R`` (superset of anything
+    the falloff can reach, Euclidean or geodesic), scanned in blocks."""
+    lo = entry.loop_world.min(axis=0) - R
+    hi = entry.loop_world.max(axis=0) + R
+    parts = []
+    for s in range(0, len(world), spatial.QUERY_BLOCK):
+        blk = world[s:s + spatial.QUERY_BLOCK]
+        parts.append(np.flatnonzero(np.all((blk >= lo) & (blk <= hi), axis=1)).astype(np.int32) + s)
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+
+
+def influence_for(entry: cache.LoopEntry, world: np.ndarray, coords_sig: int,
+                  island_mask, R: float, K: int, smooth: bool,
+                  metric: str = 'EUCLIDEAN', weight_mask=None, workers: int = 1,
+                  interpolation: str = 'NEAREST', disk=None) -> propagate.Influence:
+    """Influence over vertex indices, rebuilt only when geometry/R/K/smooth/metric change.
+
+    ``weight_mask`` (N,) bool drops vertices before any spatial query, e.g.
+    the ones with vertex group weight 0. ``workers`` only changes speed.
+    ``interpolation='POLYLINE'`` projects onto the nearest loop segment
+    instead of blending the K nearest loop points (Euclidean metric only).
+    ``disk`` is an optional :class:`diskcache.DiskCache` consulted before
+    (and filled after) building, so the weights survive the session.
+    """
+    if metric == 'GEODESIC':
+        interpolation = 'NEAREST'
+    mask_sig = cache.mask_signature(weight_mask) if weight_mask is not None else None
+    ikey = (R, K, smooth, metric, interpolation, island_mask is not None, mask_sig, coords_sig)
+    if entry.influence is not None and entry.influence_key == ikey:
+        return entry.influence
+
+    dkey = None
+    if disk is not None:
+        dkey = disk.key(world, entry.topology, entry.loop_idx, entry.loop_ptr, entry.loop_closed, R, K, smooth,
+                        metric, interpolation, island_mask, weight_mask,
+                        entry.loop_edges if interpolation == 'POLYLINE' else None)
+        infl = disk.load(dkey, len(world))
+        if infl is not None:
+            entry.influence = infl
+            entry.influence_key = ikey
+            return infl
+
+    # Aday vertex'ler: loop dışı (+ ada filtresi, + sıfır olmayan vgroup ağırlığı)
+    cand = np.ones(len(world), dtype=bool)
+    cand[entry.loop_idx] = False
+    if island_mask is not None:
+        cand &= island_mask
+    if weight_mask is not None:
+        cand &= weight_mask
+
+    if metric == 'GEODESIC':
+        # Yüzey (edge) mesafesi: R'de duran çok kaynaklı genişleme, yalnızca etki bölgesi
+        rows, cols, dist = entry.topology.geodesic_knn(world, entry.loop_idx, R, K)
+        m = cand[rows]
+        infl = propagate.Influence.from_pairs(len(world), [(rows[m], cols[m], dist[m])], R, smooth)
+    else:
+        # Yalnızca loop bbox + R içindekiler sorguya girer (uzak çoğunluk kopyalanmaz)
+        reach = reach_rows(entry, world, R)
+        cand_idx = reach[cand[reach]]
+
+        if interpolation == 'POLYLINE':
+            # Loop edges -> simple chains -> segments; delta interpolated along the nearest one
+            if entry.segments is None or entry.segments.radius != R:
+                order, ptr, closed = loop_chains(entry)
+                entry.segments = spatial.SegmentIndex(entry.loop_world, ptr, closed, R, order)
+            infl = propagate.Influence.build_polyline(world[cand_idx], entry.segments, workers)
+        else:
+            # Spatial index over the original loop: reused across redo as long as R holds
+            if entry.index is None or entry.index.radius != R:
+                entry.index = spatial.LoopIndex(entry.loop_world, R)
+            infl = propagate.Influence.build(world[cand_idx], entry.loop_world, R, K, smooth,
+                                             index=entry.index, workers=workers)
+        infl = infl.remap(cand_idx, len(world))
+
+    if dkey is not None:
+        disk.store(dkey, infl)
+    entry.influence = infl
+    entry.influence_key = ikey
+    return infl
+
+
+# -----------------------------
+# Solve
+# -----------------------------
+def solve(props, entry: cache.LoopEntry, co: np.ndarray, mw: np.ndarray, island_mask,
+          R: float, flat_idxs, targets, weights=None, workers: int = 1, timer=profiling.NULL, disk=None,
+          strength: float = None):
+    """Flatten the loop and propagate on a local coordinate array.
+
+    ``props`` carries the settings (:class:`Settings` or the operator).
+    ``weights`` modulates the offsets per vertex: None, an (N,) array, or a
+    callable ``rows -> (N,) array | None`` that only has to fill ``rows``
+    (the vertices the falloff can reach). Weight-0 vertices never enter
+    the spatial query. ``disk`` is an optional :class:`diskcache.DiskCache`.
+    ``strength`` overrides ``props.strength`` (1.0 for an offset field).
+    ``props.relax`` adds a Laplacian / Taubin pass over the moved vertices
+    and their one-ring (:func:`relax.relax_region`, loop pinned, steps
+    scaled by ``weights``). Returns ``(co, affected, max_shift)`` with ``co`` updated in place.
+    """
+    imw = np.linalg.inv(mw)
+    # float32 world copy: only for neighbour queries; written rows are redone in float64
+    world = propagate.transform_points(mw, co)
+
+    # ---- Loop'u düzleştir & delta'ları kaydet ----
+    loop_idx = entry.loop_idx
+    with timer.phase("Flatten", len(loop_idx)):
+        after, deltas = loop_deltas(entry, flat_idxs, targets)
+
+    weight_fn = reach = None
+    if callable(weights):
+        with timer.phase("VGroup"):
+            weight_fn, reach = weights, reach_rows(entry, world, R)
+            weights = weight_fn(reach)
+            timer.count(len(reach))
+
+    # ---- Influence: yalnızca geometri/R/K/smooth değişince yeniden kur ----
+    with timer.phase("Influence"):
+        sig = cache.coords_signature(co)
+        infl = influence_for(entry, world, sig, island_mask, R, max(1, props.k_nearest), props.smooth,
+                             props.falloff_metric, None if weights is None else weights > 0.0, workers,
+                             props.interpolation, disk)
+        timer.count(len(infl.rows))
+
+    keep_axis = 1 if (props.axis == "Y" and props.keep_Y_when_Y_axis) else None
+    with timer.phase("Blend", len(infl.rows)):
+        offsets = infl.apply(deltas, props.strength if strength is None else strength, keep_axis, weights,
+                             workers)
+
+        # ---- Yayılım: yalnızca değişen satırları (float64) local'e geri çevir ----
+        moved = infl.rows
+        co[loop_idx] = propagate.transform_points(imw, after)
+        moved_world = propagate.transform_points(mw, co[moved].astype(np.float64))
+        moved_world += offsets
+        co[moved] = propagate.transform_points(imw, moved_world)
+
+    # ---- Relax (isteğe bağlı): yalnızca hareket eden bölge + bir halka, loop sabit ----
+    if props.relax != 'NONE' and props.relax_iterations > 0 and entry.topology is not None:
+        with timer.phase("Relax"):
+            changed = infl.rows[np.any(offsets != 0.0, axis=1)]
+            region = np.r_[changed, loop_idx]
+            if weights is not None and weight_fn is not None:
+                # Relax halkası reach kutusunun dışına taşabilir: o vertex'lerin ağırlıkları da okunur
+                _, ring = entry.topology.adjacency(region)
+                extra = np.setdiff1d(ring, reach)
+                more = weight_fn(extra) if len(extra) else None
+                if more is not None:
+                    weights = weights.copy()
+                    weights[extra] = more[extra]
+            timer.count(relax.relax_region(co, entry.topology, region, loop_idx, props.relax_iterations,
+                                           props.relax_factor, props.relax == 'TAUBIN', mw, keep_axis,
+                                           weights))
+
+    shifts = np.linalg.norm(offsets, axis=1)
+    max_shift = float(shifts.max()) if len(shifts) else 0.0
+    return co, int(len(moved)), max_shift
+
+
+def straighten(co, topo: topology.MeshTopology, edges, mw=None, weights=None, workers: int = 1,
+               disk=None, **settings):
+    """One-shot straighten + propagate on arrays.
+
+    ``co`` (N, 3) local coordinates (modified in place when float32,
+    otherwise a float32 copy is returned), ``topo`` the mesh topology,
+    ``edges`` the loop edge indices (topology numbering). ``weights`` is an
+    optional (N,) per-vertex modulation, ``disk`` an optional
+    :class:`diskcache.DiskCache`. Keyword settings match the
+    operator properties. Returns ``(co, info dict)``; raises ValueError
+    when the loop cannot be determined.
+    """
+    props = Settings(**settings)
+    co = np.asarray(co, dtype=np.float32)
+    mw = np.eye(4) if mw is None else np.asarray(mw, dtype=np.float64)
+    sel = np.asarray(edges, dtype=np.int64).ravel()
+    sel = sel[(sel >= 0) & (sel < topo.n_edges)]
+    if len(sel) == 0:
+        raise ValueError("No loop edges given")
+
+    entry = build_loop(topo, sel, co, mw)
+    if entry is None:
+        raise ValueError("Edge loop could not be determined")
+
+    island_mask = island_for(entry) if props.only_same_island else None
+    R = props.radius if props.radius > 0.0 else auto_radius(co, mw, 0.15)
+    flat_idxs, targets = flatten_targets(entry, props.axis, props.flatten_to_zero)
+    co, affected, max_shift = solve(props, entry, co, mw, island_mask, R, flat_idxs, targets,
+                                    weights, workers, disk=disk)
+    return co, dict(loops=entry.n_loops, loop_verts=len(entry.loop_idx), affected=affected,
+                    max_shift=max_shift, radius=R)
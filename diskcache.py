@@ -0,0 +1,138 @@
+"""Persistent influence cache across sessions (NumPy only, no bpy).
+
+The session cache (``cache.py``) dies with Blender; this one keeps the
+influence CSR arrays on disk so re-running the same setup on the same base
+mesh (next shot, next day, farm workers) skips the spatial queries and the
+weighting and goes straight to blending the deltas.
+
+Each entry is a folder of plain ``.npy`` files named by a hash of
+everything the weights depend on: world positions, topology, loop
+vertices, ``R`` / ``K`` / ``smooth`` / metric / interpolation and the
+island / vertex-group masks. Entries are opened memory-mapped, so a hit
+costs a few page reads instead of a full load. The folder is capped at
+``max_bytes``; the least recently used entries (folder mtime, touched on
+every hit) are removed first.
+"""
+import hashlib
+import os
+import shutil
+
+import numpy as np
+
+from . import propagate
+
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_influence")
+DEFAULT_MAX_BYTES = 1 << 30
+FORMAT = 1   # bump when the stored layout or the weighting math changes
+
+_FIELDS = ("rows", "indptr", "cols", "weights")
+
+
+class DiskCache:
+    """Hash-keyed, size-bounded folder of memory-mappable :class:`propagate.Influence` arrays."""
+
+    def __init__(self, path: str = "", max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or DEFAULT_DIR
+        self.max_bytes = int(max_bytes)
+
+    @staticmethod
+    def key(world, topology, loop_idx, loop_ptr, loop_closed, R: float, K: int, smooth: bool,
+            metric: str, interpolation: str, island_mask=None, weight_mask=None, edges=None) -> str:
+        """Hex digest of every input the influence weights depend on (``edges``: polyline loop edges)."""
+        h = hashlib.blake2b(digest_size=20)
+        h.update(repr((FORMAT, float(R), int(K), bool(smooth), metric, interpolation,
+                       island_mask is not None, weight_mask is not None)).encode())
+        h.update(topology.digest())
+        for a in (world, loop_idx, loop_ptr, loop_closed):
+            a = np.ascontiguousarray(a)
+            h.update(repr((a.dtype.str, a.shape)).encode())
+            h.update(a)
+        for m in (island_mask, weight_mask):
+            if m is not None:
+                h.update(np.packbits(m))
+        if edges is not None:
+            h.update(np.ascontiguousarray(edges, dtype=np.int64))
+        return h.hexdigest()
+
+    def _dir(self, key: str) -> str:
+        return os.path.join(self.path, key)
+
+    def load(self, key: str, n: int):
+        """Memory-mapped Influence for ``key`` (``n`` points), or None on a miss.
+
+        An unreadable entry (truncated / corrupt / missing file) is removed
+        and reported as a miss, so the next :meth:`store` replaces it.
+        """
+        d = self._dir(key)
+        if not os.path.isdir(d):
+            return None
+        try:
+            rows, indptr, cols, weights = [np.load(os.path.join(d, f + ".npy"), mmap_mode="r") for f in _FIELDS]
+            if len(indptr) != len(rows) + 1 or len(cols) != len(weights) or indptr[-1] != len(cols):
+                raise ValueError("Inconsistent influence arrays")
+            os.utime(d)   # LRU: en son kullanılan en geç silinir
+        except (OSError, ValueError):
+            # Bozuk / yarım giriş silinir ki bir sonraki store yeniden yazabilsin
+            shutil.rmtree(d, ignore_errors=True)
+            return None
+        return propagate.Influence(n, rows, indptr, cols, weights)
+
+    def store(self, key: str, infl: propagate.Influence):
+        """Write ``infl`` under ``key`` (atomic folder rename), then evict down to ``max_bytes``.
+
+        A cache that cannot be written (read-only folder, full disk) is
+        skipped silently: it only ever costs the speed-up.
+        """
+        d = self._dir(key)
+        tmp = f"{d}.tmp{os.getpid()}"
+        try:
+            os.makedirs(tmp, exist_ok=True)
+            for f in _FIELDS:
+                np.save(os.path.join(tmp, f + ".npy"), np.ascontiguousarray(getattr(infl, f)))
+            os.replace(tmp, d)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self.evict(keep=key)
+
+    def entries(self):
+        """``(mtime, bytes, key)`` of every stored entry, oldest first."""
+        out = []
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return out
+        for name in names:
+            d = self._dir(name)
+            if ".tmp" in name or not os.path.isdir(d):
+                continue
+            try:
+                size = sum(os.path.getsize(os.path.join(d, f)) for f in os.listdir(d))
+                out.append((os.path.getmtime(d), size, name))
+            except OSError:
+                continue
+        out.sort()
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep: str = ""):
+        """Drop least recently used entries until the folder fits in ``max_bytes``."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            # Windows: hâlâ map'li bir giriş silinemez, bir sonraki sefere kalır
+            shutil.rmtree(self._dir(name), ignore_errors=True)
+            if not os.path.exists(self._dir(name)):
+                total -= size
+
+    def clear(self):
+        for _, _, name in self.entries():
+            shutil.rmtree(self._dir(name), ignore_errors=True)
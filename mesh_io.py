@@ -0,0 +1,307 @@
+"""Minimal OBJ / PLY reader-writer for the batch CLI (NumPy only, no bpy).
+
+Only what the straighten pipeline needs is decoded: vertex positions and
+face corner lists. Writing rewrites the vertex positions and keeps every
+other byte of the source file (normals, UVs, colors, groups, comments)
+as-is, so a processed file differs from its input only in ``v`` lines /
+vertex x, y, z.
+"""
+import os
+
+import numpy as np
+
+
+class MeshFile:
+    """A loaded mesh file: ``co`` (N, 3) float32, ``face_verts`` / ``face_sizes``."""
+
+    def __init__(self, path: str, co: np.ndarray, face_verts: np.ndarray, face_sizes: np.ndarray, writer):
+        self.path = path
+        self.co = co
+        self.face_verts = face_verts
+        self.face_sizes = face_sizes
+        self._writer = writer
+
+    def write(self, path: str, co: np.ndarray = None):
+        """Write the source file to ``path`` with vertex positions replaced by ``co``."""
+        self._writer(path, self.co if co is None else np.asarray(co))
+
+
+def load(path: str) -> MeshFile:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".obj":
+        return _load_obj(path)
+    if ext == ".ply":
+        return _load_ply(path)
+    raise ValueError(f"Unsupported mesh format: {ext or path}")
+
+
+# -----------------------------
+# OBJ
+# -----------------------------
+def _load_obj(path: str) -> MeshFile:
+    with open(path, "rb") as f:
+        lines = f.read().split(b"\n")
+
+    v_lines, co, face_verts, face_sizes = [], [], [], []
+    for i, line in enumerate(lines):
+        if line.startswith(b"v ") or line.startswith(b"v\t"):
+            v_lines.append(i)
+            co.append(line.split()[1:4])
+        elif line.startswith(b"f ") or line.startswith(b"f\t"):
+            corners = [int(tok.split(b"/", 1)[0]) for tok in line.split()[1:]]
+            n = len(v_lines)
+            # OBJ: 1-based, negatives relative to the vertices read so far
+            face_verts.extend(c - 1 if c > 0 else n + c for c in corners)
+            face_sizes.append(len(corners))
+
+    co = np.array(co, dtype=np.float32).reshape(-1, 3)
+    v_lines = np.array(v_lines, dtype=np.int64)
+
+    def write(out_path, new_co):
+        out = list(lines)
+        for i, p in zip(v_lines, new_co.tolist()):
+            # Trailing tokens (w / vertex colors) stay as they were
+            tail = out[i].split()[4:]
+            out[i] = b" ".join([b"v", *(b"%.9g" % x for x in p), *tail])
+        with open(out_path, "wb") as f:
+            f.write(b"\n".join(out))
+
+    return MeshFile(path, co, np.array(face_verts, dtype=np.int64), np.array(face_sizes, dtype=np.int64), write)
+
+
+# -----------------------------
+# PLY
+# -----------------------------
+_PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+
+def _ply_type(name: str) -> str:
+    try:
+        return _PLY_TYPES[name]
+    except KeyError:
+        raise ValueError(f"unsupported PLY type {name!r}") from None
+
+
+def _ply_header(f):
+    """Parse the header -> (format, elements, header bytes).
+
+    ``elements`` is a list of ``(name, count, props)`` where each prop is
+    ``(name, dtype)`` or ``(name, (count dtype, item dtype))`` for lists.
+    """
+    head = f.readline()
+    if head.strip() != b"ply":
+        raise ValueError("Not a PLY file")
+    raw, fmt, elements = [head], None, []
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("Truncated PLY header")
+        raw.append(line)
+        tok = line.decode("ascii", "replace").split()
+        if not tok:
+            continue
+        if tok[0] == "format":
+            fmt = tok[1]
+        elif tok[0] == "element":
+            elements.append((tok[1], int(tok[2]), []))
+        elif tok[0] == "property":
+            if tok[1] == "list":
+                elements[-1][2].append((tok[4], (_ply_type(tok[2]), _ply_type(tok[3]))))
+            else:
+                elements[-1][2].append((tok[2], _ply_type(tok[1])))
+        elif tok[0] == "end_header":
+            return fmt, elements, b"".join(raw)
+
+
+def _load_ply(path: str) -> MeshFile:
+    with open(path, "rb") as f:
+        fmt, elements, header = _ply_header(f)
+        body = f.read()
+    if fmt == "ascii":
+        return _load_ply_ascii(path, elements, header, body)
+    if fmt not in ("binary_little_endian", "binary_big_endian"):
+        raise ValueError(f"Unsupported PLY format: {fmt}")
+    return _load_ply_binary(path, elements, header, body, "<" if fmt == "binary_little_endian" else ">")
+
+
+def _vertex_axes(props):
+    names = [p[0] for p in props]
+    try:
+        return [names.index(a) for a in ("x", "y", "z")]
+    except ValueError:
+        raise ValueError("PLY vertex element has no x/y/z properties") from None
+
+
+def _load_ply_binary(path, elements, header, body, bo) -> MeshFile:
+    co = face_verts = face_sizes = None
+    pos = 0
+    vert_span = (0, 0)
+    vert_dtype = None
+    for name, count, props in elements:
+        if all(not isinstance(t, tuple) for _, t in props):
+            dt = np.dtype([(p, bo + t) for p, t in props])
+            arr = np.frombuffer(body, dtype=dt, count=count, offset=pos)
+            if name == "vertex":
+                _vertex_axes(props)
+                co = np.stack([arr[a] for a in ("x", "y", "z")], axis=1).astype(np.float32)
+                vert_span, vert_dtype = (pos, pos + dt.itemsize * count), dt
+            pos += dt.itemsize * count
+            continue
+        if name == "vertex":
+            raise ValueError("PLY vertex element with list properties is not supported")
+        if name == "face" and len(props) == 1 and count:
+            # Fast path: every face has the same corner count (all tris / all quads)
+            cdt, idt = np.dtype(bo + props[0][1][0]), np.dtype(bo + props[0][1][1])
+            n0 = int(np.frombuffer(body, dtype=cdt, count=1, offset=pos)[0])
+            dt = np.dtype([("n", cdt), ("v", idt, (n0,))])
+            if pos + dt.itemsize * count <= len(body):
+                arr = np.frombuffer(body, dtype=dt, count=count, offset=pos)
+                if np.all(arr["n"] == n0):
+                    face_verts = arr["v"].astype(np.int64).ravel()
+                    face_sizes = np.full(count, n0, dtype=np.int64)
+                    pos += dt.itemsize * count
+                    continue
+        # Elements with list properties: walk record by record
+        verts, sizes = [], []
+        for _ in range(count):
+            for pname, t in props:
+                if isinstance(t, tuple):
+                    cdt, idt = np.dtype(bo + t[0]), np.dtype(bo + t[1])
+                    n = int(np.frombuffer(body, dtype=cdt, count=1, offset=pos)[0])
+                    pos += cdt.itemsize
+                    if name == "face" and pname in ("vertex_indices", "vertex_index"):
+                        verts.append(np.frombuffer(body, dtype=idt, count=n, offset=pos))
+                        sizes.append(n)
+                    pos += idt.itemsize * n
+                else:
+                    pos += np.dtype(t).itemsize
+        if name == "face":
+            face_verts = np.concatenate(verts).astype(np.int64) if verts else np.empty(0, np.int64)
+            face_sizes = np.array(sizes, dtype=np.int64)
+
+    if co is None:
+        raise ValueError("PLY file has no vertex element")
+
+    def write(out_path, new_co):
+        # Vertex block in the file's own record layout; everything else raw
+        arr = np.frombuffer(body, dtype=vert_dtype, count=len(co), offset=vert_span[0]).copy()
+        for i, a in enumerate(("x", "y", "z")):
+            arr[a] = new_co[:, i]
+        with open(out_path, "wb") as f:
+            f.write(header)
+            f.write(body[:vert_span[0]])
+            f.write(arr.tobytes())
+            f.write(body[vert_span[1]:])
+
+    return MeshFile(path, co, _or_empty(face_verts), _or_empty(face_sizes), write)
+
+
+def _load_ply_ascii(path, elements, header, body) -> MeshFile:
+    lines = body.split(b"\n")
+    co = face_verts = face_sizes = None
+    row = 0
+    vert_rows = (0, 0)
+    axes = None
+    for name, count, props in elements:
+        block = lines[row:row + count]
+        if name == "vertex":
+            axes = _vertex_axes(props)
+            if any(isinstance(t, tuple) for _, t in props[:max(axes) + 1]):
+                raise ValueError("PLY vertex list properties before x/y/z are not supported")
+            co = np.array([[ln.split()[a] for a in axes] for ln in block], dtype=np.float32).reshape(-1, 3)
+            vert_rows = (row, row + count)
+        elif name == "face":
+            # vertex_indices is expected as the first property (as everyone writes it)
+            verts, sizes = [], []
+            for ln in block:
+                tok = ln.split()
+                n = int(tok[0])
+                verts.extend(int(t) for t in tok[1:1 + n])
+                sizes.append(n)
+            face_verts = np.array(verts, dtype=np.int64)
+            face_sizes = np.array(sizes, dtype=np.int64)
+        row += count
+
+    if co is None:
+        raise ValueError("PLY file has no vertex element")
+
+    def write(out_path, new_co):
+        out = list(lines)
+        for r, p in zip(range(*vert_rows), new_co.tolist()):
+            tok = out[r].split()
+            for a, x in zip(axes, p):
+                tok[a] = b"%.9g" % x
+            out[r] = b" ".join(tok)
+        with open(out_path, "wb") as f:
+            f.write(header)
+            f.write(b"\n".join(out))
+
+    return MeshFile(path, co, _or_empty(face_verts), _or_empty(face_sizes), write)
+
+
+# -----------------------------
+# Memory-mapped positions (out-of-core)
+# -----------------------------
+class VertexMap:
+    """(N, 3) position view straight onto a file; pages are read/written on demand."""
+
+    def __init__(self, path: str, co: np.ndarray, mm: np.memmap):
+        self.path = path
+        self.co = co
+        self._mm = mm
+
+    def flush(self):
+        if self._mm.mode != "r":
+            self._mm.flush()
+
+
+def memmap_vertices(path: str, mode: str = "r+") -> VertexMap:
+    """Map the vertex positions of a binary PLY (x, y, z adjacent, same type) or an (N, 3) .npy.
+
+    Nothing is loaded: slicing ``.co`` reads only the touched pages and
+    assignments write through to the file (``mode="r+"``).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        co = np.load(path, mmap_mode=mode)
+        if co.ndim != 2 or co.shape[1] != 3:
+            raise ValueError(f"Expected an (N, 3) array in {path}, got {co.shape}")
+        return VertexMap(path, co, co)
+    if ext != ".ply":
+        raise ValueError(f"Memory-mapped mode needs a binary .ply or .npy file, not {ext or path}")
+
+    with open(path, "rb") as f:
+        fmt, elements, header = _ply_header(f)
+    if fmt not in ("binary_little_endian", "binary_big_endian"):
+        raise ValueError("Memory-mapped mode needs a binary PLY (convert ascii files first)")
+    bo = "<" if fmt == "binary_little_endian" else ">"
+
+    offset = len(header)
+    for name, count, props in elements:
+        if any(isinstance(t, tuple) for _, t in props):
+            raise ValueError("PLY vertex element must come before elements with list properties")
+        dt = np.dtype([(p, bo + t) for p, t in props])
+        if name == "vertex":
+            break
+        offset += dt.itemsize * count
+    else:
+        raise ValueError("PLY file has no vertex element")
+
+    axes = _vertex_axes(props)
+    types = {props[a][1] for a in axes}
+    if len(types) != 1 or axes != list(range(axes[0], axes[0] + 3)) or types.pop() not in ("f4", "f8"):
+        raise ValueError("PLY x, y, z must be adjacent float properties for memory-mapped mode")
+    item = np.dtype(bo + props[axes[0]][1])
+    mm = np.memmap(path, dtype=np.uint8, mode=mode)
+    co = np.ndarray((count, 3), dtype=item, buffer=mm, offset=offset + dt.fields["x"][1],
+                    strides=(dt.itemsize, item.itemsize))
+    return VertexMap(path, co, mm)
+
+
+def _or_empty(a):
+    return np.empty(0, dtype=np.int64) if a is None else a
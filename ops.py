@@ -1,36 +1,49 @@
 import bpy
-import bmesh
-from mathutils import Vector, kdtree
+
+# Yalnızca ince operatör sınıfları: NumPy ve çekirdek modüller (pipeline -> core, ...)
+# ilk çalıştırmada yüklenir, register() sırasında değil.
 
 
 # -----------------------------
-# Helpers
+# Timing / profiling
 # -----------------------------
-def _smooth01(x: float) -> float:
-    x = 0.0 if x < 0.0 else (1.0 if x > 1.0 else x)
-    return x * x * (3.0 - 2.0 * x)
-
-
-def _selected_edges(bm: bmesh.types.BMesh):
-    bm.edges.ensure_lookup_table()
-    return [e for e in bm.edges if e.select]
+def draw_timings(layout, obj_name: str):
+    """Last run's phase table + rolling history summary for ``obj_name``."""
+    from . import profiling
+    box = layout.box()
+    stats = profiling.last(obj_name)
+    if stats is None:
+        box.label(text="No timed runs yet", icon='TIME')
+        return
+    box.label(text=f"Last run: {stats.total * 1000.0:.1f} ms  ({stats.label})", icon='TIME')
+    col = box.column(align=True)
+    for line in stats.lines():
+        col.label(text=line)
+
+    hist = profiling.history(obj_name)
+    if len(hist) > 1:
+        totals = [h.total * 1000.0 for h in hist]
+        box.label(text=f"Last {len(hist)} runs: min {min(totals):.1f} / avg {sum(totals) / len(totals):.1f}"
+                       f" / max {max(totals):.1f} ms")
+    if stats.profile_path:
+        box.label(text=f"Profile: {stats.profile_path}", icon='FILE')
 
 
-def _bbox_world_radius(obj: bpy.types.Object, frac: float = 0.15) -> float:
-    """Return a radius based on object's world-space bounding box."""
-    mw = obj.matrix_world
-    coords = [mw @ Vector(corner) for corner in obj.bound_box]
-    minv = Vector((min(c.x for c in coords), min(c.y for c in coords), min(c.z for c in coords)))
-    maxv = Vector((max(c.x for c in coords), max(c.y for c in coords), max(c.z for c in coords)))
-    diag = (maxv - minv).length
-    return diag * frac
+# -----------------------------
+# Scripting API (Object Mode)
+# -----------------------------
+def straighten_object(obj: bpy.types.Object, edges=None, attribute: str = "", **settings):
+    """Straighten + propagate on ``obj.data`` in Object Mode; see :func:`pipeline.straighten_object`."""
+    from . import pipeline
+    return pipeline.straighten_object(obj, edges, attribute, **settings)
 
 
 # -----------------------------
 # Operator
 # -----------------------------
 class MESH_OT_straighten_loop_and_propagate(bpy.types.Operator):
-    """Straighten the SELECTED EDGE LOOP along an axis, then propagate delta with falloff.
+    """Straighten the SELECTED EDGE LOOP(S) along an axis, then propagate delta with falloff.
+    Each connected loop in the selection gets its own line; all deltas propagate in one pass.
     NOTE: En iyi sonuç için önce Alt+Click ile merkez edge loop'u seç.
     """
     bl_idname = "mesh.estraighten_loop"
@@ -80,7 +93,7 @@ class MESH_OT_straighten_loop_and_propagate(bpy.types.Operator):
         description="Sample this many nearest loop points to blend the delta",
         default=5,
         min=1,
-        max=12,
+        max=128,
     )
 
     only_same_island = bpy.props.BoolProperty(
@@ -108,178 +121,217 @@ class MESH_OT_straighten_loop_and_propagate(bpy.types.Operator):
         default="",
     )
 
+    falloff_metric = bpy.props.EnumProperty(
+        name="Falloff Metric",
+        description="How distance to the loop is measured",
+        items=[
+            ("EUCLIDEAN", "Euclidean", "Straight-line distance to the nearest loop points"),
+            ("GEODESIC", "Geodesic", "Distance along mesh edges; does not leak across thin gaps (NumPy engine)"),
+        ],
+        default="EUCLIDEAN",
+    )
+
+    interpolation = bpy.props.EnumProperty(
+        name="Interpolation",
+        description="How a vertex samples the loop deltas (Euclidean metric)",
+        items=[
+            ("NEAREST", "K Nearest", "Falloff-weighted blend of the K nearest loop points"),
+            ("POLYLINE", "Polyline", "Project onto the nearest loop segment and interpolate its two end deltas; "
+                                     "seam-free, cost independent of loop density (NumPy engine)"),
+        ],
+        default="NEAREST",
+    )
+
+    relax = bpy.props.EnumProperty(
+        name="Relax",
+        description="Smooth the moved region afterwards (moved vertices + one ring, loop pinned)",
+        items=[
+            ("NONE", "None", "No post-pass"),
+            ("LAPLACIAN", "Laplacian", "Uniform Laplacian smoothing (shrinks slightly) (NumPy engine)"),
+            ("TAUBIN", "Taubin", "Laplacian + inflate step, evens out quads without shrinking (NumPy engine)"),
+        ],
+        default="NONE",
+    )
+
+    relax_iterations = bpy.props.IntProperty(
+        name="Relax Iterations",
+        description="Smoothing iterations of the relax post-pass",
+        default=3,
+        min=1,
+        max=100,
+    )
+
+    relax_factor = bpy.props.FloatProperty(
+        name="Relax Factor",
+        description="Step towards the neighbour average per iteration",
+        default=0.5,
+        min=0.0,
+        max=1.0,
+    )
+
+    output = bpy.props.EnumProperty(
+        name="Output",
+        description="Where the result goes",
+        items=[
+            ("MESH", "Mesh", "Move the vertices (destructive)"),
+            ("SHAPE_KEY", "Shape Key", "Store the offset as a shape key; key value = Strength, animatable "
+                                       "(NumPy engine)"),
+            ("ATTRIBUTE", "Attribute", "Store the offset as a FLOAT_VECTOR point attribute for Geometry Nodes / "
+                                       "scripts; vertices are not moved (NumPy engine)"),
+        ],
+        default="MESH",
+    )
+
+    output_name = bpy.props.StringProperty(
+        name="Output Name",
+        description="Shape key / attribute name (overwritten on re-run)",
+        default="Straighten",
+    )
+
+    engine = bpy.props.EnumProperty(
+        name="Engine",
+        description="Propagation implementation",
+        items=[
+            ("NUMPY", "NumPy", "Vectorized: bulk read, batched falloff math, one bulk write"),
+            ("BMESH", "BMesh", "Per-vertex Python loop over bm.verts (reference)"),
+        ],
+        default="NUMPY",
+    )
+
+    # --- Object Mode: loop kaynağı (Edit Mode'da her zaman edit seçimi) ---
+    loop_source = bpy.props.EnumProperty(
+        name="Loop Source",
+        description="Where the loop edges come from in Object Mode",
+        items=[
+            ("SELECTION", "Stored Selection", "Edge selection stored in the mesh"),
+            ("ATTRIBUTE", "Edge Attribute", "Edges flagged in an EDGE-domain attribute"),
+            ("INDICES", "Edge Indices", "Explicit edge index list"),
+        ],
+        default="SELECTION",
+    )
+
+    edge_attribute = bpy.props.StringProperty(
+        name="Edge Attribute",
+        description="EDGE-domain bool/int/float attribute marking loop edges (non-zero)",
+        default="",
+    )
+
+    edge_indices = bpy.props.StringProperty(
+        name="Edge Indices",
+        description="Loop edge indices, separated by commas or spaces",
+        default="",
+    )
+
+    def draw(self, ctx):
+        layout = self.layout
+        for prop in self.properties.bl_rna.properties:
+            if prop.identifier != "rna_type":
+                layout.prop(self, prop.identifier)
+        if ctx.object is not None:
+            draw_timings(layout, ctx.object.name)
+
     def execute(self, ctx):
-        obj = ctx.object
-        if not obj or obj.type != 'MESH':
-            self.report({'ERROR'}, "Active object must be a Mesh")
-            return {'CANCELLED'}
-        if obj.mode != 'EDIT':
-            self.report({'ERROR'}, "Switch to Edit Mode")
-            return {'CANCELLED'}
+        from . import pipeline
+        return pipeline.run(self, ctx)
+
+    def _needs_numpy(self) -> bool:
+        return (self.falloff_metric == 'GEODESIC' or self.interpolation == 'POLYLINE' or self.output != 'MESH'
+                or self.relax != 'NONE')
+
+
+class MESH_OT_straighten_loop_live(bpy.types.Operator):
+    """Live Straighten: drag = Strength, wheel = Radius, Enter/LMB confirm, Esc/RMB cancel.
+    Diğer ayarlar (Axis, K, Smooth, ada, vgroup) paneldeki scene ayarlarından gelir.
+    """
+    bl_idname = "mesh.estraighten_loop_live"
+    bl_label = "Live Straighten"
+    bl_options = {'REGISTER', 'UNDO', 'GRAB_CURSOR', 'BLOCKING'}
+
+    # Strength change per horizontal mouse pixel, radius factor per wheel step
+    STRENGTH_PER_PIXEL = 0.004
+    RADIUS_STEP = 1.1
 
-        me = obj.data
-        bm = bmesh.from_edit_mesh(me)
-        bm.verts.ensure_lookup_table()
-        bm.edges.ensure_lookup_table()
+    radius = bpy.props.FloatProperty(
+        name="Falloff Radius",
+        description="0 = Auto (bbox-based). World units.",
+        default=0.0,
+        min=0.0,
+    )
 
-        sel_edges = _selected_edges(bm)
-        if len(sel_edges) == 0:
-            self.report({'ERROR'}, "Select an EDGE LOOP (Alt+Click) or at least ONE edge")
+    strength = bpy.props.FloatProperty(
+        name="Strength",
+        description="Overall influence for propagation",
+        default=1.0,
+        min=0.0,
+        max=1.0,
+    )
+
+    def invoke(self, ctx, event):
+        from . import pipeline
+        self.radius = ctx.scene.esp_radius
+        self.strength = ctx.scene.esp_strength
+        if not pipeline.live_setup(self, ctx):
             return {'CANCELLED'}
 
-        # ---- Loop'ı belirle (tercihen kullanıcının seçtiği kenarlar) ----
-        # Eğer birden fazla edge seçiliyse: onu loop olarak kabul et.
-        # Eğer tek edge seçiliyse: Blender operatörüyle loop'a genişlet (yalnızca tek halka kalsın).
-        if len(sel_edges) == 1:
-            try:
-                # Geçerli edit selection'dan loop'u genişlet
-                bpy.ops.mesh.loop_select()  # Alt+Click'e denk davranış
-            except Exception:
-                pass
-            sel_edges = _selected_edges(bm)
-
-        # Loop verteks seti:
-        loop_verts = {v for e in sel_edges for v in e.verts}
-        if len(loop_verts) < 2:
-            self.report({'ERROR'}, "Edge loop could not be determined. Alt+Click ile loop'u seçmeyi dene.")
+        self._start_x = event.mouse_x
+        self._start_strength = self.strength
+        pipeline.live_update(self, rebuild=True)
+        self._header(ctx)
+        ctx.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, ctx, event):
+        from . import pipeline
+        if event.type == 'MOUSEMOVE':
+            s = self._start_strength + (event.mouse_x - self._start_x) * self.STRENGTH_PER_PIXEL
+            s = min(1.0, max(0.0, s))
+            if s != self.strength:
+                self.strength = s
+                pipeline.live_update(self, rebuild=False)
+                self._header(ctx)
+
+        elif event.type in {'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}:
+            step = self.RADIUS_STEP if event.type == 'WHEELUPMOUSE' else 1.0 / self.RADIUS_STEP
+            self._R *= step
+            self.radius = self._R
+            pipeline.live_update(self, rebuild=True)
+            self._header(ctx)
+
+        elif event.type in {'LEFTMOUSE', 'RET', 'NUMPAD_ENTER'} and event.value == 'PRESS':
+            ctx.area.header_text_set(None)
+            ctx.scene.esp_strength = self.strength
+            ctx.scene.esp_radius = self.radius
+            pipeline.live_report(self)
+            return {'FINISHED'}
+
+        elif event.type in {'RIGHTMOUSE', 'ESC'} and event.value == 'PRESS':
+            ctx.area.header_text_set(None)
+            pipeline.live_restore(self)
             return {'CANCELLED'}
 
-        # ---- Ada filtresi (isteğe bağlı) ----
-        island_mask = None
-        if self.only_same_island:
-            # basit bağlı bileşen: loop'taki vertexlerden BFS
-            stack = list(loop_verts)
-            seen = {v.index for v in loop_verts}
-            while stack:
-                v = stack.pop()
-                for e in v.link_edges:
-                    for nv in e.verts:
-                        if nv.index not in seen:
-                            seen.add(nv.index)
-                            stack.append(nv)
-            island_mask = seen  # vertex index set
-
-        mw = obj.matrix_world
-        imw = mw.inverted()
-
-        # ---- Auto Radius (gerekirse) ----
-        R = self.radius if self.radius > 0.0 else _bbox_world_radius(obj, 0.15)
-
-        # ---- Loop world-space pozisyonları ve centroid ----
-        loop_world = [mw @ v.co for v in loop_verts]
-        centroid = sum(loop_world, Vector((0, 0, 0))) / max(1, len(loop_world))
-
-        keep_idx = {"X": 0, "Y": 1, "Z": 2}[self.axis]
-        flat_idxs = [i for i in (0, 1, 2) if i != keep_idx]
-
-        target_vals = [centroid.x, centroid.y, centroid.z]
-        if self.flatten_to_zero:
-            target_vals[flat_idxs[0]] = 0.0
-            target_vals[flat_idxs[1]] = 0.0
-
-        # ---- Loop'u düzleştir & delta'ları kaydet ----
-        deltas = {}
-        before = {}
-        for v in loop_verts:
-            Pw = mw @ v.co
-            newc = [Pw.x, Pw.y, Pw.z]
-            newc[flat_idxs[0]] = target_vals[flat_idxs[0]]
-            newc[flat_idxs[1]] = target_vals[flat_idxs[1]]
-            newP = Vector(newc)
-            before[v.index] = Pw
-            deltas[v.index] = (newP - Pw)
-
-        for v in loop_verts:
-            v.co = imw @ (before[v.index] + deltas[v.index])
-
-        bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
-
-        # ---- KD-tree: LOOP'un ESKİ pozisyonları ----
-        kd = kdtree.KDTree(len(before))
-        index_to_vid = []
-        for i, (vid, pos) in enumerate(before.items()):
-            kd.insert(pos, i)
-            index_to_vid.append(vid)
-        kd.balance()
-
-        # Local copies for speed
-        S = self.strength
-        K = max(1, self.k_nearest)
-        keepY = (self.axis == "Y") and self.keep_Y_when_Y_axis
-
-        # Vertex group pre-setup
-        use_vg = self.use_vgroup and bool(self.vgroup_name)
-        vg_index = None
-        deform_layer = None
-        if use_vg:
-            vg = obj.vertex_groups.get(self.vgroup_name)
-            if vg is None:
-                self.report({'WARNING'}, f"Vertex group '{self.vgroup_name}' not found — disabling vgroup modulation")
-                use_vg = False
-            else:
-                vg_index = vg.index
-                deform_layer = bm.verts.layers.deform.active
-
-        affected = 0
-        max_shift = 0.0
-
-        # ---- Yayılım ----
-        for v in bm.verts:
-            if v in loop_verts:
-                continue
-            if island_mask and (v.index not in island_mask):
-                continue
-
-            Pw = mw @ v.co
-            near = kd.find_n(Pw, K)
-            if not near:
-                continue
-
-            accum = Vector((0, 0, 0))
-            wsum = 0.0
-            for (pos, idx, dist) in near:
-                vid = index_to_vid[idx]
-                delta = deltas[vid]
-
-                t = 1.0 - max(0.0, min(1.0, dist / R))
-                w = _smooth01(t) if self.smooth else t
-
-                accum += delta * w
-                wsum += w
-
-            if wsum <= 1e-12:
-                continue
-
-            avg_delta = (accum / wsum) * S
-
-            # Vertex group ile modülasyon (0..1)
-            if use_vg and deform_layer is not None:
-                try:
-                    vg_w = v[deform_layer].get(vg_index, 0.0)
-                except Exception:
-                    vg_w = 0.0
-                avg_delta *= vg_w
-
-            newP = Pw + avg_delta
-
-            if keepY:
-                newP.y = Pw.y  # Y ekseninde yükseklik korunur
-
-            v.co = imw @ newP
-            affected += 1
-            sh = (avg_delta if not keepY else Vector((avg_delta.x, 0.0, avg_delta.z))).length
-            if sh > max_shift:
-                max_shift = sh
-
-        bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
-        self.report({'INFO'}, f"Loop: {len(loop_verts)} | Propagated: {affected} | Max shift: {max_shift:.5f} | Radius: {R:.2f}")
+        return {'RUNNING_MODAL'}
+
+    def execute(self, ctx):
+        # Redo panel / script: non-interactive, same pipeline
+        from . import pipeline
+        if not pipeline.live_setup(self, ctx):
+            return {'CANCELLED'}
+        pipeline.live_update(self, rebuild=True)
+        pipeline.live_report(self)
         return {'FINISHED'}
 
+    # Modal state (_R, _cur, ...) lives on the operator; pipeline.live_setup fills it
+    def _header(self, ctx):
+        ctx.area.header_text_set(
+            f"Strength: {self.strength:.3f}  Radius: {self._R:.3f}  |  "
+            "Drag: Strength  Wheel: Radius  Enter/LMB: Confirm  Esc/RMB: Cancel"
+        )
+
 
 # -----------------------------
 # Register
 # -----------------------------
-CLASSES = (MESH_OT_straighten_loop_and_propagate,)
+CLASSES = (MESH_OT_straighten_loop_and_propagate, MESH_OT_straighten_loop_live)
 
 def register():
     for c in CLASSES:
@@ -0,0 +1,717 @@
+"""Blender side of the straighten pipeline: bulk mesh I/O around :mod:`core` (bpy + NumPy).
+
+Imported on the first operator run or script call, not at ``register()``:
+``ops.py`` only registers thin operator classes, so enabling the add-on
+(and ``blender -b`` farm sessions) does not load NumPy or the core modules.
+The operators hand themselves in as ``op`` (settings, ``report``, and the
+Live Straighten state kept between modal events).
+"""
+import os
+
+import bpy
+import bmesh
+import numpy as np
+from mathutils import Vector, kdtree
+
+from . import cache, core, diskcache, profiling, propagate, topology
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _smooth01(x: float) -> float:
+    x = 0.0 if x < 0.0 else (1.0 if x > 1.0 else x)
+    return x * x * (3.0 - 2.0 * x)
+
+
+def _selected_edge_indices(me: bpy.types.Mesh) -> np.ndarray:
+    """Indices of selected edges, read in bulk from mesh data."""
+    sel = np.empty(len(me.edges), dtype=bool)
+    me.edges.foreach_get("select", sel)
+    return np.flatnonzero(sel)
+
+
+def _attribute_edge_indices(me: bpy.types.Mesh, name: str):
+    """Edges flagged (non-zero) in an EDGE-domain attribute; None if there is no such attribute."""
+    attr = me.attributes.get(name)
+    if attr is None or attr.domain != 'EDGE':
+        return None
+    if attr.data_type == 'BOOLEAN':
+        vals = np.empty(len(me.edges), dtype=bool)
+    elif attr.data_type in {'INT', 'INT8'}:
+        vals = np.empty(len(me.edges), dtype=np.int32)
+    elif attr.data_type == 'FLOAT':
+        vals = np.empty(len(me.edges), dtype=np.float32)
+    else:
+        return None
+    attr.data.foreach_get("value", vals)
+    return np.flatnonzero(vals)
+
+
+def _parse_edge_indices(text: str, n_edges: int) -> np.ndarray:
+    """'12, 13 40' -> valid edge indices."""
+    vals = [int(t) for t in text.replace(",", " ").split() if t.lstrip("-").isdigit()]
+    idx = np.array(vals, dtype=np.int64)
+    return idx[(idx >= 0) & (idx < n_edges)]
+
+
+def _mesh_topology(me: bpy.types.Mesh) -> topology.MeshTopology:
+    """Build vertex/edge/face adjacency from bulk mesh arrays."""
+    ev = np.empty(len(me.edges) * 2, dtype=np.int32)
+    me.edges.foreach_get("vertices", ev)
+    loop_edges = np.empty(len(me.loops), dtype=np.int32)
+    me.loops.foreach_get("edge_index", loop_edges)
+    loop_start = np.empty(len(me.polygons), dtype=np.int32)
+    me.polygons.foreach_get("loop_start", loop_start)
+    loop_total = np.empty(len(me.polygons), dtype=np.int32)
+    me.polygons.foreach_get("loop_total", loop_total)
+    return topology.MeshTopology.from_polygons(len(me.vertices), ev, loop_edges, loop_start, loop_total)
+
+
+def _bbox_world_radius(obj: bpy.types.Object, frac: float = 0.15) -> float:
+    """Return a radius based on object's world-space bounding box."""
+    mw = obj.matrix_world
+    coords = [mw @ Vector(corner) for corner in obj.bound_box]
+    minv = Vector((min(c.x for c in coords), min(c.y for c in coords), min(c.z for c in coords)))
+    maxv = Vector((max(c.x for c in coords), max(c.y for c in coords), max(c.z for c in coords)))
+    diag = (maxv - minv).length
+    return diag * frac
+
+
+def _matrix_np(m) -> np.ndarray:
+    """mathutils.Matrix -> (4, 4) float64 array."""
+    return np.array([tuple(row) for row in m], dtype=np.float64)
+
+
+def _read_coords(me: bpy.types.Mesh) -> np.ndarray:
+    """All vertex coordinates of ``me`` as an (N, 3) float32 array (Blender's own precision)."""
+    co = np.empty(len(me.vertices) * 3, dtype=np.float32)
+    me.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+
+def _reload_edit_bmesh(me: bpy.types.Mesh, bm: bmesh.types.BMesh):
+    """Rebuild the edit BMesh from ``me`` after a bulk write into mesh data.
+
+    ``bm.clear()`` frees every element, so the edit-mesh triangle cache has
+    to be rebuilt (``destructive``) or the viewport reads freed loops. The
+    select history comes back from ``me`` (written by ``update_from_editmode``).
+    """
+    bm.clear()
+    bm.from_mesh(me)
+    bmesh.update_edit_mesh(me, loop_triangles=True, destructive=True)
+
+
+def _write_edit_coords(obj: bpy.types.Object, bm: bmesh.types.BMesh, co: np.ndarray):
+    """Write (N, 3) local coordinates back in one bulk set and reload the edit BMesh."""
+    me = obj.data
+    me.vertices.foreach_set("co", np.ascontiguousarray(co, dtype=np.float32).ravel())
+    _reload_edit_bmesh(me, bm)
+
+
+def _write_mesh_coords(me: bpy.types.Mesh, co: np.ndarray):
+    """Object Mode: one bulk set into mesh data and a single update.
+
+    With shape keys the reference key overrides the vertex positions (in
+    Object Mode and on entering Edit Mode), so it is written as well; keys
+    relative to it get the same offset, as when the basis is edited in
+    Edit Mode.
+    """
+    flat = np.ascontiguousarray(co, dtype=np.float32).ravel()
+    me.vertices.foreach_set("co", flat)
+    if me.shape_keys is not None:
+        ref = me.shape_keys.reference_key
+        old = np.empty_like(flat)
+        ref.data.foreach_get("co", old)
+        ref.data.foreach_set("co", flat)
+        shift = flat - old
+        for kb in me.shape_keys.key_blocks:
+            if kb != ref and kb.relative_key == ref:
+                kco = np.empty_like(flat)
+                kb.data.foreach_get("co", kco)
+                kb.data.foreach_set("co", kco + shift)
+    me.update()
+
+
+def _write_offset_field(props, obj: bpy.types.Object, bm, offset: np.ndarray):
+    """Non-destructive output: the (N, 3) local offset at strength 1 as a shape key or point attribute.
+
+    Vertex positions stay as they are. ``SHAPE_KEY``: key = reference key +
+    offset, key value = Strength (animatable, blended by Blender).
+    ``ATTRIBUTE``: FLOAT_VECTOR point attribute holding the offset, for
+    Geometry Nodes (Set Position, Offset = attribute * strength) or
+    scripts. Written in bulk to mesh data (in Edit Mode the BMesh is then
+    reloaded like in :func:`_write_edit_coords`; the attribute is written
+    through a switch to Object Mode and back, which invalidates ``bm``).
+    Returns an error message or None.
+    """
+    me = obj.data
+    name = props.output_name or "Straighten"
+    offset = np.ascontiguousarray(offset, dtype=np.float32)
+    if props.output == 'SHAPE_KEY':
+        # İsim çakışması hiçbir key eklenmeden reddedilir (undo adımında yarım Basis kalmasın)
+        ref_name = "Basis" if me.shape_keys is None else me.shape_keys.reference_key.name
+        if name == ref_name:
+            return f"'{name}' is the basis shape key, choose another output name"
+        if me.shape_keys is None:
+            obj.shape_key_add(name=ref_name, from_mix=False)
+        kb = me.shape_keys.key_blocks.get(name)
+        if kb is None:
+            kb = obj.shape_key_add(name=name, from_mix=False)
+        ref = np.empty(len(me.vertices) * 3, dtype=np.float32)
+        kb.relative_key.data.foreach_get("co", ref)
+        kb.data.foreach_set("co", ref + offset.ravel())
+        kb.value = props.strength
+    elif bm is not None:
+        # Edit Mode: attribute data lives in the BMesh and me.attributes[...].data reads as
+        # empty, so no bulk write is possible here: Object Mode round trip (one bm -> mesh,
+        # one foreach_set, one mesh -> bm; select history is kept)
+        bpy.ops.object.mode_set(mode='OBJECT')
+        try:
+            return _write_offset_field(props, obj, None, offset)
+        finally:
+            bpy.ops.object.mode_set(mode='EDIT')
+    else:
+        attr = me.attributes.get(name)
+        if attr is not None and (attr.domain != 'POINT' or attr.data_type != 'FLOAT_VECTOR'):
+            return f"Attribute '{name}' exists with another type, choose another output name"
+        if attr is None:
+            attr = me.attributes.new(name, 'FLOAT_VECTOR', 'POINT')
+        attr.data.foreach_set("vector", offset.ravel())
+
+    if bm is not None:
+        _reload_edit_bmesh(me, bm)
+    else:
+        me.update()
+    return None
+
+
+def _write_edit_subset(obj: bpy.types.Object, bm: bmesh.types.BMesh, idx: np.ndarray, co: np.ndarray):
+    """Write local coordinates for the vertices in ``idx`` only (interactive updates)."""
+    bm.verts.ensure_lookup_table()
+    verts = bm.verts
+    for i, c in zip(idx.tolist(), co.tolist()):
+        verts[i].co = c
+    bmesh.update_edit_mesh(obj.data, loop_triangles=False, destructive=False)
+
+
+# -----------------------------
+# Shared pipeline steps
+# -----------------------------
+def _topology_for(obj: bpy.types.Object, topo_sig: tuple) -> topology.MeshTopology:
+    key = (obj.name, topo_sig)
+    topo = cache.get_topology(key)
+    if topo is None:
+        topo = _mesh_topology(obj.data)
+        cache.put_topology(key, topo)
+    return topo
+
+
+def _resolve_loop(obj: bpy.types.Object, sel: np.ndarray, co: np.ndarray):
+    """Loop state for the edge indices ``sel``, from the session cache when possible.
+
+    ``obj.data`` must be in sync (Object Mode, or after ``update_from_editmode``);
+    ``co`` are its local coordinates. Returns ``(entry, None)`` or
+    ``(None, error message)``.
+    """
+    me = obj.data
+    if len(sel) == 0:
+        return None, "Select an EDGE LOOP (Alt+Click) or at least ONE edge"
+
+    mw = _matrix_np(obj.matrix_world)
+
+    # ---- Redo cache: aynı obje + topoloji + seçim → loop/ada/KD tekrar kullan ----
+    topo_sig = cache.topology_signature(me)
+    key = (obj.name, topo_sig, sel.tobytes())
+    entry = cache.get(key)
+    if entry is not None and not np.array_equal(core.loop_world(co, entry.loop_idx, mw), entry.loop_world):
+        cache.discard(key)
+        entry = None
+
+    if entry is None:
+        entry = core.build_loop(_topology_for(obj, topo_sig), sel, co, mw)
+        if entry is None:
+            return None, "Edge loop could not be determined. Alt+Click ile loop'u seçmeyi dene."
+        cache.put(key, entry)
+    return entry, None
+
+
+def _vgroup_weights(op, obj, bm, vgroup_name: str, rows, n: int):
+    """Dense (n,) float32 vertex group weights, filled for ``rows`` (None = all); None if unavailable.
+
+    One pass over the requested vertices, no per-vertex exceptions: the edit
+    BMesh deform layer when ``bm`` is given, the mesh's group memberships otherwise.
+    """
+    vg = obj.vertex_groups.get(vgroup_name)
+    if vg is None:
+        op.report({'WARNING'}, f"Vertex group '{vgroup_name}' not found — disabling vgroup modulation")
+        return None
+    vg_index = vg.index
+    weights = np.zeros(n, dtype=np.float32)
+    if rows is None:
+        rows = np.arange(n)
+    if len(rows) == 0:
+        return weights
+
+    if bm is None:
+        verts = obj.data.vertices
+        weights[rows] = [next((g.weight for g in verts[i].groups if g.group == vg_index), 0.0)
+                         for i in rows.tolist()]
+        return weights
+
+    deform_layer = bm.verts.layers.deform.active
+    if deform_layer is None:
+        return None
+    bm.verts.ensure_lookup_table()
+    verts = bm.verts
+    weights[rows] = [verts[i][deform_layer].get(vg_index, 0.0) for i in rows.tolist()]
+    return weights
+
+
+def _solve_numpy(props, obj, bm, entry: cache.LoopEntry, co: np.ndarray, island_mask,
+                 R: float, flat_idxs, targets, timer=profiling.NULL):
+    """Blender adapter around :func:`core.solve`: world matrix, vertex group, thread count.
+
+    ``props`` carries the operator settings (the operator itself, or
+    :class:`Settings` for scripted runs). Returns ``(co, affected, max_shift)``
+    with ``co`` updated in place; the caller writes the result.
+    Shape key / attribute output solves at strength 1: ``co`` then is the
+    full offset target and Strength is applied when blending it.
+    """
+    def read_vgroup(rows):
+        return _vgroup_weights(props, obj, bm, props.vgroup_name, rows, len(co))
+
+    weights = read_vgroup if (props.use_vgroup and props.vgroup_name) else None
+    strength = None if props.output == 'MESH' else 1.0
+    return core.solve(props, entry, co, _matrix_np(obj.matrix_world), island_mask, R, flat_idxs, targets,
+                      weights, _worker_count(), timer, _disk_cache(), strength)
+
+
+def _write_result(props, obj: bpy.types.Object, bm, co0: np.ndarray, co: np.ndarray):
+    """Write a solved coordinate array per ``props.output``; returns an error message or None."""
+    if props.output != 'MESH':
+        return _write_offset_field(props, obj, bm, co - co0)
+    if bm is not None:
+        _write_edit_coords(obj, bm, co)
+    else:
+        _write_mesh_coords(obj.data, co)
+    return None
+
+
+def _data_loop_edges(me: bpy.types.Mesh, source: str, attribute: str, indices: str):
+    """Object Mode loop source -> ``(edge indices, None)`` or ``(None, error message)``."""
+    if source == 'ATTRIBUTE':
+        sel = _attribute_edge_indices(me, attribute)
+        if sel is None:
+            return None, f"Edge attribute '{attribute}' not found (needs EDGE domain, bool/int/float)"
+        return sel, None
+    if source == 'INDICES':
+        return _parse_edge_indices(indices, len(me.edges)), None
+    return _selected_edge_indices(me), None
+
+
+def _run_data(props, obj: bpy.types.Object, sel: np.ndarray, timer=profiling.NULL):
+    """Shared Object Mode pipeline -> ``(result tuple, None)`` or ``(None, error message)``."""
+    me = obj.data
+    with timer.phase("Read", len(me.vertices)):
+        co = _read_coords(me)
+    with timer.phase("Loop"):
+        entry, err = _resolve_loop(obj, sel, co)
+        if entry is None:
+            return None, err
+        timer.count(len(entry.loop_idx))
+
+    island_mask = None
+    if props.only_same_island:
+        with timer.phase("Island"):
+            island_mask = core.island_for(entry)
+            timer.count(np.count_nonzero(island_mask))
+    R = props.radius if props.radius > 0.0 else _bbox_world_radius(obj, 0.15)
+    flat_idxs, targets = core.flatten_targets(entry, props.axis, props.flatten_to_zero)
+    co0 = co.copy() if props.output != 'MESH' else None
+    co, affected, max_shift = _solve_numpy(props, obj, None, entry, co, island_mask, R, flat_idxs, targets,
+                                           timer)
+    with timer.phase("Write", len(co)):
+        err = _write_result(props, obj, None, co0, co)
+    if err:
+        return None, err
+    return (entry.n_loops, len(entry.loop_idx), affected, max_shift, R), None
+
+
+# -----------------------------
+# Timing / profiling
+# -----------------------------
+def _addon_prefs(ctx):
+    addon = ctx.preferences.addons.get(__package__)
+    return addon.preferences if addon is not None else None
+
+
+def _worker_count() -> int:
+    """Propagation threads from the add-on preferences (0 = all cores)."""
+    prefs = _addon_prefs(bpy.context)
+    n = prefs.worker_threads if prefs is not None else 1
+    return n if n > 0 else (os.cpu_count() or 1)
+
+
+def _disk_cache():
+    """diskcache.DiskCache from the add-on preferences, or None when disabled."""
+    prefs = _addon_prefs(bpy.context)
+    if prefs is None or not prefs.disk_cache:
+        return None
+    return diskcache.DiskCache(bpy.path.abspath(prefs.disk_cache_dir), prefs.disk_cache_size_mb << 20)
+
+
+def _start_timer(ctx, obj: bpy.types.Object, label: str) -> profiling.PhaseTimer:
+    """Phase timer for one run; runs under cProfile when enabled in the preferences."""
+    prefs = _addon_prefs(ctx)
+    path = ""
+    if prefs is not None and prefs.profile_runs:
+        path = profiling.profile_path(bpy.path.abspath(prefs.profile_dir), obj.name)
+    return profiling.PhaseTimer(label, path).start()
+
+
+# -----------------------------
+# Scripting API (Object Mode)
+# -----------------------------
+Settings = core.Settings
+
+
+def straighten_object(obj: bpy.types.Object, edges=None, attribute: str = "", **settings):
+    """Straighten + propagate on ``obj.data`` in Object Mode, without BMesh.
+
+    The loop comes from ``edges`` (edge indices), else from the EDGE-domain
+    ``attribute``, else from the edge selection stored in the mesh.
+    Keyword settings match the operator properties (``output="SHAPE_KEY"``
+    keeps the mesh and writes a shape key instead). Returns a dict with
+    ``loops``, ``loop_verts``, ``affected``, ``max_shift`` and ``radius``.
+    Raises ValueError when the loop cannot be determined.
+    """
+    if obj is None or obj.type != 'MESH':
+        raise ValueError("Object must be a Mesh")
+    if obj.mode != 'OBJECT':
+        raise ValueError("straighten_object() needs Object Mode")
+
+    props = Settings(**settings)
+    me = obj.data
+    if edges is not None:
+        sel = np.asarray(edges, dtype=np.int64).ravel()
+        sel = sel[(sel >= 0) & (sel < len(me.edges))]
+    elif attribute:
+        sel, err = _data_loop_edges(me, 'ATTRIBUTE', attribute, "")
+        if sel is None:
+            raise ValueError(err)
+    else:
+        sel = _selected_edge_indices(me)
+
+    result, err = _run_data(props, obj, sel)
+    if result is None:
+        raise ValueError(err)
+    n_loops, n_loop_verts, affected, max_shift, R = result
+    return dict(loops=n_loops, loop_verts=n_loop_verts, affected=affected, max_shift=max_shift, radius=R)
+
+
+# -----------------------------
+# Straighten Loop & Propagate
+# -----------------------------
+def run(op, ctx):
+    """Operator ``execute``: Object Mode (mesh data) or Edit Mode run, timed and recorded."""
+    obj = ctx.object
+    if not obj or obj.type != 'MESH':
+        op.report({'ERROR'}, "Active object must be a Mesh")
+        return {'CANCELLED'}
+    if obj.mode not in {'OBJECT', 'EDIT'}:
+        op.report({'ERROR'}, "Switch to Edit Mode (or Object Mode)")
+        return {'CANCELLED'}
+
+    engine = 'NUMPY' if obj.mode == 'OBJECT' or op._needs_numpy() else op.engine
+    timer = _start_timer(ctx, obj, f"{obj.mode.title()} · {engine.title()}")
+    result = {'CANCELLED'}
+    try:
+        if obj.mode == 'OBJECT':
+            result = _execute_data(op, obj, timer)
+        else:
+            result = _execute_edit(op, obj, timer)
+    finally:
+        stats = timer.stop()
+    if 'FINISHED' in result:
+        profiling.record(obj.name, stats)
+        if stats.profile_path:
+            op.report({'INFO'}, f"Profile written: {stats.profile_path}")
+    return result
+
+
+def _execute_edit(op, obj, timer):
+    me = obj.data
+    bm = bmesh.from_edit_mesh(me)
+
+    # Edit-BMesh -> Mesh: seçim, topoloji ve koordinatlar toplu (bulk) okunabilsin
+    with timer.phase("Read", len(bm.verts)):
+        obj.update_from_editmode()
+        co = _read_coords(me)
+        sel = _selected_edge_indices(me)
+    with timer.phase("Loop"):
+        entry, err = _resolve_loop(obj, sel, co)
+        if entry is None:
+            op.report({'ERROR'}, err)
+            return {'CANCELLED'}
+        timer.count(len(entry.loop_idx))
+
+    # ---- Ada filtresi (isteğe bağlı) ----
+    island_mask = None
+    if op.only_same_island:
+        with timer.phase("Island"):
+            island_mask = core.island_for(entry)
+            timer.count(np.count_nonzero(island_mask))
+
+    # ---- Auto Radius (gerekirse) ----
+    R = op.radius if op.radius > 0.0 else _bbox_world_radius(obj, 0.15)
+
+    flat_idxs, targets = core.flatten_targets(entry, op.axis, op.flatten_to_zero)
+
+    # Geodesic falloff / polyline / relax / shape key çıktısı yalnızca NumPy motorunda
+    if op.engine == 'NUMPY' or op._needs_numpy():
+        co0 = co.copy() if op.output != 'MESH' else None
+        co, affected, max_shift = _solve_numpy(op, obj, bm, entry, co, island_mask, R, flat_idxs, targets,
+                                               timer)
+        with timer.phase("Write", len(co)):
+            err = _write_result(op, obj, bm, co0, co)
+        if err:
+            op.report({'ERROR'}, err)
+            return {'CANCELLED'}
+    else:
+        with timer.phase("Propagate (BMesh)"):
+            affected, max_shift = _propagate_bmesh(op, obj, bm, entry, island_mask, R, flat_idxs, targets)
+            timer.count(affected)
+
+    op.report({'INFO'}, f"Loops: {entry.n_loops} | Loop: {len(entry.loop_idx)} | Propagated: {affected} | Max shift: {max_shift:.5f} | Radius: {R:.2f}")
+    return {'FINISHED'}
+
+
+def _execute_data(op, obj, timer):
+    """Object Mode: mesh data arrays only, no BMesh, one bulk write + one update."""
+    me = obj.data
+    sel, err = _data_loop_edges(me, op.loop_source, op.edge_attribute, op.edge_indices)
+    if sel is None:
+        op.report({'ERROR'}, err)
+        return {'CANCELLED'}
+    result, err = _run_data(op, obj, sel, timer)
+    if result is None:
+        op.report({'ERROR'}, err)
+        return {'CANCELLED'}
+    n_loops, n_loop_verts, affected, max_shift, R = result
+    op.report({'INFO'}, f"Loops: {n_loops} | Loop: {n_loop_verts} | Propagated: {affected} | Max shift: {max_shift:.5f} | Radius: {R:.2f}")
+    return {'FINISHED'}
+
+# -----------------------------
+# Engines
+# -----------------------------
+
+
+def _propagate_bmesh(op, obj, bm, entry, island_mask, R, flat_idxs, targets):
+    """Reference engine: one Python iteration (and KD query) per vertex."""
+    me = obj.data
+    mw = obj.matrix_world
+    imw = mw.inverted()
+    bm.verts.ensure_lookup_table()
+    loop_verts = {bm.verts[i] for i in entry.loop_idx}
+    loop_target = {int(i): targets[g] for i, g in zip(entry.loop_idx, entry.loop_ids)}
+
+    # ---- Loop'u düzleştir & delta'ları kaydet ----
+    deltas = {}
+    before = {}
+    for v in loop_verts:
+        Pw = mw @ v.co
+        target_vals = loop_target[v.index]
+        newc = [Pw.x, Pw.y, Pw.z]
+        newc[flat_idxs[0]] = target_vals[flat_idxs[0]]
+        newc[flat_idxs[1]] = target_vals[flat_idxs[1]]
+        newP = Vector(newc)
+        before[v.index] = Pw
+        deltas[v.index] = (newP - Pw)
+
+    for v in loop_verts:
+        v.co = imw @ (before[v.index] + deltas[v.index])
+
+    bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
+
+    # ---- KD-tree: LOOP'un ESKİ pozisyonları ----
+    kd = kdtree.KDTree(len(before))
+    index_to_vid = []
+    for i, (vid, pos) in enumerate(before.items()):
+        kd.insert(pos, i)
+        index_to_vid.append(vid)
+    kd.balance()
+
+    # Local copies for speed
+    S = op.strength
+    K = max(1, op.k_nearest)
+    keepY = (op.axis == "Y") and op.keep_Y_when_Y_axis
+
+    # Vertex group pre-setup
+    use_vg = op.use_vgroup and bool(op.vgroup_name)
+    vg_index = None
+    deform_layer = None
+    if use_vg:
+        vg = obj.vertex_groups.get(op.vgroup_name)
+        if vg is None:
+            op.report({'WARNING'}, f"Vertex group '{op.vgroup_name}' not found — disabling vgroup modulation")
+            use_vg = False
+        else:
+            vg_index = vg.index
+            deform_layer = bm.verts.layers.deform.active
+
+    affected = 0
+    max_shift = 0.0
+
+    # ---- Yayılım ----
+    for v in bm.verts:
+        if v in loop_verts:
+            continue
+        if island_mask is not None and not island_mask[v.index]:
+            continue
+
+        # Vertex group ağırlığı 0 ise KD sorgusuna hiç girme
+        vg_w = 1.0
+        if use_vg and deform_layer is not None:
+            vg_w = v[deform_layer].get(vg_index, 0.0)
+            if vg_w <= 0.0:
+                continue
+
+        Pw = mw @ v.co
+        near = kd.find_n(Pw, K)
+        if not near:
+            continue
+
+        accum = Vector((0, 0, 0))
+        wsum = 0.0
+        for (pos, idx, dist) in near:
+            vid = index_to_vid[idx]
+            delta = deltas[vid]
+
+            t = 1.0 - max(0.0, min(1.0, dist / R))
+            w = _smooth01(t) if op.smooth else t
+
+            accum += delta * w
+            wsum += w
+
+        if wsum <= 1e-12:
+            continue
+
+        avg_delta = (accum / wsum) * S
+
+        # Vertex group ile modülasyon (0..1)
+        avg_delta *= vg_w
+
+        newP = Pw + avg_delta
+
+        if keepY:
+            newP.y = Pw.y  # Y ekseninde yükseklik korunur
+
+        v.co = imw @ newP
+        affected += 1
+        sh = (avg_delta if not keepY else Vector((avg_delta.x, 0.0, avg_delta.z))).length
+        if sh > max_shift:
+            max_shift = sh
+
+    bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
+    return affected, max_shift
+
+
+# -----------------------------
+# Live Straighten
+# -----------------------------
+def live_setup(op, ctx) -> bool:
+    """Build everything the modal needs once: loop, influence inputs, original coords."""
+    obj = ctx.object
+    if not obj or obj.type != 'MESH':
+        op.report({'ERROR'}, "Active object must be a Mesh")
+        return False
+    if obj.mode != 'EDIT':
+        op.report({'ERROR'}, "Switch to Edit Mode")
+        return False
+
+    sc = ctx.scene
+    me = obj.data
+    bm = bmesh.from_edit_mesh(me)
+    obj.update_from_editmode()
+    co = _read_coords(me)
+    entry, err = _resolve_loop(obj, _selected_edge_indices(me), co)
+    if entry is None:
+        op.report({'ERROR'}, err)
+        return False
+
+    op._obj, op._bm, op._entry = obj, bm, entry
+    op._island = core.island_for(entry) if sc.esp_only_same_island else None
+    op._R = op.radius if op.radius > 0.0 else _bbox_world_radius(obj, 0.15)
+    op._K = max(1, sc.esp_knearest)
+    op._smooth = sc.esp_smooth
+    op._metric = sc.esp_falloff_metric
+    op._interpolation = sc.esp_interpolation
+    op._keep_axis = 1 if (sc.esp_axis == "Y" and sc.esp_keep_y_when_y_axis) else None
+    op._vgroup = sc.esp_vgroup_name if sc.esp_use_vgroup else ""
+    op._workers = _worker_count()
+
+    # Original coordinates: local (for restore) and world (for offsets)
+    mw = _matrix_np(obj.matrix_world)
+    op._mw = mw
+    op._imw = np.linalg.inv(mw)
+    op._co0 = co
+    op._world0 = propagate.transform_points(mw, op._co0)
+    op._sig = cache.coords_signature(op._co0)
+
+    # Loop is flattened once; only the propagated offsets change afterwards
+    flat_idxs, targets = core.flatten_targets(entry, sc.esp_axis, sc.esp_flatten_zero)
+    after, op._deltas = core.loop_deltas(entry, flat_idxs, targets)
+    _write_edit_subset(obj, bm, entry.loop_idx, propagate.transform_points(op._imw, after))
+
+    # Vertex group: whole mesh once per session (radius changes with the wheel)
+    op._weights = None
+    if op._vgroup:
+        op._weights = _vgroup_weights(op, obj, bm, op._vgroup, None, len(co))
+
+    op._infl = None
+    op._shown = np.empty(0, dtype=np.int64)
+    op._cur = np.zeros((len(op._co0), 3), dtype=np.float32)
+    return True
+
+
+def live_update(op, rebuild: bool):
+    """Re-apply offsets, writing only vertices whose displacement changed."""
+    if rebuild or op._infl is None:
+        op._infl = core.influence_for(op._entry, op._world0, op._sig, op._island,
+                                      op._R, op._K, op._smooth, op._metric,
+                                      None if op._weights is None else op._weights > 0.0,
+                                      op._workers, op._interpolation)
+    infl = op._infl
+    offsets = infl.apply(op._deltas, op.strength, op._keep_axis, op._weights, op._workers)
+
+    # Previously displaced ∪ now influenced; vertices that dropped out go back to 0
+    touched = np.union1d(op._shown, infl.rows)
+    new = np.zeros((len(touched), 3), dtype=np.float32)
+    new[np.searchsorted(touched, infl.rows)] = offsets
+    diff = np.any(new != op._cur[touched], axis=1)
+    idx = touched[diff]
+    op._cur[idx] = new[diff]
+    op._shown = infl.rows.astype(np.int64)
+    if len(idx) == 0:
+        return
+
+    cur = op._cur[idx].astype(np.float64)
+    world = propagate.transform_points(op._mw, op._co0[idx].astype(np.float64))
+    local = propagate.transform_points(op._imw, world + cur)
+    rest = ~cur.any(axis=1)
+    local[rest] = op._co0[idx[rest]]
+    _write_edit_subset(op._obj, op._bm, idx, local)
+
+
+def live_restore(op):
+    """Put every vertex the preview touched back to its original position."""
+    idx = np.union1d(op._shown, op._entry.loop_idx)
+    _write_edit_subset(op._obj, op._bm, idx, op._co0[idx])
+
+
+def live_report(op):
+    """INFO report of the current preview (same fields as the one-shot operator)."""
+    shifts = np.linalg.norm(op._cur[op._shown], axis=1)
+    max_shift = float(shifts.max()) if len(shifts) else 0.0
+    op.report({'INFO'}, f"Loops: {op._entry.n_loops} | Loop: {len(op._entry.loop_idx)} | Propagated: {len(op._shown)} | Max shift: {max_shift:.5f} | Radius: {op._R:.2f}")
@@ -0,0 +1,139 @@
+"""Per-phase timing for operator runs.
+
+Pure Python, no bpy. The operator wraps each pipeline step in
+``timer.phase(name)``; finished runs go into a short per-object history
+that the redo panel and the N-panel read. With profiling enabled in the
+add-on preferences the whole run also executes under cProfile and the
+stats of the last run are dumped to a ``.prof`` file (open with
+``python -m pstats`` or snakeviz).
+"""
+import os
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+HISTORY_LEN = 20
+
+_history = {}   # object name -> deque[RunStats], newest last
+
+
+class RunStats:
+    """Timings of one finished run: ordered ``(phase, seconds, count)`` rows."""
+
+    __slots__ = ("label", "phases", "total", "stamp", "profile_path")
+
+    def __init__(self, label: str, phases: list, total: float, profile_path: str = ""):
+        self.label = label
+        self.phases = phases
+        self.total = total
+        self.stamp = time.time()
+        self.profile_path = profile_path
+
+    def lines(self) -> list:
+        """Human-readable rows for UI/console, one per phase."""
+        out = []
+        for name, sec, count in self.phases:
+            extra = f"  ({count:,} v)" if count is not None else ""
+            out.append(f"{name}: {sec * 1000.0:.1f} ms{extra}")
+        return out
+
+    def as_dict(self) -> dict:
+        return dict(label=self.label, total=self.total, stamp=self.stamp,
+                    phases=[dict(name=n, seconds=s, count=c) for n, s, c in self.phases])
+
+
+class PhaseTimer:
+    """Collects wall time (and an optional vertex count) per named phase."""
+
+    def __init__(self, label: str = "", profile_path: str = ""):
+        self.label = label
+        self.profile_path = profile_path
+        self._phases = []
+        self._profiler = None
+        self._t0 = None
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        if self.profile_path:
+            import cProfile   # only when profiling is enabled
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    @contextmanager
+    def phase(self, name: str, count=None):
+        row = [name, 0.0, count]
+        self._phases.append(row)
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            row[1] = time.perf_counter() - t
+
+    def count(self, value: int):
+        """Set the vertex count of the innermost open (or last) phase."""
+        if self._phases:
+            self._phases[-1][2] = int(value)
+
+    def stop(self) -> RunStats:
+        total = time.perf_counter() - self._t0 if self._t0 is not None else 0.0
+        path = ""
+        if self._profiler is not None:
+            self._profiler.disable()
+            try:
+                os.makedirs(os.path.dirname(self.profile_path) or ".", exist_ok=True)
+                self._profiler.dump_stats(self.profile_path)
+                path = self.profile_path
+            except OSError:
+                path = ""
+            self._profiler = None
+        return RunStats(self.label, [tuple(p) for p in self._phases], total, path)
+
+
+class _NullTimer(PhaseTimer):
+    """Drop-in timer for callers that don't collect stats (scripts, live mode)."""
+
+    @contextmanager
+    def phase(self, name: str, count=None):
+        yield
+
+    def count(self, value: int):
+        pass
+
+
+NULL = _NullTimer()
+
+
+def profile_path(directory: str, obj_name: str) -> str:
+    """``<directory or tempdir>/estraighten_<object>.prof`` (overwritten each run)."""
+    safe = re.sub(r"[^\w.-]+", "_", obj_name) or "object"
+    import tempfile
+    return os.path.join(directory or tempfile.gettempdir(), f"estraighten_{safe}.prof")
+
+
+# -----------------------------
+# Rolling history
+# -----------------------------
+def record(obj_name: str, stats: RunStats):
+    hist = _history.get(obj_name)
+    if hist is None:
+        hist = _history[obj_name] = deque(maxlen=HISTORY_LEN)
+    hist.append(stats)
+
+
+def history(obj_name: str) -> list:
+    return list(_history.get(obj_name, ()))
+
+
+def last(obj_name: str):
+    hist = _history.get(obj_name)
+    return hist[-1] if hist else None
+
+
+def clear(obj_name: str = None):
+    if obj_name is None:
+        _history.clear()
+    else:
+        _history.pop(obj_name, None)
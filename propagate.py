@@ -0,0 +1,248 @@
+"""Vectorized (NumPy) propagation engine.
+
+Pure array math, no bpy/bmesh: every function works on plain float arrays
+in world space so it can be driven from the operator or from scripts.
+
+``workers > 1`` splits the neighbour queries and the delta blend into
+contiguous chunks run on a thread pool (NumPy's sort/search/arithmetic
+kernels release the GIL). Chunk borders fall on the same query blocks the
+single-threaded path uses, so the result is bit-identical.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import spatial
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def smooth01(x: np.ndarray) -> np.ndarray:
+    """Array version of ops._smooth01 (clamped smoothstep)."""
+    x = np.clip(x, 0.0, 1.0)
+    return x * x * (3.0 - 2.0 * x)
+
+
+def falloff_weights(dist: np.ndarray, radius: float, smooth: bool) -> np.ndarray:
+    """Linear (or smoothstep) falloff: 1 at distance 0, 0 at ``radius``."""
+    t = 1.0 - np.clip(dist / radius, 0.0, 1.0)
+    return smooth01(t) if smooth else t
+
+
+def _row_weights(rows, cols, dist, radius: float, smooth: bool):
+    """One neighbour batch -> compact ``(rows, cols, weights)``, weights normalized per row.
+
+    Rows whose falloff weights sum to ~0 are dropped.
+    """
+    w = falloff_weights(dist, radius, smooth)
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    counts = np.diff(np.r_[starts, len(rows)])
+    wsum = np.add.reduceat(w, starts)
+    ok = wsum > 1e-12
+    keep = np.repeat(ok, counts)
+    w = w[keep] / np.repeat(wsum[ok], counts[ok])
+    # Batches are kept compact (int32 / float32) until the final concatenate
+    return rows[keep].astype(np.int32), cols[keep].astype(np.int32), w.astype(np.float32)
+
+
+def _segment_weights(index, rows, seg, t):
+    """Nearest-segment batch -> compact ``(rows, cols, weights)``: both ends, ``1 - t`` / ``t``."""
+    cols = np.stack([index.a[seg], index.b[seg]], axis=1).ravel()
+    w = np.stack([1.0 - t, t], axis=1).ravel()
+    return np.repeat(rows, 2).astype(np.int32), cols.astype(np.int32), w.astype(np.float32)
+
+
+def _chunks(n: int, workers: int, align: int = 1):
+    """``(start, stop)`` ranges covering ``n`` items, ~4 per worker, starts multiple of ``align``."""
+    blocks = -(-n // align)
+    step = align * max(1, -(-blocks // (workers * 4)))
+    return [(s, min(s + step, n)) for s in range(0, n, step)]
+
+
+def transform_points(mat: np.ndarray, pts: np.ndarray) -> np.ndarray:
+    """Apply a 4x4 affine matrix to an (N, 3) array; float32 input stays float32."""
+    if pts.dtype == np.float32:
+        mat = mat.astype(np.float32)
+    out = pts @ mat[:3, :3].T
+    out += mat[:3, 3]
+    return out
+
+
+# -----------------------------
+# Influence (sparse loop -> vertex weights)
+# -----------------------------
+class Influence:
+    """Sparse, row-normalized influence of loop vertices on mesh points.
+
+    CSR layout over the *affected* points only:
+
+    rows     (A,)     int32    point ids (into the array passed to build)
+    indptr   (A+1,)   int64    row ``i`` owns ``cols/weights[indptr[i]:indptr[i+1]]``
+    cols     (nnz,)   int32    loop indices, at most K per row, nearest first
+                               (polyline mode: the two ends of the nearest segment)
+    weights  (nnz,)   float32  falloff weights divided by the row sum
+                               (polyline mode: ``1 - t``, ``t``)
+
+    The weights depend only on the original geometry, ``radius``, ``k`` and
+    ``smooth``. Axis, flatten target and strength only change the loop
+    deltas, so re-applying is a sparse product plus a scale.
+    """
+
+    __slots__ = ("n", "rows", "indptr", "cols", "weights")
+
+    def __init__(self, n: int, rows, indptr, cols, weights):
+        self.n = int(n)
+        self.rows = rows
+        self.indptr = indptr
+        self.cols = cols
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def nbytes(self) -> int:
+        return self.rows.nbytes + self.indptr.nbytes + self.cols.nbytes + self.weights.nbytes
+
+    @classmethod
+    def build(cls, points, loop_pos, radius: float, k: int, smooth: bool = True, index=None,
+              workers: int = 1):
+        """Query Euclidean neighbours for ``points`` once and keep the normalized weights.
+
+        ``workers > 1`` runs the queries on a thread pool (same result).
+        """
+        points = np.asarray(points)
+        if len(points) == 0 or len(loop_pos) == 0:
+            return cls.from_pairs(len(points), (), radius, smooth)
+        if index is None:
+            index = spatial.LoopIndex(loop_pos, radius)
+        if workers <= 1 or len(points) <= spatial.QUERY_BLOCK:
+            return cls.from_pairs(len(points), index.iter_query(points, k), radius, smooth)
+
+        def work(span):
+            s, e = span
+            return [_row_weights(rows + s, cols, dist, radius, smooth)
+                    for rows, cols, dist in index.iter_query(points[s:e], k)]
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(work, _chunks(len(points), workers, spatial.QUERY_BLOCK)))
+        return cls._from_batches(len(points), [b for part in parts for b in part])
+
+    @classmethod
+    def build_polyline(cls, points, index: spatial.SegmentIndex, workers: int = 1):
+        """Project ``points`` onto the nearest loop segment (closer than ``R``).
+
+        Each affected row gets the segment's two endpoints with weights
+        ``1 - t`` and ``t``, so the blend interpolates linearly along the
+        polyline: no seams between neighbouring loop points, and the cost
+        per point does not depend on how densely the loop is sampled.
+        """
+        points = np.asarray(points)
+        if workers <= 1 or len(points) <= spatial.QUERY_BLOCK:
+            return cls._from_batches(len(points), [_segment_weights(index, rows, seg, t)
+                                                   for rows, seg, t, _ in index.iter_nearest(points)])
+
+        def work(span):
+            s, e = span
+            return [_segment_weights(index, rows + s, seg, t)
+                    for rows, seg, t, _ in index.iter_nearest(points[s:e])]
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(work, _chunks(len(points), workers, spatial.QUERY_BLOCK)))
+        return cls._from_batches(len(points), [b for part in parts for b in part])
+
+    @classmethod
+    def from_pairs(cls, n: int, pairs, radius: float, smooth: bool = True):
+        """Build from ``(rows, cols, dist)`` neighbour batches (rows sorted).
+
+        Any neighbour source works: ``spatial.LoopIndex.iter_query`` for
+        Euclidean falloff, ``topology.MeshTopology.geodesic_knn`` for
+        edge-path distance.
+        """
+        return cls._from_batches(n, [_row_weights(rows, cols, dist, radius, smooth)
+                                     for rows, cols, dist in pairs if len(rows)])
+
+    @classmethod
+    def _from_batches(cls, n: int, batches):
+        """Concatenate ``_row_weights`` batches (rows sorted across batches) into CSR."""
+        if batches:
+            rows, cols, weights = (np.concatenate(p) for p in zip(*batches))
+        else:
+            rows = np.empty(0, np.int32)
+            cols = np.empty(0, np.int32)
+            weights = np.empty(0, np.float32)
+        # Rows arrive sorted: row boundaries without another sort
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.empty(0, np.int64)
+        indptr = np.r_[starts, len(rows)].astype(np.int64)
+        return cls(n, rows[starts], indptr, cols, weights)
+
+    def remap(self, ids, n: int) -> "Influence":
+        """Same influence with rows translated through ``ids`` (e.g. candidate -> vertex index)."""
+        rows = np.asarray(ids)[self.rows].astype(np.int32)
+        return Influence(n, rows, self.indptr, self.cols, self.weights)
+
+    def blend(self, loop_delta, workers: int = 1) -> np.ndarray:
+        """Weighted average of ``loop_delta`` per affected row -> (A, 3)."""
+        loop_delta = np.asarray(loop_delta, dtype=np.float64)
+        out = np.zeros((len(self.rows), 3), dtype=np.float64)
+        if len(self.rows) == 0:
+            return out
+
+        def work(span):
+            a, b = span
+            lo, hi = self.indptr[a], self.indptr[b]
+            w = self.weights[lo:hi].astype(np.float64)
+            cols = self.cols[lo:hi]
+            seg = self.indptr[a:b] - lo
+            for c in range(3):
+                out[a:b, c] = np.add.reduceat(w * loop_delta[cols, c], seg)
+
+        if workers <= 1 or len(self.rows) <= spatial.QUERY_BLOCK:
+            work((0, len(self.rows)))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(work, _chunks(len(self.rows), workers)))
+        return out
+
+    def apply(self, loop_delta, strength: float = 1.0, keep_axis=None, weights=None,
+              workers: int = 1) -> np.ndarray:
+        """Offsets for the affected rows: blend * strength (* per-point weight).
+
+        ``weights`` is indexed by point id (length ``n``), e.g. a vertex
+        group. Returns an (A, 3) array aligned with :attr:`rows`.
+        """
+        out = self.blend(loop_delta, workers)
+        out *= strength
+        if weights is not None:
+            out *= np.asarray(weights)[self.rows].astype(np.float64)[:, None]
+        if keep_axis is not None:
+            out[:, keep_axis] = 0.0
+        return out
+
+
+# -----------------------------
+# Propagation
+# -----------------------------
+def propagate(points: np.ndarray, loop_pos: np.ndarray, loop_delta: np.ndarray,
+              radius: float, k: int, smooth: bool = True, strength: float = 1.0,
+              keep_axis=None, weights=None, index=None, workers: int = 1):
+    """Offsets for ``points`` from the loop deltas, as one batched pass.
+
+    points      (N, 3) world positions of candidate vertices
+    loop_pos    (L, 3) original (pre-flatten) world positions of the loop
+    loop_delta  (L, 3) flatten delta of each loop vertex
+    keep_axis   component index left untouched (keep-Y), or None
+    weights     optional (N,) per-vertex modulation (vertex group)
+    index       optional prebuilt spatial.LoopIndex over ``loop_pos``
+    workers     thread count for queries and blending (result is identical)
+
+    Returns ``(offsets, valid)``: (N, 3) world offsets and a bool mask of
+    the points that received a (possibly zero-weighted) offset.
+    """
+    infl = Influence.build(points, loop_pos, radius, k, smooth, index=index, workers=workers)
+    offsets = np.zeros((infl.n, 3), dtype=np.float64)
+    valid = np.zeros(infl.n, dtype=bool)
+    offsets[infl.rows] = infl.apply(loop_delta, strength, keep_axis, weights, workers)
+    valid[infl.rows] = True
+    return offsets, valid
@@ -0,0 +1,82 @@
+"""Laplacian / Taubin relax of a mesh region (NumPy only, no bpy).
+
+Post-pass for the propagation: large deltas next to the loop can shear
+quads, and a few uniform-Laplacian iterations even them out. Only the
+vertices that actually moved plus a one-ring border are relaxed; their
+neighbours outside that set are read but stay fixed, so the cost follows
+the affected region, not the mesh. Adjacency comes from the topology's
+vertex -> edge CSR (bulk edge arrays), no per-vertex Python.
+"""
+import numpy as np
+
+from . import propagate
+
+
+TAUBIN_PASSBAND = 0.1   # k_PB: frequencies below this are kept (Taubin 1995)
+
+
+def taubin_mu(lam: float, passband: float = TAUBIN_PASSBAND) -> float:
+    """Negative (inflate) step paired with ``lam`` so the mesh does not shrink."""
+    return 1.0 / (passband - 1.0 / lam)
+
+
+def relax_region(co: np.ndarray, topo, moved, pinned=None, iterations: int = 3, factor: float = 0.5,
+                 taubin: bool = False, mw=None, keep_axis=None, weights=None) -> int:
+    """Relax ``moved`` and its one-ring border in place; returns how many vertices were relaxed.
+
+    co          (N, 3) local coordinates, updated in place
+    topo        topology.MeshTopology of the mesh
+    moved       vertex indices changed by the propagation
+    pinned      vertices that never move (the straightened loop)
+    factor      Laplacian step ``lambda`` (0..1, 0 = no-op); Taubin adds the ``mu`` step
+    mw          4x4 object -> world matrix; the relax runs in world space so
+                ``keep_axis`` (world component left untouched) matches the
+                propagation's keep-Y
+    weights     optional (N,) vertex group weights, as in the propagation:
+                each step is scaled by the vertex's weight, weight 0 is pinned
+    """
+    moved = np.unique(np.asarray(moved, dtype=np.int64))
+    # factor 0 hiçbir şeyi taşımaz (ve Taubin'in mu adımı 1/lambda ile tanımsız)
+    if iterations <= 0 or factor <= 0.0 or len(moved) == 0:
+        return 0
+    _, ring = topo.adjacency(moved)
+    free = np.union1d(moved, ring)
+    if pinned is not None and len(pinned):
+        free = np.setdiff1d(free, pinned, assume_unique=False)
+    step = None
+    if weights is not None:
+        # Yayılımın dokunmadığı (ağırlık 0) vertex'ler relax'ta da yerinde kalır
+        w = np.asarray(weights, dtype=np.float64)[free]
+        free, step = free[w > 0.0], w[w > 0.0, None]
+    if len(free) == 0:
+        return 0
+
+    # Bölge + etrafındaki sabit halka; sparse satırlar yerel indekslerle
+    rows, nbr = topo.adjacency(free)
+    support = np.union1d(free, nbr)
+    cols = np.searchsorted(support, nbr)
+    own = np.searchsorted(support, free)
+    deg = np.bincount(rows, minlength=len(free)).astype(np.float64)
+    has = deg > 0
+    inv_deg = np.zeros(len(free), dtype=np.float64)
+    inv_deg[has] = 1.0 / deg[has]
+
+    mw = np.eye(4) if mw is None else np.asarray(mw, dtype=np.float64)
+    P = propagate.transform_points(mw, np.asarray(co[support], dtype=np.float64))
+    steps = (factor, taubin_mu(factor)) if taubin else (factor,)
+    d = np.empty((len(free), 3), dtype=np.float64)
+    for _ in range(iterations):
+        for lam in steps:
+            # Uniform Laplacian: komşu ortalaması - kendisi (Jacobi, tek seferde)
+            for c in range(3):
+                d[:, c] = np.bincount(rows, weights=P[cols, c], minlength=len(free)) * inv_deg
+            d[has] -= P[own[has]]
+            d[~has] = 0.0
+            if keep_axis is not None:
+                d[:, keep_axis] = 0.0
+            if step is not None:
+                d *= step
+            P[own] += lam * d
+
+    co[free] = propagate.transform_points(np.linalg.inv(mw), P[own])
+    return len(free)
@@ -0,0 +1,335 @@
+"""Network side of the updater (standard library only, no bpy).
+
+Kept apart from ``updater.py`` so it can run on a worker thread (nothing
+here touches Blender data) and be exercised against any HTTP server, e.g.
+``python -m http.server`` serving an ``update_manifest.json``.
+
+The manifest is fetched with conditional requests: the ``ETag`` /
+``Last-Modified`` validators of the last answer are stored next to the
+cached manifest and sent back as ``If-None-Match`` / ``If-Modified-Since``,
+so an unchanged manifest costs a bodyless 304.
+
+Release zips are streamed to a ``.part`` file (resumed with an HTTP
+``Range`` request after an interruption), checked against the manifest's
+``sha256`` and only then renamed to their final name, so a cached zip is
+always complete.
+"""
+import hashlib
+import json
+import os
+import re
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+
+
+# GitHub bazı ortamlarda User-Agent isteyebiliyor
+USER_AGENT = "EdgeStraightenPro-Updater/1.0"
+_CTX = None   # SSL context, built on the first https request (loads the CA store)
+
+# Snapshot of the last check; replaced as a whole, so readers never see it half-updated
+CheckState = namedtuple("CheckState", "remote notes sha256 error checking source")
+IDLE = CheckState(None, "", "", "", False, "")
+
+
+def version_tuple(v):
+    return tuple(v) if isinstance(v, (list, tuple)) else (0, 0, 0)
+
+
+def _ssl_context(url: str):
+    global _CTX
+    if not url.startswith("https:"):
+        return None
+    if _CTX is None:
+        _CTX = ssl.create_default_context()
+    return _CTX
+
+
+def _validators_path(cache_path: str) -> str:
+    return os.path.splitext(cache_path)[0] + ".http.json"
+
+
+def read_cache(cache_path: str):
+    """Cached manifest dict, or None."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data):
+    tmp = f"{path}.tmp{os.getpid()}"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def fetch_manifest(url: str, cache_path: str, ttl: float = 0.0, timeout: float = 10.0):
+    """Manifest dict from ``cache_path`` or ``url`` -> ``(data, source)``.
+
+    ``source`` is ``"cache"`` (younger than ``ttl`` seconds, no request),
+    ``"not-modified"`` (server answered 304) or ``"network"``. Raises
+    ``OSError`` (includes ``urllib.error.URLError``) or ``ValueError``.
+    """
+    cached = read_cache(cache_path)
+    if cached is not None and ttl > 0:
+        try:
+            if time.time() - os.path.getmtime(cache_path) < ttl:
+                return cached, "cache"
+        except OSError:
+            pass
+
+    headers = {"User-Agent": USER_AGENT}
+    if cached is not None:
+        val = read_cache(_validators_path(cache_path)) or {}
+        if val.get("etag"):
+            headers["If-None-Match"] = val["etag"]
+        if val.get("last_modified"):
+            headers["If-Modified-Since"] = val["last_modified"]
+
+    req = urllib.request.Request(url, headers=headers)
+    ctx = _ssl_context(url)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout, context=ctx) as r:
+            data = json.loads(r.read().decode("utf-8"))
+            etag, modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached is not None:
+            os.utime(cache_path)   # TTL yeniden başlar
+            return cached, "not-modified"
+        raise
+    if not isinstance(data, dict):
+        raise ValueError("Manifest is not a JSON object")
+
+    try:
+        _write_json(cache_path, data)
+        _write_json(_validators_path(cache_path), {"etag": etag, "last_modified": modified})
+    except OSError:
+        pass
+    return data, "network"
+
+
+def _state_from(data: dict, source: str) -> CheckState:
+    return CheckState(version_tuple(data.get("version")), data.get("notes", ""), str(data.get("sha256", "")).lower(),
+                      "", False, source)
+
+
+class ManifestCheck:
+    """Runs :func:`fetch_manifest` on a worker thread; the result lands in :attr:`state`.
+
+    :attr:`state` is a :data:`CheckState` swapped in one assignment, so UI
+    code can read it on every redraw for free. Call :meth:`load_cached`
+    once to show the last known manifest before any network check.
+    """
+
+    def __init__(self, url: str, cache_path: str, ttl: float = 0.0, timeout: float = 10.0):
+        self.url = url
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.timeout = timeout
+        self.state = IDLE
+        self._thread = None
+
+    @property
+    def busy(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def load_cached(self):
+        data = read_cache(self.cache_path)
+        if data is not None:
+            self.state = _state_from(data, "cache")
+        return self.state
+
+    def start(self, force: bool = False) -> bool:
+        """Start a background check (``force`` ignores the TTL); False if one is already running."""
+        if self.busy:
+            return False
+        self.state = self.state._replace(checking=True, error="")
+        self._thread = threading.Thread(target=self._run, args=(0.0 if force else self.ttl,),
+                                        name="estraighten-update-check", daemon=True)
+        self._thread.start()
+        return True
+
+    def refresh(self, force: bool = False) -> CheckState:
+        """Blocking check on the calling thread (waits for a running one first); for scripts.
+
+        Same TTL rule as :meth:`start`: the cache is reused while younger
+        than ``ttl``, otherwise the manifest is fetched (conditionally).
+        """
+        self.wait()
+        self.state = self.state._replace(checking=True, error="")
+        self._run(0.0 if force else self.ttl)
+        return self.state
+
+    def wait(self, timeout: float = None) -> CheckState:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.state
+
+    def _run(self, ttl: float):
+        try:
+            data, source = fetch_manifest(self.url, self.cache_path, ttl, self.timeout)
+            self.state = _state_from(data, source)
+        except Exception as e:   # thread must always clear `checking`
+            # Ağ yoksa eldeki (cache) bilgi korunur, yalnızca hata eklenir
+            self.state = self.state._replace(checking=False, error=f"{type(e).__name__}: {e}")
+
+
+# -----------------------------
+# Release download
+# -----------------------------
+CHUNK = 1 << 16
+
+
+class Cancelled(Exception):
+    pass
+
+
+def sha256_file(path: str, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for blk in iter(lambda: f.read(chunk), b""):
+            h.update(blk)
+    return h.hexdigest()
+
+
+def _range_start(headers) -> int:
+    """First byte of a 206 answer (``Content-Range: bytes <start>-<end>/<total>``), -1 if missing."""
+    m = re.match(r"\s*bytes\s+(\d+)-", headers.get("Content-Range") or "")
+    return int(m.group(1)) if m else -1
+
+
+def download(url: str, dest: str, sha256: str = "", timeout: float = 30.0, progress=None, cancel=None) -> str:
+    """Stream ``url`` to ``dest`` via ``dest + ".part"``; returns ``dest``.
+
+    A leftover ``.part`` is resumed with ``Range: bytes=<size>-``; it is
+    restarted from scratch when the server answers 200, resumes at another
+    offset (``Content-Range``) or answers 416 with no ``sha256`` to prove
+    the ``.part`` complete. The finished file is checked against
+    ``sha256`` (hex, skipped when empty) and the ``Content-Length``, then
+    renamed atomically. ``progress(done, total)`` is called per chunk
+    (``total`` 0 when unknown); ``cancel`` is a ``threading.Event`` (the
+    ``.part`` is kept for the next resume). Raises ``OSError``,
+    ``ValueError`` (checksum / size mismatch) or :class:`Cancelled`.
+    """
+    part = dest + ".part"
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    have = os.path.getsize(part) if os.path.exists(part) else 0
+    headers = {"User-Agent": USER_AGENT}
+    if have:
+        headers["Range"] = f"bytes={have}-"
+    req = urllib.request.Request(url, headers=headers)
+    ctx = _ssl_context(url)
+    try:
+        r = urllib.request.urlopen(req, timeout=timeout, context=ctx)
+    except urllib.error.HTTPError as e:
+        if e.code != 416 or not have:
+            raise
+        # 416: .part tam boy olabilir ya da bozuk; yalnızca hash karar verebilir
+        if not sha256:
+            os.remove(part)
+            return download(url, dest, sha256, timeout, progress, cancel)
+        r = None
+
+    if r is not None and r.status == 206 and _range_start(r.headers) != have:
+        # Başka bir offset'ten devam: eklemek dosyayı bozar, baştan indir
+        r.close()
+        if not have:
+            raise OSError(f"Unexpected partial response ({r.headers.get('Content-Range')})")
+        os.remove(part)
+        return download(url, dest, sha256, timeout, progress, cancel)
+
+    h = hashlib.sha256()
+    if r is None:
+        total = have
+    else:
+        with r:
+            if r.status == 206:
+                with open(part, "rb") as f:
+                    for blk in iter(lambda: f.read(1 << 20), b""):
+                        h.update(blk)
+                mode = "ab"
+            else:
+                have, mode = 0, "wb"
+            size = r.headers.get("Content-Length")
+            total = have + int(size) if size is not None else 0
+            done = have
+            with open(part, mode) as f:
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        raise Cancelled("Download cancelled")
+                    blk = r.read(CHUNK)
+                    if not blk:
+                        break
+                    f.write(blk)
+                    h.update(blk)
+                    done += len(blk)
+                    if progress is not None:
+                        progress(done, total)
+            if total and done != total:
+                raise OSError(f"Download interrupted at {done} of {total} bytes (resumable)")
+
+    digest = h.hexdigest() if r is not None else sha256_file(part)
+    if sha256 and digest != sha256.lower():
+        os.remove(part)
+        raise ValueError(f"SHA-256 mismatch for {os.path.basename(dest)} (got {digest[:12]}..., "
+                         f"expected {sha256[:12]}...)")
+    os.replace(part, dest)
+    return dest
+
+
+def prune(directory: str, prefix: str, keep: str):
+    """Delete ``prefix*`` files (zips and stale ``.part``) in ``directory`` except ``keep`` (+ its ``.part``)."""
+    keep = {os.path.basename(keep), os.path.basename(keep) + ".part"}
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith(prefix) and name not in keep:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+class DownloadJob:
+    """:func:`download` on a worker thread; poll :attr:`done` / :attr:`total` / :attr:`finished`."""
+
+    def __init__(self, url: str, dest: str, sha256: str = "", timeout: float = 30.0):
+        self.url, self.dest, self.sha256, self.timeout = url, dest, sha256, timeout
+        self.done = self.total = 0
+        self.error = ""
+        self.finished = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="estraighten-update-download", daemon=True)
+
+    def start(self) -> "DownloadJob":
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout: float = None):
+        self._thread.join(timeout)
+        return self
+
+    @property
+    def fraction(self) -> float:
+        return self.done / self.total if self.total else 0.0
+
+    def _progress(self, done: int, total: int):
+        self.done, self.total = done, total
+
+    def _run(self):
+        try:
+            download(self.url, self.dest, self.sha256, self.timeout, self._progress, self._cancel)
+        except Exception as e:   # thread must always set `finished`
+            self.error = f"{type(e).__name__}: {e}"
+        self.finished = True
@@ -0,0 +1,269 @@
+"""Radius-bounded spatial index over the loop's original positions.
+
+Pure NumPy, no bpy. Loop points are hashed into a uniform grid whose cell
+size is at least the falloff radius ``R``; a query point then only has to
+look at its own and the 26 neighbouring cells. Points outside the loop's
+bounding box inflated by ``R`` are rejected before any hashing, so on large
+meshes the far-away majority costs one vectorized comparison.
+
+Only loop points closer than ``R`` are ever returned: farther ones get a
+falloff weight of exactly 0, so dropping them does not change the blend.
+"""
+import numpy as np
+
+from . import topology
+
+
+# Grid resolution cap per axis (keeps linear cell keys well inside int64).
+MAX_CELLS_PER_AXIS = 1024
+# Query points hashed per batch (bounds the (m, 27) key temporaries).
+QUERY_BLOCK = 1 << 14
+# Upper bound on candidate (point, loop point) pairs materialized at once.
+PAIR_BLOCK = 1 << 18
+
+_OFFSETS = np.array(
+    [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)],
+    dtype=np.int64,
+)
+
+
+class _Bounded:
+    """Loop points plus their bounding box inflated by ``R`` (shared by both indexes)."""
+
+    def __init__(self, loop_pos, radius: float):
+        pos = np.ascontiguousarray(loop_pos, dtype=np.float64).reshape(-1, 3)
+        if len(pos) == 0:
+            raise ValueError(f"{type(self).__name__} needs at least one loop point")
+        self.pos = pos
+        self.radius = float(radius)
+        self.lo = pos.min(axis=0) - self.radius
+        self.hi = pos.max(axis=0) + self.radius
+
+    def in_range(self, points: np.ndarray) -> np.ndarray:
+        """Bool mask of points inside the loop bbox inflated by ``R``."""
+        points = np.asarray(points)
+        return np.all((points >= self.lo) & (points <= self.hi), axis=1)
+
+
+class LoopIndex(_Bounded):
+    """Uniform grid over loop points answering batched, radius-bounded KNN."""
+
+    def __init__(self, loop_pos, radius: float):
+        super().__init__(loop_pos, radius)
+        pos = self.pos
+
+        extent = float((self.hi - self.lo).max())
+        self.cell = max(self.radius, extent / MAX_CELLS_PER_AXIS, 1e-12)
+        # One spare cell on each side so neighbour offsets never wrap.
+        self.origin = self.lo - self.cell
+        self.dims = np.floor((self.hi - self.origin) / self.cell).astype(np.int64) + 2
+        self._off_keys = self._keys(_OFFSETS)
+
+        keys = self._keys(self._cells(pos))
+        self.order = np.argsort(keys, kind="stable").astype(np.int32)
+        self.keys = keys[self.order]
+
+    def __len__(self):
+        return len(self.pos)
+
+    def _cells(self, pts: np.ndarray) -> np.ndarray:
+        return np.floor((pts - self.origin) / self.cell).astype(np.int64)
+
+    def _keys(self, cells: np.ndarray) -> np.ndarray:
+        return (cells[..., 0] * self.dims[1] + cells[..., 1]) * self.dims[2] + cells[..., 2]
+
+    def iter_query(self, points, k: int):
+        """Yield ``(rows, cols, dist)`` neighbour batches for ``points``.
+
+        ``rows`` index ``points`` and are non-decreasing across the whole
+        iteration; ``cols`` index the loop points. Each row carries at most
+        ``k`` entries, nearest first, all with ``dist < R``. Points without
+        any loop point in range produce no entries.
+        """
+        points = np.asarray(points)
+        k = max(1, int(k))
+        r2 = self.radius * self.radius
+
+        for s in range(0, len(points), QUERY_BLOCK):
+            blk = np.asarray(points[s:s + QUERY_BLOCK], dtype=np.float64)
+            pid = np.flatnonzero(self.in_range(blk))
+            if len(pid) == 0:
+                continue
+            P = blk[pid]
+
+            nkeys = self._keys(self._cells(P))[:, None] + self._off_keys[None, :]
+            start = np.searchsorted(self.keys, nkeys, side="left")
+            count = np.searchsorted(self.keys, nkeys, side="right") - start
+            per_point = count.sum(axis=1)
+
+            # Split so no batch materializes more than PAIR_BLOCK pairs.
+            csum = np.cumsum(per_point)
+            a = 0
+            while a < len(pid):
+                base = csum[a - 1] if a else 0
+                b = int(np.searchsorted(csum, base + PAIR_BLOCK, side="right"))
+                b = max(b, a + 1)
+                out = self._pairs(P[a:b], start[a:b], count[a:b], per_point[a:b], k, r2)
+                if out is not None:
+                    rows, cols, dist = out
+                    yield pid[a:b][rows] + s, cols, dist
+                a = b
+
+    def _pairs(self, P, start, count, per_point, k, r2):
+        rows = np.repeat(np.arange(len(P), dtype=np.int64), per_point)
+        if len(rows) == 0:
+            return None
+        cols = self.order[topology.ranges(start.ravel(), count.ravel())]
+        diff = P[rows] - self.pos[cols]
+        d2 = np.einsum("ij,ij->i", diff, diff)
+        keep = d2 < r2
+        rows, cols, d2 = rows[keep], cols[keep], d2[keep]
+        if len(rows) == 0:
+            return None
+
+        # Nearest first inside each row (rows are already grouped, and
+        # d2 / r2 < 1, so one argsort on row + d2 / r2 orders both), then
+        # drop everything past rank k.
+        srt = np.argsort(rows + d2 * (1.0 / r2), kind="stable")
+        rows, cols, d2 = rows[srt], cols[srt], d2[srt]
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        first = np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+        keep = (np.arange(len(rows)) - first) < k
+        return rows[keep], cols[keep], np.sqrt(d2[keep])
+
+    def query(self, points, k: int):
+        """All of :meth:`iter_query` concatenated into flat arrays."""
+        parts = list(self.iter_query(points, k))
+        if not parts:
+            return (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32),
+                    np.empty(0, dtype=np.float64))
+        return tuple(np.concatenate(p) for p in zip(*parts))
+
+
+def _segment_dist2(P, A, B):
+    """Squared distance from ``P[i]`` to segment ``A[i]``-``B[i]`` and the projection parameter ``t``."""
+    AB = B - A
+    AP = P - A
+    ab2 = np.einsum("ij,ij->i", AB, AB)
+    t = np.clip(np.einsum("ij,ij->i", AP, AB) / np.where(ab2 > 0.0, ab2, 1.0), 0.0, 1.0)
+    AP -= AB * t[:, None]
+    return np.einsum("ij,ij->i", AP, AP), t
+
+
+class SegmentIndex(_Bounded):
+    """Capsule hierarchy over the loop polylines for nearest-segment queries.
+
+    Segments join consecutive loop points in walk order (plus the closing
+    segment of closed loops; a one-point loop is a zero-length segment).
+    ``order`` lists loop point indices when the walk is not ``loop_pos``
+    itself: ``loop_ptr`` / ``loop_closed`` then describe runs of ``order``
+    (e.g. :func:`topology.split_chains` of a branching selection, where a
+    branch point appears in several runs); ``a`` / ``b`` still index the
+    loop points.
+    Because neighbouring segments are neighbours in the array, node ``i``
+    of level ``l`` simply covers segments ``i * 2**l`` .. ``(i + 1) * 2**l - 1``
+    and is bounded by the chord from its first to its last loop point plus
+    the largest deviation of its points from that chord. On a smooth loop
+    that deviation shrinks with the square of the node length, so a query
+    descending level by level keeps only a handful of nodes per point and
+    level: the cost grows with ``log(segments)``, not with the loop density
+    inside ``R``.
+    """
+
+    def __init__(self, loop_pos, loop_ptr, loop_closed, radius: float, order=None):
+        super().__init__(loop_pos, radius)
+        pos = self.pos
+        ptr = np.asarray(loop_ptr, dtype=np.int64)
+        closed = np.asarray(loop_closed, dtype=bool)
+
+        # Open runs inside every loop, closing segment at its end, single points as (v, v)
+        a = np.arange((len(pos) if order is None else len(order)) - 1, dtype=np.int64)
+        a = a[~np.isin(a + 1, ptr[1:-1])]
+        sizes = np.diff(ptr)
+        close = (closed & (sizes > 2)) | (sizes == 1)
+        ca, cb = ptr[1:][close] - 1, ptr[:-1][close]
+        # Order: by the first endpoint, closing segment last within its loop
+        key = np.r_[a * 2, ca * 2 + 1]
+        srt = np.argsort(key, kind="stable")
+        self.a, self.b = np.r_[a, ca][srt], np.r_[a + 1, cb][srt]
+        if order is not None:
+            order = np.asarray(order, dtype=np.int64)
+            self.a, self.b = order[self.a], order[self.b]
+        self.a, self.b = self.a.astype(np.int32), self.b.astype(np.int32)
+
+        # Per level: chord start / end loop point and capsule radius of every node.
+        # Distance to a segment is convex, so checking segment endpoints bounds whole segments.
+        n = len(self.a)
+        self._levels = []
+        level = 0
+        while True:
+            step = 1 << level
+            first = np.arange(0, n, step)
+            start, end = self.a[first], self.b[np.minimum(first + step, n) - 1]
+            if level == 0:
+                rad = np.zeros(n)
+            else:
+                node = np.arange(n) >> level
+                A, B = pos[start[node]], pos[end[node]]
+                da, _ = _segment_dist2(pos[self.a], A, B)
+                db, _ = _segment_dist2(pos[self.b], A, B)
+                rad = np.sqrt(np.maximum.reduceat(np.maximum(da, db), first))
+            self._levels.append((start, end, rad))
+            if len(first) == 1:
+                break
+            level += 1
+
+    def __len__(self):
+        return len(self.a)
+
+    def iter_nearest(self, points):
+        """Yield ``(rows, seg, t, dist)`` for points closer than ``R`` to any segment.
+
+        ``rows`` index ``points`` (non-decreasing across the iteration),
+        ``seg`` is the nearest segment (endpoints ``self.a[seg]``,
+        ``self.b[seg]``) and ``t`` in [0, 1] the projection parameter on it.
+        """
+        points = np.asarray(points)
+        r2 = self.radius * self.radius
+        top = len(self._levels) - 1
+
+        for s in range(0, len(points), QUERY_BLOCK):
+            blk = np.asarray(points[s:s + QUERY_BLOCK], dtype=np.float64)
+            pid = np.flatnonzero(self.in_range(blk))
+            if len(pid) == 0:
+                continue
+            P = blk[pid]
+
+            rows = np.arange(len(P), dtype=np.int64)
+            nodes = np.zeros(len(P), dtype=np.int64)
+            for level in range(top, -1, -1):
+                start, end, rad = self._levels[level]
+                if level < top:
+                    rows = np.repeat(rows, 2)
+                    nodes = (nodes[:, None] * 2 + (0, 1)).ravel()
+                    ok = nodes < len(start)
+                    rows, nodes = rows[ok], nodes[ok]
+                p = P[rows]
+                A, B = self.pos[start[nodes]], self.pos[end[nodes]]
+                d2, t = _segment_dist2(p, A, B)
+                near2 = np.maximum(np.sqrt(d2) - rad[nodes], 0.0) ** 2
+                # Chord ends are real loop points: the nearest one bounds the answer from above
+                ea, eb = p - A, p - B
+                bound = np.full(len(P), r2)
+                np.minimum.at(bound, rows, np.minimum(np.einsum("ij,ij->i", ea, ea),
+                                                      np.einsum("ij,ij->i", eb, eb)))
+                # Relative slack: (sqrt(d2))**2 and the endpoint distance may differ in the last bit
+                keep = near2 <= bound[rows] * (1.0 + 1e-9)
+                rows, nodes, d2, t = rows[keep], nodes[keep], d2[keep], t[keep]
+            if len(rows) == 0:
+                continue
+
+            # Level 0 chords are the segments themselves: d2 / t are exact
+            best = np.full(len(P), np.inf)
+            np.minimum.at(best, rows, d2)
+            hit = np.flatnonzero((d2 == best[rows]) & (d2 < r2))
+            if len(hit) == 0:
+                continue
+            # Ties (shared vertex): first segment per row, all give the same delta
+            hit = hit[np.r_[True, rows[hit][1:] != rows[hit][:-1]]]
+            yield pid[rows[hit]] + s, nodes[hit], t[hit], np.sqrt(d2[hit])
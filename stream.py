@@ -0,0 +1,158 @@
+"""Out-of-core straighten for meshes that do not fit in RAM (NumPy only, no bpy).
+
+Positions stay in a memory-mapped buffer (see ``mesh_io.memmap_vertices``)
+and are processed in fixed-size chunks of consecutive vertices. Only the
+loop (indices, world positions, spatial index) is kept in memory; a chunk
+is read and written back only when its bounds intersect the loop bbox
+inflated by ``R``, so peak memory follows ``chunk`` and the number of
+loop points, not the mesh size.
+
+Every vertex's neighbours are looked up independently, so the result is
+the same as :func:`core.straighten` with ``only_same_island=False`` and
+the Euclidean metric (no topology is loaded here, so islands and
+geodesic distance are not available).
+"""
+import numpy as np
+
+from . import cache, core, profiling, propagate, spatial, topology
+
+
+CHUNK = 1 << 20   # vertices per chunk (~12 MB of float32 positions)
+
+
+def chunk_bounds(co, chunk: int = CHUNK) -> np.ndarray:
+    """(C, 2, 3) local min/max of every chunk: one sequential read of the buffer.
+
+    Cheap to keep next to the file (``np.save``) and pass back in, so
+    later runs skip the read entirely.
+    """
+    n = len(co)
+    out = np.empty(((n + chunk - 1) // chunk, 2, 3), dtype=np.float64)
+    for c, s in enumerate(range(0, n, chunk)):
+        blk = np.asarray(co[s:s + chunk])
+        out[c, 0] = blk.min(axis=0)
+        out[c, 1] = blk.max(axis=0)
+    return out
+
+
+def loops_from_pairs(pairs, allow_branches: bool = True):
+    """Group loop edges given as vertex pairs into loops -> ``(loop_idx, loop_ptr, loop_closed)``.
+
+    Without the mesh topology a loop cannot be grown from one edge, so
+    every edge of every loop has to be listed; connected pairs form one
+    loop, in walk order (needed by the polyline interpolation). A branching
+    group has no walk order; ``allow_branches=False`` (polyline) rejects it
+    with a ValueError.
+    """
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    verts, local = np.unique(pairs, return_inverse=True)
+    local = local.reshape(-1, 2)
+    if not allow_branches:
+        deg = np.bincount(np.unique(np.sort(local, axis=1), axis=0).ravel(), minlength=len(verts))
+        if np.any(deg > 2):
+            raise ValueError(f"Loop edges branch at vertex {int(verts[np.argmax(deg > 2)])}; "
+                             "polyline interpolation needs simple chains or cycles")
+    # Only the loop edges: a tiny edge-only topology orders each chain
+    chains = topology.MeshTopology(len(verts), local, np.empty(0, np.int64), np.empty(0, np.int64), 0)
+    parts, ptr, closed = [], [0], []
+    for vs, es, is_closed in chains.selected_loops(np.arange(len(local))):
+        parts.append(verts[np.asarray(vs, dtype=np.int64)])
+        ptr.append(ptr[-1] + len(vs))
+        closed.append(is_closed)
+    return np.concatenate(parts), np.array(ptr, dtype=np.int64), np.array(closed, dtype=bool)
+
+
+def straighten_chunked(co, loop_idx, loop_ptr, loop_closed=None, mw=None, chunk: int = CHUNK, bounds=None,
+                       workers: int = 1, timer=profiling.NULL, **settings):
+    """Straighten + propagate on an (N, 3) array-like, ``chunk`` vertices at a time.
+
+    ``co`` is usually ``mesh_io.memmap_vertices(...).co`` and is updated in
+    place. ``loop_idx`` / ``loop_ptr`` / ``loop_closed`` list the loop
+    vertices per loop in walk order (see :func:`loops_from_pairs`;
+    ``loop_closed`` defaults to all open); ``bounds`` are precomputed
+    :func:`chunk_bounds` for the same ``chunk``. Returns an info dict
+    like :func:`core.straighten` plus ``chunks`` / ``chunks_touched``.
+    """
+    props = core.Settings(**settings)
+    if props.falloff_metric != "EUCLIDEAN":
+        raise ValueError("Chunked mode supports the Euclidean falloff metric only")
+    if props.relax != "NONE":
+        raise ValueError("Chunked mode loads no topology, relax is not available")
+    mw = np.eye(4) if mw is None else np.asarray(mw, dtype=np.float64)
+    imw = np.linalg.inv(mw)
+    n = len(co)
+    loop_idx = np.asarray(loop_idx, dtype=np.int64)
+    loop_ptr = np.asarray(loop_ptr, dtype=np.int64)
+    loop_closed = np.zeros(len(loop_ptr) - 1, dtype=bool) if loop_closed is None else np.asarray(loop_closed, bool)
+    if len(loop_idx) == 0 or loop_idx.min() < 0 or loop_idx.max() >= n:
+        raise ValueError("Loop vertex indices out of range")
+
+    # ---- Loop: tek küçük kopya (RAM'de kalan tek mesh verisi) ----
+    with timer.phase("Loop", len(loop_idx)):
+        order = np.argsort(loop_idx)
+        loop_local = np.empty((len(loop_idx), 3), dtype=np.float32)
+        loop_local[order] = co[loop_idx[order]]   # sorted -> sequential pages
+        entry = cache.LoopEntry(None, loop_idx, loop_ptr, loop_closed, np.empty(0, dtype=np.int32),
+                                propagate.transform_points(mw, loop_local))
+        flat_idxs, targets = core.flatten_targets(entry, props.axis, props.flatten_to_zero)
+        after, deltas = core.loop_deltas(entry, flat_idxs, targets)
+
+    if bounds is None:
+        with timer.phase("Bounds", n):
+            bounds = chunk_bounds(co, chunk)
+    if props.radius > 0.0:
+        R = props.radius
+    else:
+        lo, hi = core.world_bbox(bounds[:, 0].min(axis=0), bounds[:, 1].max(axis=0), mw)
+        R = float(np.linalg.norm(hi - lo) * 0.15)
+
+    polyline = props.interpolation == "POLYLINE"
+    if polyline:
+        index = spatial.SegmentIndex(entry.loop_world, loop_ptr, loop_closed, R)
+    else:
+        index = spatial.LoopIndex(entry.loop_world, R)
+    K = max(1, props.k_nearest)
+    keep_axis = 1 if (props.axis == "Y" and props.keep_Y_when_Y_axis) else None
+    loop_sorted = loop_idx[order]
+
+    touched = affected = 0
+    max_shift = 0.0
+    with timer.phase("Chunks"):
+        for c, s in enumerate(range(0, n, chunk)):
+            # Chunk'ın dünya AABB'si loop bbox + R ile kesişmiyorsa hiç okunmaz
+            wlo, whi = core.world_bbox(bounds[c, 0], bounds[c, 1], mw)
+            if np.any(whi < index.lo) or np.any(wlo > index.hi):
+                continue
+            e = min(s + chunk, n)
+            touched += 1
+
+            local = np.asarray(co[s:e], dtype=np.float32)
+            world = propagate.transform_points(mw, local)
+            cand = index.in_range(world)
+            a, b = np.searchsorted(loop_sorted, (s, e))
+            cand[loop_sorted[a:b] - s] = False
+            cand_idx = np.flatnonzero(cand)
+            if len(cand_idx) == 0:
+                continue
+
+            if polyline:
+                infl = propagate.Influence.build_polyline(world[cand_idx], index, workers)
+            else:
+                infl = propagate.Influence.build(world[cand_idx], entry.loop_world, R, K, props.smooth,
+                                                 index=index, workers=workers)
+            if len(infl.rows) == 0:
+                continue
+            offsets = infl.apply(deltas, props.strength, keep_axis, None, workers)
+            rows = cand_idx[infl.rows]
+            moved = propagate.transform_points(mw, local[rows].astype(np.float64))
+            moved += offsets
+            co[s + rows] = propagate.transform_points(imw, moved)
+
+            affected += len(rows)
+            max_shift = max(max_shift, float(np.sqrt(np.einsum("ij,ij->i", offsets, offsets)).max()))
+
+    # Loop vertex'leri en son: chunk'lar orijinal loop'a göre hesaplandı
+    co[loop_idx] = propagate.transform_points(imw, after)
+
+    return dict(loops=entry.n_loops, loop_verts=len(loop_idx), affected=affected, max_shift=max_shift,
+                radius=R, chunks=len(bounds), chunks_touched=touched)
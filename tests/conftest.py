@@ -0,0 +1,101 @@
+"""Shared test setup: the add-on package imported from this checkout, plus small synthetic meshes.
+
+Only the bpy-free modules are exercised (core, propagate, spatial, mesh_io, cli, diskcache,
+topology, stream, relax, remote); the package ``__init__`` skips the
+Blender parts when ``bpy`` is missing.
+"""
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PKG_NAME = "edge_straighten_pro"
+
+if PKG_NAME not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        PKG_NAME, os.path.join(REPO_DIR, "__init__.py"), submodule_search_locations=[REPO_DIR]
+    )
+    _pkg = importlib.util.module_from_spec(_spec)
+    sys.modules[PKG_NAME] = _pkg
+    _spec.loader.exec_module(_pkg)
+
+from edge_straighten_pro import topology  # noqa: E402
+
+
+class Grid:
+    """Jittered, wavy quad grid(s): ``co`` (N, 3) float32, ``topo``, and vertex ids by ``(grid, i, j)``."""
+
+    def __init__(self, nx: int, ny: int, copies: int = 1, gap: float = 0.6, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.nx, self.ny = nx, ny
+        parts, faces = [], []
+        for g in range(copies):
+            i, j = np.meshgrid(np.arange(nx), np.arange(ny), indexing="ij")
+            x = i + rng.uniform(-0.2, 0.2, i.shape)
+            y = j + rng.uniform(-0.2, 0.2, j.shape) + g * (ny - 1 + gap)
+            z = 0.4 * np.sin(0.5 * x) + 0.3 * np.cos(0.7 * y) + rng.uniform(-0.05, 0.05, i.shape)
+            parts.append(np.stack([x, y, z], axis=-1).reshape(-1, 3))
+            base = g * nx * ny
+            a = (np.arange(nx - 1)[:, None] * ny + np.arange(ny - 1)[None, :]).ravel() + base
+            faces.append(np.stack([a, a + ny, a + ny + 1, a + 1], axis=1).ravel())
+        self.co = np.concatenate(parts).astype(np.float32)
+        face_verts = np.concatenate(faces)
+        self.faces = face_verts, np.full(len(face_verts) // 4, 4)
+        self.topo = topology.MeshTopology.from_faces(len(self.co), *self.faces)
+
+    def vid(self, i, j, grid: int = 0):
+        return grid * self.nx * self.ny + np.asarray(i) * self.ny + np.asarray(j)
+
+    def row(self, j: int, grid: int = 0) -> np.ndarray:
+        """Vertices of grid line ``j`` (runs along i, an open edge loop) in walk order."""
+        return self.vid(np.arange(self.nx), j, grid)
+
+    def row_edges(self, j: int, grid: int = 0) -> np.ndarray:
+        v = self.row(j, grid)
+        return self.topo.find_edges(np.c_[v[:-1], v[1:]])
+
+
+def write_obj(path, co, face_verts, face_sizes):
+    lines = [b"v %.9g %.9g %.9g" % tuple(p) for p in co.tolist()]
+    for f in np.split(np.asarray(face_verts) + 1, np.cumsum(face_sizes)[:-1]):
+        lines.append(b"f " + b" ".join(b"%d" % v for v in f))
+    with open(path, "wb") as fh:
+        fh.write(b"\n".join(lines) + b"\n")
+
+
+def write_ply(path, co, face_verts, face_sizes, ascii=False, extra=False):
+    """PLY with float x/y/z (``extra``: a uchar before and a float after them) and an int face list."""
+    props = [("x", "f4"), ("y", "f4"), ("z", "f4")]
+    if extra:
+        props = [("flag", "u1")] + props + [("quality", "f4")]
+    names = {"u1": "uchar", "f4": "float"}
+    header = ["ply", f"format {'ascii' if ascii else 'binary_little_endian'} 1.0", f"element vertex {len(co)}"]
+    header += [f"property {names[t]} {n}" for n, t in props]
+    header += [f"element face {len(face_sizes)}", "property list uchar int vertex_indices", "end_header"]
+    verts = np.zeros(len(co), dtype=[(n, "<" + t) for n, t in props])
+    for i, a in enumerate("xyz"):
+        verts[a] = co[:, i]
+    faces = np.split(np.asarray(face_verts), np.cumsum(face_sizes)[:-1])
+    with open(path, "wb") as fh:
+        fh.write(("\n".join(header) + "\n").encode("ascii"))
+        if ascii:
+            rows = [" ".join(repr(x.item()) for x in row) for row in verts]
+            rows += [" ".join(map(str, [len(f), *f.tolist()])) for f in faces]
+            fh.write(("\n".join(rows) + "\n").encode("ascii"))
+        else:
+            fh.write(verts.tobytes())
+            for f in faces:
+                fh.write(np.uint8(len(f)).tobytes() + f.astype("<i4").tobytes())
+
+
+@pytest.fixture
+def world_matrix():
+    """Rotation about Z + non-uniform scale + translation (world != local)."""
+    c, s = np.cos(0.35), np.sin(0.35)
+    m = np.eye(4)
+    m[:3, :3] = np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]]) @ np.diag([1.5, 1.2, 0.8])
+    m[:3, 3] = (2.0, -1.0, 0.5)
+    return m
@@ -0,0 +1,81 @@
+"""Batch CLI: per-file results, failures as ok=false records, --stream output safety."""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from conftest import Grid, write_obj, write_ply
+from edge_straighten_pro import cli, core, mesh_io
+
+
+@pytest.fixture
+def grid():
+    return Grid(12, 9)
+
+
+def _pairs(g, j=4):
+    v = g.row(j)
+    return [f"{a}-{b}" for a, b in zip(v[:-1].tolist(), v[1:].tolist())]
+
+
+def _run(tmp_path, *argv):
+    summary = str(tmp_path / "summary.json")
+    code = cli.main([*map(str, argv), "--summary", summary])
+    with open(summary, encoding="utf-8") as f:
+        return code, {os.path.basename(r["file"]): r for r in json.load(f)}
+
+
+def test_batch_matches_core(tmp_path, grid):
+    obj, ply = str(tmp_path / "a.obj"), str(tmp_path / "b.ply")
+    write_obj(obj, grid.co, *grid.faces)
+    write_ply(ply, grid.co, *grid.faces)
+    ref, _ = core.straighten(grid.co.copy(), grid.topo, grid.row_edges(4), radius=3.0, axis="X")
+
+    code, res = _run(tmp_path, obj, ply, "--edge-verts", *_pairs(grid), "--radius", 3.0, "--axis", "X",
+                     "--jobs", 1)
+    assert code == 0 and res["a.obj"]["ok"] and res["b.ply"]["ok"]
+    np.testing.assert_allclose(mesh_io.load(str(tmp_path / "a_straight.obj")).co, ref, atol=1e-6)
+    np.testing.assert_allclose(mesh_io.load(str(tmp_path / "b_straight.ply")).co, ref, atol=1e-6)
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_bad_file_is_one_failed_record(tmp_path, grid, jobs):
+    good = str(tmp_path / "good.ply")
+    write_ply(good, grid.co, *grid.faces)
+    bad = tmp_path / "bad.ply"
+    bad.write_bytes(b"ply\nformat binary_little_endian 1.0\nelement vertex 1\nproperty half x\nend_header\n\0\0")
+
+    code, res = _run(tmp_path, bad, good, "--edge-verts", *_pairs(grid), "--jobs", jobs)
+    assert code == 1
+    assert not res["bad.ply"]["ok"] and "unsupported PLY type 'half'" in res["bad.ply"]["error"]
+    assert res["good.ply"]["ok"] and os.path.exists(tmp_path / "good_straight.ply")
+
+
+def test_stream_matches_batch(tmp_path, grid):
+    ply = str(tmp_path / "m.ply")
+    write_ply(ply, grid.co, *grid.faces)
+    args = ("--edge-verts", *_pairs(grid), "--radius", 3.0, "--all-islands", "--jobs", 1)
+    assert _run(tmp_path, ply, "--out-dir", tmp_path / "mem", *args)[0] == 0
+    assert _run(tmp_path, ply, "--out-dir", tmp_path / "stream", "--stream", "--chunk", 20, *args)[0] == 0
+    a = mesh_io.load(str(tmp_path / "mem" / "m_straight.ply")).co
+    b = mesh_io.load(str(tmp_path / "stream" / "m_straight.ply")).co
+    np.testing.assert_allclose(a, b, atol=1e-5)
+
+
+def test_failed_stream_keeps_existing_output(tmp_path, grid):
+    obj = str(tmp_path / "m.obj")
+    write_obj(obj, grid.co, *grid.faces)
+    (tmp_path / "m_straight.obj").write_bytes(b"previous good output")
+    code, res = _run(tmp_path, obj, "--stream", "--edge-verts", *_pairs(grid), "--jobs", 1)
+    assert code == 1 and not res["m.obj"]["ok"]
+    assert (tmp_path / "m_straight.obj").read_bytes() == b"previous good output"
+
+    # Failure after the copy (loop vertex out of range): no temp file left, output untouched
+    ply = str(tmp_path / "p.ply")
+    write_ply(ply, grid.co, *grid.faces)
+    (tmp_path / "p_straight.ply").write_bytes(b"previous good output")
+    code, res = _run(tmp_path, ply, "--stream", "--edge-verts", "0-1", f"1-{len(grid.co) + 5}", "--jobs", 1)
+    assert code == 1 and "out of range" in res["p.ply"]["error"]
+    assert (tmp_path / "p_straight.ply").read_bytes() == b"previous good output"
+    assert sorted(os.listdir(tmp_path)) == ["m.obj", "m_straight.obj", "p.ply", "p_straight.ply", "summary.json"]
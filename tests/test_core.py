@@ -0,0 +1,239 @@
+"""core.straighten against a port of the original per-vertex operator loop."""
+import numpy as np
+import pytest
+
+from conftest import Grid
+from edge_straighten_pro import core, topology
+
+
+def _smooth01(x: float) -> float:
+    x = 0.0 if x < 0.0 else (1.0 if x > 1.0 else x)
+    return x * x * (3.0 - 2.0 * x)
+
+
+def baseline_straighten(co, mw, loops, island, R, K=5, strength=1.0, smooth=True, axis="Y",
+                        keep_y=True, flatten_to_zero=False):
+    """The original operator's propagation, vertex by vertex (mathutils -> NumPy, KD-tree -> brute force).
+
+    ``loops`` is a list of vertex index arrays; each loop is flattened onto
+    its own centroid line (the original handled one loop, the multi-loop
+    version pools all loop points into one KD-tree). ``island`` is a vertex
+    index set or None. Returns new local coordinates (float64).
+    """
+    mw = np.asarray(mw, dtype=np.float64)
+    imw = np.linalg.inv(mw)
+    world = np.asarray(co, dtype=np.float64) @ mw[:3, :3].T + mw[:3, 3]
+    keep_idx = core.AXES[axis]
+    flat_idxs = [i for i in (0, 1, 2) if i != keep_idx]
+
+    before, deltas = {}, {}
+    for verts in loops:
+        target_vals = world[verts].mean(axis=0)
+        if flatten_to_zero:
+            target_vals[flat_idxs] = 0.0
+        for v in verts:
+            newc = world[v].copy()
+            newc[flat_idxs] = target_vals[flat_idxs]
+            before[int(v)] = world[v]
+            deltas[int(v)] = newc - world[v]
+
+    out = world.copy()
+    for v in before:
+        out[v] = before[v] + deltas[v]
+
+    vids = list(before)
+    pos = np.array([before[v] for v in vids])
+    dl = np.array([deltas[v] for v in vids])
+    keepY = axis == "Y" and keep_y
+    for v in range(len(world)):
+        if v in before:
+            continue
+        if island is not None and v not in island:
+            continue
+        Pw = world[v]
+        dist = np.linalg.norm(pos - Pw, axis=1)
+        near = np.argsort(dist, kind="stable")[:K]
+        accum = np.zeros(3)
+        wsum = 0.0
+        for i in near:
+            t = 1.0 - max(0.0, min(1.0, dist[i] / R))
+            w = _smooth01(t) if smooth else t
+            accum += dl[i] * w
+            wsum += w
+        if wsum <= 1e-12:
+            continue
+        newP = Pw + (accum / wsum) * strength
+        if keepY:
+            newP[1] = Pw[1]
+        out[v] = newP
+    return out @ imw[:3, :3].T + imw[:3, 3]
+
+
+def island_of(topo, verts):
+    """Vertex set connected to ``verts`` (plain BFS, as the original operator did)."""
+    adj = [[] for _ in range(topo.n_verts)]
+    for a, b in topo.edges.tolist():
+        adj[a].append(b)
+        adj[b].append(a)
+    seen = set(int(v) for v in verts)
+    stack = list(seen)
+    while stack:
+        for w in adj[stack.pop()]:
+            if w not in seen:
+                seen.add(w)
+                stack.append(w)
+    return seen
+
+
+@pytest.mark.parametrize("axis, smooth, K, same_island, strength, keep_y", [
+    ("Y", True, 5, True, 1.0, True),
+    ("X", False, 3, False, 0.7, True),
+    ("Z", True, 8, True, 0.5, False),
+    ("Y", False, 1, False, 1.0, False),
+])
+def test_matches_baseline(world_matrix, axis, smooth, K, same_island, strength, keep_y):
+    g = Grid(24, 18, copies=2)
+    loop = g.row(8)
+    R = 6.0
+    out, info = core.straighten(g.co.copy(), g.topo, g.row_edges(8), world_matrix, radius=R, axis=axis,
+                                smooth=smooth, k_nearest=K, only_same_island=same_island, strength=strength,
+                                keep_Y_when_Y_axis=keep_y)
+    island = island_of(g.topo, loop) if same_island else None
+    ref = baseline_straighten(g.co, world_matrix, [loop], island, R, K, strength, smooth, axis, keep_y)
+    np.testing.assert_allclose(out, ref, atol=2e-5)
+    assert info["loops"] == 1 and info["loop_verts"] == len(loop)
+    assert info["affected"] > 0
+
+
+def test_single_edge_grows_to_loop(world_matrix):
+    g = Grid(20, 14)
+    full, _ = core.straighten(g.co.copy(), g.topo, g.row_edges(6), world_matrix, radius=5.0)
+    one, info = core.straighten(g.co.copy(), g.topo, g.row_edges(6)[7:8], world_matrix, radius=5.0)
+    assert info["loop_verts"] == g.nx
+    np.testing.assert_array_equal(one, full)
+
+
+def test_multi_loop(world_matrix):
+    g = Grid(22, 30)
+    loops = [g.row(6), g.row(22)]
+    edges = np.concatenate([g.row_edges(6), g.row_edges(22)])
+    out, info = core.straighten(g.co.copy(), g.topo, edges, world_matrix, radius=7.0, axis="X", k_nearest=4)
+    assert info["loops"] == 2
+    ref = baseline_straighten(g.co, world_matrix, loops, island_of(g.topo, loops[0]), 7.0, 4, axis="X")
+    np.testing.assert_allclose(out, ref, atol=2e-5)
+
+    # Every loop lands on its own line through its own centroid
+    world = out.astype(np.float64) @ world_matrix[:3, :3].T + world_matrix[:3, 3]
+    for v in loops:
+        assert np.ptp(world[v][:, [1, 2]], axis=0).max() < 1e-4
+
+
+def test_workers_identical(world_matrix):
+    # Enough candidates inside R for the thread pool to actually split the queries
+    g = Grid(150, 130)
+    args = (g.topo, g.row_edges(65), world_matrix)
+    one, _ = core.straighten(g.co.copy(), *args, radius=400.0, k_nearest=6, workers=1)
+    many, _ = core.straighten(g.co.copy(), *args, radius=400.0, k_nearest=6, workers=4)
+    np.testing.assert_array_equal(one, many)
+    poly1, _ = core.straighten(g.co.copy(), *args, radius=400.0, interpolation="POLYLINE", workers=1)
+    poly4, _ = core.straighten(g.co.copy(), *args, radius=400.0, interpolation="POLYLINE", workers=4)
+    np.testing.assert_array_equal(poly1, poly4)
+
+
+def test_polyline_branching_selection(world_matrix):
+    g = Grid(20, 16)
+    # Row 7 crossed by column 9: one branching component without a single walk order
+    col = g.vid(9, np.arange(g.ny))
+    col_edges = g.topo.find_edges(np.c_[col[:-1], col[1:]])
+    edges = np.concatenate([g.row_edges(7), col_edges])
+    entry = core.build_loop(g.topo, edges, g.co, world_matrix)
+    order, ptr, closed = core.loop_chains(entry)
+    assert len(ptr) - 1 == 4 and not closed.any()
+    assert np.all(g.topo.find_edges(entry.loop_idx[np.c_[order[:-1], order[1:]]][
+        ~np.isin(np.arange(1, len(order)), ptr[1:-1])]) >= 0)
+
+    R = 3.0
+    out, _ = core.straighten(g.co.copy(), g.topo, edges, world_matrix, radius=R, axis="X",
+                             interpolation="POLYLINE", only_same_island=False)
+
+    # Brute force: nearest selected mesh edge, delta interpolated between its two ends
+    world = g.co.astype(np.float64) @ world_matrix[:3, :3].T + world_matrix[:3, 3]
+    after = core.loop_deltas(entry, *core.flatten_targets(entry, "X", False))[0]
+    delta = np.zeros_like(world)
+    delta[entry.loop_idx] = after - world[entry.loop_idx]
+    ea, eb = g.topo.edges[edges].T
+    A, B = world[ea], world[eb]
+    AB = B - A
+    others = np.setdiff1d(np.arange(len(world)), entry.loop_idx)
+    P = world[others][:, None, :]
+    t = np.clip(np.einsum("pej,ej->pe", P - A, AB) / np.einsum("ej,ej->e", AB, AB), 0.0, 1.0)
+    d = np.linalg.norm(P - (A + t[..., None] * AB), axis=2)
+    near = np.argmin(d, axis=1)
+    tn = t[np.arange(len(others)), near][:, None]
+    hit = d[np.arange(len(others)), near] < R
+    ref = world.copy()
+    ref[entry.loop_idx] = after
+    ref[others[hit]] += ((1 - tn) * delta[ea[near]] + tn * delta[eb[near]])[hit]
+    ref = (ref - world_matrix[:3, 3]) @ np.linalg.inv(world_matrix[:3, :3]).T
+    np.testing.assert_allclose(out, ref, atol=2e-5)
+
+
+def test_relax_keeps_loop_and_outside(world_matrix):
+    g = Grid(24, 20)
+    kw = dict(radius=4.0, axis="X")
+    plain, _ = core.straighten(g.co.copy(), g.topo, g.row_edges(10), world_matrix, **kw)
+    for mode in ("LAPLACIAN", "TAUBIN"):
+        relaxed, _ = core.straighten(g.co.copy(), g.topo, g.row_edges(10), world_matrix, relax=mode, **kw)
+        np.testing.assert_array_equal(relaxed[g.row(10)], plain[g.row(10)])
+        assert not np.array_equal(relaxed, plain)
+        untouched = np.all(plain == g.co, axis=1)
+        _, ring = g.topo.adjacency(np.flatnonzero(~untouched))
+        far = untouched.copy()
+        far[ring] = False
+        np.testing.assert_array_equal(relaxed[far], g.co[far])
+    zero, _ = core.straighten(g.co.copy(), g.topo, g.row_edges(10), world_matrix, relax="TAUBIN",
+                              relax_factor=0.0, **kw)
+    np.testing.assert_array_equal(zero, plain)
+
+
+def test_relax_leaves_weight_zero_vertices(world_matrix):
+    g = Grid(24, 20)
+    kw = dict(radius=4.0, axis="X", relax="TAUBIN")
+    plain, _ = core.straighten(g.co.copy(), g.topo, g.row_edges(10), world_matrix, radius=4.0, axis="X")
+    moved = np.flatnonzero(np.any(plain != g.co, axis=1))
+    _, ring = g.topo.adjacency(moved)
+    # Weight 0: one vertex in the one-ring border and one the propagation would have moved
+    zero = np.array([np.setdiff1d(ring, moved)[0], np.setdiff1d(moved, g.row(10))[0]])
+    weights = np.ones(len(g.co), dtype=np.float32)
+    weights[zero] = 0.0
+
+    unweighted, _ = core.straighten(g.co.copy(), g.topo, g.row_edges(10), world_matrix, **kw)
+    assert np.all(np.any(unweighted[zero] != g.co[zero], axis=1))
+    out, _ = core.straighten(g.co.copy(), g.topo, g.row_edges(10), world_matrix, weights=weights, **kw)
+    np.testing.assert_array_equal(out[zero], g.co[zero])
+    assert not np.array_equal(out, plain)
+
+
+def test_no_loop_edges():
+    g = Grid(6, 6)
+    with pytest.raises(ValueError):
+        core.straighten(g.co.copy(), g.topo, [])
+
+
+def test_topology_from_faces_edges():
+    g = Grid(5, 4)
+    assert g.topo.n_edges == 5 * 3 + 4 * 4
+    assert np.all(g.row_edges(2) >= 0)
+    assert isinstance(g.topo, topology.MeshTopology)
+
+
+def test_split_chains():
+    order, ptr, closed = topology.split_chains(4, [(0, 1), (2, 1), (2, 3), (3, 0)])
+    assert order.tolist() == [0, 1, 2, 3] and ptr.tolist() == [0, 4] and closed.tolist() == [True]
+    # T junction: three chains meeting at vertex 1
+    order, ptr, closed = topology.split_chains(5, [(0, 1), (1, 2), (1, 3), (3, 4), (1, 0)])
+    chains = [order[a:b].tolist() for a, b in zip(ptr[:-1], ptr[1:])]
+    assert chains == [[0, 1], [1, 2], [1, 3, 4]] and not closed.any()
+    # Figure eight: both cycles start and end at the shared vertex
+    order, ptr, _ = topology.split_chains(5, [(0, 1), (1, 2), (2, 0), (0, 3), (3, 4), (4, 0)])
+    assert [order[a:b].tolist() for a, b in zip(ptr[:-1], ptr[1:])] == [[0, 1, 2, 0], [0, 3, 4, 0]]
@@ -0,0 +1,126 @@
+"""Persistent influence cache: round trip, key misses, LRU eviction, broken entries."""
+import os
+
+import numpy as np
+import pytest
+
+from conftest import Grid
+from edge_straighten_pro import core, diskcache, propagate
+
+
+@pytest.fixture
+def setup():
+    g = Grid(20, 14)
+    entry = core.build_loop(g.topo, g.row_edges(6), g.co, np.eye(4))
+    infl = core.influence_for(entry, g.co, 0, None, 3.0, 4, True)
+    return g, entry, infl
+
+
+def _key(g, entry, **kw):
+    args = dict(R=3.0, K=4, smooth=True, metric="EUCLIDEAN", interpolation="NEAREST")
+    args.update(kw)
+    world = args.pop("world", g.co)
+    return diskcache.DiskCache.key(world, g.topo, entry.loop_idx, entry.loop_ptr, entry.loop_closed, **args)
+
+
+def _same(a: propagate.Influence, b: propagate.Influence):
+    assert a.n == b.n
+    for f in ("rows", "indptr", "cols", "weights"):
+        np.testing.assert_array_equal(getattr(a, f), getattr(b, f))
+
+
+def test_round_trip_memmapped_read_only(tmp_path, setup):
+    g, entry, infl = setup
+    disk = diskcache.DiskCache(str(tmp_path))
+    key = _key(g, entry)
+    assert disk.load(key, len(g.co)) is None
+    disk.store(key, infl)
+    got = disk.load(key, len(g.co))
+    _same(got, infl)
+    assert isinstance(got.weights, np.memmap) and not got.weights.flags.writeable
+    # Blending straight from the mapped arrays gives the in-memory result
+    deltas = np.random.default_rng(0).normal(size=(len(entry.loop_idx), 3))
+    np.testing.assert_array_equal(got.apply(deltas, 0.8, None), infl.apply(deltas, 0.8, None))
+    assert [k for _, _, k in disk.entries()] == [key]
+
+
+def test_key_changes_with_mesh_and_settings(setup):
+    g, entry, _ = setup
+    base = _key(g, entry)
+    assert _key(g, entry) == base
+    moved = g.co.copy()
+    moved[0, 2] += 1e-3
+    mask = np.ones(len(g.co), dtype=bool)
+    variants = [
+        _key(g, entry, world=moved), _key(g, entry, R=3.5), _key(g, entry, K=5), _key(g, entry, smooth=False),
+        _key(g, entry, metric="GEODESIC"), _key(g, entry, interpolation="POLYLINE"),
+        _key(g, entry, island_mask=mask), _key(g, entry, weight_mask=mask), _key(g, entry, edges=entry.loop_edges),
+    ]
+    other = core.build_loop(g.topo, g.row_edges(7), g.co, np.eye(4))
+    variants.append(_key(g, other))
+    assert len(set(variants)) == len(variants) and base not in variants
+
+
+def test_straighten_reuses_disk_entry(tmp_path, setup):
+    g, _, _ = setup
+    disk = diskcache.DiskCache(str(tmp_path))
+    first, _ = core.straighten(g.co.copy(), g.topo, g.row_edges(6), radius=3.0, disk=disk)
+    assert len(disk.entries()) == 1
+    again, _ = core.straighten(g.co.copy(), g.topo, g.row_edges(6), radius=3.0, disk=disk)
+    np.testing.assert_array_equal(first, again)
+    core.straighten(g.co.copy(), g.topo, g.row_edges(6), radius=2.0, disk=disk)
+    assert len(disk.entries()) == 2
+
+
+def test_lru_eviction(tmp_path, setup):
+    g, entry, infl = setup
+    disk = diskcache.DiskCache(str(tmp_path))
+    keys = [_key(g, entry, R=r) for r in (1.0, 2.0, 3.0)]
+    for i, k in enumerate(keys):
+        disk.store(k, infl)
+        os.utime(os.path.join(str(tmp_path), k), (1000 + i, 1000 + i))
+    size = disk.entries()[0][1]
+    assert disk.nbytes == 3 * size
+
+    # A hit makes keys[0] the most recently used; the cap then fits two entries
+    assert disk.load(keys[0], len(g.co)) is not None
+    disk.max_bytes = 2 * size
+    new = _key(g, entry, R=4.0)
+    disk.store(new, infl)
+    assert sorted(k for _, _, k in disk.entries()) == sorted([keys[0], new])
+    assert disk.nbytes <= disk.max_bytes
+
+    # The entry just written survives even when it alone is over the cap
+    disk.max_bytes = size // 2
+    disk.store(keys[1], infl)
+    assert [k for _, _, k in disk.entries()] == [keys[1]]
+
+
+@pytest.mark.parametrize("damage", ["truncate", "garbage", "missing"])
+def test_broken_entry_is_a_miss_and_gets_rewritten(tmp_path, setup, damage):
+    g, entry, infl = setup
+    disk = diskcache.DiskCache(str(tmp_path))
+    key = _key(g, entry)
+    disk.store(key, infl)
+    path = os.path.join(str(tmp_path), key, "weights.npy")
+    if damage == "truncate":
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) // 2)
+    elif damage == "garbage":
+        with open(path, "wb") as f:
+            f.write(b"not an npy file")
+    else:
+        os.remove(path)
+
+    assert disk.load(key, len(g.co)) is None
+    disk.store(key, infl)
+    _same(disk.load(key, len(g.co)), infl)
+
+
+def test_unwritable_cache_is_skipped(tmp_path, setup):
+    g, entry, infl = setup
+    blocker = tmp_path / "file"
+    blocker.write_bytes(b"")
+    disk = diskcache.DiskCache(str(blocker / "cache"))   # parent is a file: nothing can be created
+    disk.store(_key(g, entry), infl)
+    assert disk.load(_key(g, entry), len(g.co)) is None and disk.entries() == []
@@ -0,0 +1,221 @@
+"""Updater network code against a local HTTP server: conditional manifest fetch and resumable download."""
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from edge_straighten_pro import remote
+
+MANIFEST = {"version": [1, 4, 0], "notes": "test release", "sha256": ""}
+PAYLOAD = bytes(range(256)) * 1200   # ~300 KB, a few CHUNKs
+PAYLOAD_SHA = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """``/manifest.json`` with an ETag (304 on a match), ``/release.zip`` with ``Range`` support."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        srv.requests.append((self.path, dict(self.headers)))
+        if self.path == "/manifest.json":
+            body = json.dumps(srv.manifest).encode("utf-8")
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self._send(200, body, {"ETag": etag})
+        elif self.path == "/release.zip":
+            rng = self.headers.get("Range")
+            if rng and srv.ranges:
+                # ``range_from`` set: a broken server that ignores the requested offset
+                start = int(rng.split("=")[1].rstrip("-")) if srv.range_from is None else srv.range_from
+                if start >= len(srv.payload):
+                    self._send(416, b"", {"Content-Range": f"bytes */{len(srv.payload)}"})
+                    return
+                self._send(206, srv.payload[start:],
+                           {"Content-Range": f"bytes {start}-{len(srv.payload) - 1}/{len(srv.payload)}"})
+            else:
+                self._send(200, srv.payload)
+        else:
+            self._send(404, b"")
+
+    def _send(self, code, body, headers=None):
+        self.send_response(code)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope="module")
+def _http():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.url = f"http://127.0.0.1:{srv.server_address[1]}"
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def server(_http):
+    _http.manifest, _http.payload, _http.requests = dict(MANIFEST), PAYLOAD, []
+    _http.ranges, _http.range_from = True, None
+    return _http
+
+
+# -----------------------------
+# Manifest
+# -----------------------------
+def test_fetch_manifest_network_then_not_modified(server, tmp_path):
+    cache = str(tmp_path / "manifest.json")
+    data, source = remote.fetch_manifest(server.url + "/manifest.json", cache)
+    assert (data, source) == (MANIFEST, "network")
+    assert remote.read_cache(cache) == MANIFEST
+
+    # ttl=0: always asks, but conditionally -> bodyless 304, cache reused
+    data, source = remote.fetch_manifest(server.url + "/manifest.json", cache)
+    assert (data, source) == (MANIFEST, "not-modified")
+    assert server.requests[-1][1].get("If-None-Match")
+
+    # A changed manifest is fetched again and replaces the cache
+    server.manifest["version"] = [1, 5, 0]
+    data, source = remote.fetch_manifest(server.url + "/manifest.json", cache)
+    assert source == "network" and data["version"] == [1, 5, 0]
+    assert remote.read_cache(cache)["version"] == [1, 5, 0]
+
+
+def test_fetch_manifest_ttl_skips_request(server, tmp_path):
+    cache = str(tmp_path / "manifest.json")
+    remote.fetch_manifest(server.url + "/manifest.json", cache, ttl=3600)
+    n = len(server.requests)
+    data, source = remote.fetch_manifest(server.url + "/manifest.json", cache, ttl=3600)
+    assert (data, source) == (MANIFEST, "cache")
+    assert len(server.requests) == n
+    # Expired TTL -> conditional request again
+    os.utime(cache, (0, 0))
+    assert remote.fetch_manifest(server.url + "/manifest.json", cache, ttl=3600)[1] == "not-modified"
+
+
+def test_fetch_manifest_errors(server, tmp_path):
+    with pytest.raises(OSError):
+        remote.fetch_manifest(server.url + "/missing.json", str(tmp_path / "m.json"))
+
+
+def test_manifest_check_refresh(server, tmp_path):
+    check = remote.ManifestCheck(server.url + "/manifest.json", str(tmp_path / "manifest.json"), ttl=3600)
+    st = check.refresh()
+    assert st.remote == (1, 4, 0) and st.notes == "test release" and st.source == "network"
+    assert not st.checking and not st.error
+    assert check.refresh().source == "cache"
+    assert check.refresh(force=True).source == "not-modified"
+
+    # Failure keeps the last known manifest and only adds the error
+    check.url = server.url + "/missing.json"
+    st = check.refresh(force=True)
+    assert st.remote == (1, 4, 0) and "HTTPError" in st.error and not st.checking
+
+
+def test_manifest_check_background(server, tmp_path):
+    check = remote.ManifestCheck(server.url + "/manifest.json", str(tmp_path / "manifest.json"))
+    assert check.start()
+    st = check.wait(10.0)
+    assert st.remote == (1, 4, 0) and not st.checking
+
+
+# -----------------------------
+# Download
+# -----------------------------
+def test_download_full(server, tmp_path):
+    dest = str(tmp_path / "rel.zip")
+    seen = []
+    assert remote.download(server.url + "/release.zip", dest, PAYLOAD_SHA, progress=lambda d, t: seen.append((d, t)))
+    assert open(dest, "rb").read() == PAYLOAD
+    assert not os.path.exists(dest + ".part")
+    assert seen[-1] == (len(PAYLOAD), len(PAYLOAD))
+
+
+def test_download_resumes_part(server, tmp_path):
+    dest = str(tmp_path / "rel.zip")
+    with open(dest + ".part", "wb") as f:
+        f.write(PAYLOAD[:100000])
+    remote.download(server.url + "/release.zip", dest, PAYLOAD_SHA)
+    assert open(dest, "rb").read() == PAYLOAD
+    assert server.requests[-1][1].get("Range") == "bytes=100000-"
+
+
+def test_download_restarts_without_range_support(server, tmp_path):
+    server.ranges = False
+    dest = str(tmp_path / "rel.zip")
+    with open(dest + ".part", "wb") as f:
+        f.write(b"stale bytes")
+    remote.download(server.url + "/release.zip", dest, PAYLOAD_SHA)
+    assert open(dest, "rb").read() == PAYLOAD
+
+
+def test_download_restarts_on_wrong_content_range(server, tmp_path):
+    server.range_from = 0
+    dest = str(tmp_path / "rel.zip")
+    with open(dest + ".part", "wb") as f:
+        f.write(PAYLOAD[:100000])
+    # Appending the 206 body would duplicate 100000 bytes; the download starts over instead
+    remote.download(server.url + "/release.zip", dest)
+    assert open(dest, "rb").read() == PAYLOAD
+    assert "Range" not in server.requests[-1][1]
+
+
+def test_download_416(server, tmp_path):
+    dest = str(tmp_path / "rel.zip")
+    # Complete .part + hash: 416 is accepted after the check, no new transfer
+    with open(dest + ".part", "wb") as f:
+        f.write(PAYLOAD)
+    remote.download(server.url + "/release.zip", dest, PAYLOAD_SHA)
+    assert open(dest, "rb").read() == PAYLOAD and len(server.requests) == 1
+
+    # Same 416 without a hash proves nothing (the .part may hold anything): fetched again
+    with open(dest + ".part", "wb") as f:
+        f.write(b"y" * (len(PAYLOAD) + 10))
+    remote.download(server.url + "/release.zip", dest)
+    assert open(dest, "rb").read() == PAYLOAD
+    assert not os.path.exists(dest + ".part")
+
+
+def test_download_hash_mismatch(server, tmp_path):
+    dest = str(tmp_path / "rel.zip")
+    with pytest.raises(ValueError):
+        remote.download(server.url + "/release.zip", dest, "0" * 64)
+    assert not os.path.exists(dest) and not os.path.exists(dest + ".part")
+
+    # A corrupt .part is resumed, fails the check and is dropped, so the next try starts clean
+    with open(dest + ".part", "wb") as f:
+        f.write(b"x" * 1000)
+    with pytest.raises(ValueError):
+        remote.download(server.url + "/release.zip", dest, PAYLOAD_SHA)
+    assert not os.path.exists(dest + ".part")
+    remote.download(server.url + "/release.zip", dest, PAYLOAD_SHA)
+    assert open(dest, "rb").read() == PAYLOAD
+
+
+def test_download_cancel_keeps_part(server, tmp_path):
+    dest = str(tmp_path / "rel.zip")
+    cancel = threading.Event()
+
+    def progress(done, total):
+        if done >= 2 * remote.CHUNK:
+            cancel.set()
+
+    with pytest.raises(remote.Cancelled):
+        remote.download(server.url + "/release.zip", dest, PAYLOAD_SHA, progress=progress, cancel=cancel)
+    assert 0 < os.path.getsize(dest + ".part") < len(PAYLOAD)
+    remote.download(server.url + "/release.zip", dest, PAYLOAD_SHA)
+    assert open(dest, "rb").read() == PAYLOAD
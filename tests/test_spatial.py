@@ -0,0 +1,109 @@
+"""Neighbour queries against brute force: geodesic K nearest, nearest loop segment, grid KNN."""
+import heapq
+
+import numpy as np
+
+from conftest import Grid
+from edge_straighten_pro import spatial
+
+
+def dijkstra(topo, co, source: int, radius: float) -> dict:
+    """Edge-path distance from ``source`` to every vertex closer than ``radius``."""
+    adj = [[] for _ in range(topo.n_verts)]
+    for a, b in topo.edges.tolist():
+        w = float(np.linalg.norm(co[a] - co[b]))
+        adj[a].append((b, w))
+        adj[b].append((a, w))
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for w, length in adj[u]:
+            nd = d + length
+            if nd < radius and nd < dist.get(w, np.inf):
+                dist[w] = nd
+                heapq.heappush(heap, (nd, w))
+    return dist
+
+
+def test_geodesic_knn_matches_dijkstra():
+    g = Grid(16, 12, copies=2, gap=0.3)
+    co = g.co.astype(np.float64)
+    sources = np.r_[g.row(5), g.vid([3, 9], 2, grid=1)]
+    R, K = 4.5, 3
+
+    per_vertex = {}
+    for j, s in enumerate(sources.tolist()):
+        for v, d in dijkstra(g.topo, co, s, R).items():
+            per_vertex.setdefault(v, []).append((d, j))
+    expected = sorted((v, j, d) for v, lst in per_vertex.items() for d, j in sorted(lst)[:K])
+
+    rows, cols, dist = g.topo.geodesic_knn(co, sources, R, K)
+    got = sorted(zip(rows.tolist(), cols.tolist(), dist.tolist()))
+    assert [(v, j) for v, j, _ in got] == [(v, j) for v, j, _ in expected]
+    np.testing.assert_allclose([d for *_, d in got], [d for *_, d in expected], rtol=1e-9, atol=1e-9)
+    # Nothing leaks across the gap between the two grids
+    assert not np.any((rows >= g.nx * g.ny) & (cols < g.nx))
+
+
+def _segments(pos, ptr, closed):
+    segs = []
+    for l in range(len(ptr) - 1):
+        s, e = ptr[l], ptr[l + 1]
+        segs += [(i, i + 1) for i in range(s, e - 1)]
+        if e - s == 1:
+            segs.append((s, s))
+        elif closed[l] and e - s > 2:
+            segs.append((e - 1, s))
+    return segs
+
+
+def _point_segment(points, a, b):
+    """Distance from every point to segment ``a``-``b``."""
+    ab = b - a
+    t = np.clip((points - a) @ ab / max(np.dot(ab, ab), 1e-300), 0.0, 1.0)
+    return np.linalg.norm(points - (a + t[:, None] * ab), axis=1)
+
+
+def test_segment_index_matches_brute_force():
+    rng = np.random.default_rng(3)
+    s = np.linspace(0.0, 2.0 * np.pi, 60, endpoint=False)
+    ring = np.c_[3.0 * np.cos(s), 2.0 * np.sin(s), 0.3 * np.sin(3 * s)]
+    wave = np.c_[np.linspace(-4.0, 4.0, 45), 4.0 + 0.5 * np.sin(np.linspace(0, 6, 45)), np.zeros(45)]
+    pos = np.r_[ring, wave, [[5.0, -3.0, 1.0]]]
+    ptr = np.array([0, 60, 105, 106])
+    closed = np.array([True, False, False])
+    R = 1.5
+    index = spatial.SegmentIndex(pos, ptr, closed, R)
+    segs = _segments(pos, ptr, closed)
+    assert len(index) == len(segs)
+
+    points = rng.uniform((-6, -5, -1.5), (7, 6, 1.5), (3000, 3))
+    brute = np.min([_point_segment(points, pos[a], pos[b]) for a, b in segs], axis=0)
+
+    rows, seg, t, dist = [np.concatenate(x) for x in zip(*index.iter_nearest(points))]
+    np.testing.assert_array_equal(rows, np.flatnonzero(brute < R))
+    np.testing.assert_allclose(dist, brute[rows], rtol=1e-9, atol=1e-12)
+    # t is the projection on the reported segment
+    A, B = pos[index.a[seg]], pos[index.b[seg]]
+    proj = A + t[:, None] * (B - A)
+    np.testing.assert_allclose(np.linalg.norm(points[rows] - proj, axis=1), dist, rtol=1e-9, atol=1e-12)
+
+
+def test_loop_index_knn_matches_brute_force():
+    rng = np.random.default_rng(5)
+    loop = rng.uniform(-5, 5, (400, 3))
+    points = rng.uniform(-7, 7, (2500, 3))
+    R, K = 2.0, 4
+    index = spatial.LoopIndex(loop, R)
+    rows, cols, dist = index.query(points, K)
+
+    d = np.linalg.norm(points[:, None, :] - loop[None, :, :], axis=2)
+    expected = []
+    for i in range(len(points)):
+        order = np.argsort(d[i])[:K]
+        expected += [(i, int(j)) for j in order if d[i, j] < R]
+    assert sorted(zip(rows.tolist(), cols.tolist())) == sorted(expected)
+    np.testing.assert_allclose(dist, d[rows, cols], rtol=1e-6)
@@ -0,0 +1,58 @@
+"""Chunked (out-of-core) straighten against the in-memory core."""
+import numpy as np
+import pytest
+
+from conftest import Grid
+from edge_straighten_pro import core, mesh_io, stream
+
+
+@pytest.mark.parametrize("interpolation", ["NEAREST", "POLYLINE"])
+def test_chunked_matches_in_memory(world_matrix, interpolation):
+    g = Grid(40, 32)
+    # Grid column: contiguous vertex ids, so chunks far from it are skipped
+    loop = g.vid(20, np.arange(g.ny))
+    pairs = np.c_[loop[:-1], loop[1:]]
+    kw = dict(radius=5.0, axis="Y", k_nearest=4, only_same_island=False, interpolation=interpolation)
+    ref, info = core.straighten(g.co.copy(), g.topo, g.topo.find_edges(pairs), world_matrix, **kw)
+
+    idx, ptr, closed = stream.loops_from_pairs(pairs)
+    np.testing.assert_array_equal(idx, loop)
+    co = g.co.copy()
+    # Small chunks: several are skipped (outside loop bbox + R), several straddle the loop
+    out = stream.straighten_chunked(co, idx, ptr, closed, world_matrix, chunk=97, **kw)
+    assert 0 < out["chunks_touched"] < out["chunks"]
+    assert out["affected"] == info["affected"]
+    np.testing.assert_allclose(co, ref, atol=1e-5)
+
+
+def test_chunked_on_memmapped_npy(tmp_path, world_matrix):
+    g = Grid(30, 24)
+    path = str(tmp_path / "grid.npy")
+    np.save(path, g.co)
+    loop = g.row(11)
+    kw = dict(radius=4.0, axis="X", only_same_island=False)
+    ref, _ = core.straighten(g.co.copy(), g.topo, g.row_edges(11), world_matrix, **kw)
+
+    vm = mesh_io.memmap_vertices(path, mode="r+")
+    idx, ptr, closed = stream.loops_from_pairs(np.c_[loop[:-1], loop[1:]])
+    stream.straighten_chunked(vm.co, idx, ptr, closed, world_matrix, chunk=128, **kw)
+    vm.flush()
+    del vm
+    np.testing.assert_allclose(np.load(path), ref, atol=1e-5)
+
+
+def test_chunked_rejects_topology_features():
+    g = Grid(6, 6)
+    idx, ptr, closed = stream.loops_from_pairs(np.c_[g.row(2)[:-1], g.row(2)[1:]])
+    with pytest.raises(ValueError):
+        stream.straighten_chunked(g.co.copy(), idx, ptr, closed, falloff_metric="GEODESIC")
+    with pytest.raises(ValueError):
+        stream.straighten_chunked(g.co.copy(), idx, ptr, closed, relax="LAPLACIAN")
+
+
+def test_branching_pairs_rejected_for_polyline():
+    pairs = [(0, 1), (1, 2), (1, 3)]
+    idx, ptr, _ = stream.loops_from_pairs(pairs)
+    assert len(ptr) == 2 and sorted(idx.tolist()) == [0, 1, 2, 3]
+    with pytest.raises(ValueError, match="branch at vertex 1"):
+        stream.loops_from_pairs(pairs, allow_branches=False)
@@ -0,0 +1,107 @@
+"""Build the release zip and stamp its SHA-256 into update_manifest.json.
+
+    python tools/make_release.py               # -> dist/edge_straighten_pro_v<version>.zip
+    python tools/make_release.py --notes "..."
+
+The version comes from ``bl_info`` in ``__init__.py``. The zip is
+reproducible (sorted add-on files, fixed timestamps and permissions), so
+re-running it on the same tree gives the same bytes and the same hash.
+Upload exactly this file as the asset of the GitHub release ``v<version>``;
+the updater refuses releases whose manifest has no ``sha256``.
+
+The manifest is only stamped when ``bl_info`` is newer than its version:
+an already published version keeps the hash of the asset that was
+uploaded for it (``--no-stamp`` builds the zip without touching it).
+
+``update_manifest.json`` itself is not packed: the updater reads it from
+the repository, and packing it would change the hash it records.
+"""
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import sys
+import zipfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PKG_NAME = "edge_straighten_pro"
+MANIFEST = os.path.join(REPO_DIR, "update_manifest.json")
+ZIP_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def addon_version() -> tuple:
+    """``bl_info["version"]`` read from ``__init__.py`` without importing it (no bpy needed)."""
+    with open(os.path.join(REPO_DIR, "__init__.py"), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", "") == "bl_info" for t in node.targets):
+            return tuple(ast.literal_eval(node.value)["version"])
+    raise ValueError("bl_info not found in __init__.py")
+
+
+def addon_files() -> list:
+    """Files shipped in the zip: the add-on modules and the README (no benchmarks / tools)."""
+    files = glob.glob(os.path.join(REPO_DIR, "*.py")) + [os.path.join(REPO_DIR, "README.md")]
+    return sorted(f for f in files if os.path.isfile(f))
+
+
+def build_zip(path: str) -> str:
+    """Write the reproducible release zip to ``path``; returns its SHA-256 (hex)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with zipfile.ZipFile(path, "w") as zf:
+        for src in addon_files():
+            info = zipfile.ZipInfo(f"{PKG_NAME}/{os.path.basename(src)}", date_time=ZIP_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            with open(src, "rb") as f:
+                zf.writestr(info, f.read(), compresslevel=9)
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def manifest_version() -> tuple:
+    with open(MANIFEST, "r", encoding="utf-8") as f:
+        return tuple(json.load(f).get("version") or (0, 0, 0))
+
+
+def stamp_manifest(version: tuple, sha256: str, notes=None):
+    with open(MANIFEST, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["version"] = list(version)
+    data["sha256"] = sha256
+    if notes is not None:
+        data["notes"] = notes
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="make_release")
+    p.add_argument("--out-dir", default=os.path.join(REPO_DIR, "dist"))
+    p.add_argument("--notes", default=None, help="release notes for the manifest (default: keep)")
+    p.add_argument("--no-stamp", action="store_true", help="only build the zip, leave the manifest alone")
+    args = p.parse_args(argv)
+
+    version = addon_version()
+    ver = ".".join(map(str, version))
+    published = manifest_version()
+    if not args.no_stamp and version <= published:
+        # Yayınlanmış bir sürümün hash'i, bu ağaçtan yeniden üretilen zip'in hash'i değildir
+        print(f"bl_info version {ver} is not newer than the manifest's {'.'.join(map(str, published))}; "
+              f"bump bl_info[\"version\"] first (or pass --no-stamp to only build the zip)", file=sys.stderr)
+        return 1
+    path = os.path.join(args.out_dir, f"{PKG_NAME}_v{ver}.zip")
+    sha256 = build_zip(path)
+    if not args.no_stamp:
+        stamp_manifest(version, sha256, args.notes)
+    print(f"{path}\nsha256 {sha256}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,451 @@
+"""Mesh topology on plain index arrays (no bpy/bmesh).
+
+Built once from the bulk arrays Blender exposes through ``foreach_get``
+(edge vertices, loop edge indices, polygon loop ranges) and then queried
+without touching selection state or needing a viewport context, so it
+works the same in background mode and from batch scripts.
+"""
+import hashlib
+
+import numpy as np
+
+
+def ranges(start: np.ndarray, count: np.ndarray) -> np.ndarray:
+    """Concatenate ``arange(s, s + c)`` for every (s, c) pair (CSR row gather, also used by :mod:`spatial`)."""
+    total = int(count.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    ends = np.cumsum(count)
+    return np.arange(total, dtype=np.int64) - np.repeat(ends - count - start, count)
+
+
+def _csr(keys: np.ndarray, values: np.ndarray, n: int):
+    """Group ``values`` by ``keys`` (0..n-1) -> (indptr, grouped values)."""
+    keys = np.asarray(keys, dtype=np.int64)
+    order = np.argsort(keys, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n), out=indptr[1:])
+    if indptr[-1] <= np.iinfo(np.int32).max:
+        indptr = indptr.astype(np.int32)
+    return indptr, np.asarray(values)[order].astype(np.int32)
+
+
+def _edge_len(co: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """float64 lengths of the edges (a[i], b[i]), whatever the dtype of ``co``."""
+    d = co[a].astype(np.float64)
+    d -= co[b]
+    return np.sqrt(np.einsum("ij,ij->i", d, d))
+
+
+def connected_components(n: int, edges) -> np.ndarray:
+    """Per-vertex component labels (0..k-1) by vectorized union-find.
+
+    Each round hooks the larger root of every still-split edge onto the
+    smaller one and then pointer-jumps until every vertex points at its
+    root, so only O(log n) passes over the edge arrays are needed.
+    """
+    parent = np.arange(n, dtype=np.int64)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    a, b = edges[:, 0], edges[:, 1]
+    while len(a):
+        pa, pb = parent[a], parent[b]
+        split = pa != pb
+        if not split.any():
+            break
+        a, b, pa, pb = a[split], b[split], pa[split], pb[split]
+        np.minimum.at(parent, np.maximum(pa, pb), np.minimum(pa, pb))
+        while True:
+            gp = parent[parent]
+            if np.array_equal(gp, parent):
+                break
+            parent = gp
+    _, labels = np.unique(parent, return_inverse=True)
+    return labels.astype(np.int32)
+
+
+def split_chains(n: int, edges):
+    """Split an edge set into simple chains at branch vertices -> ``(order, ptr, closed)``.
+
+    Chains run between vertices whose degree is not 2 (ends, branch and
+    crossing points, which appear in every chain they join); components
+    without such a vertex are single closed cycles. Chain ``c`` walks
+    ``order[ptr[c]:ptr[c + 1]]``, so consecutive entries are always joined
+    by an edge. Vertex ids are ``0..n-1``; duplicate edges are ignored.
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    edges = np.unique(np.sort(edges[edges[:, 0] != edges[:, 1]], axis=1), axis=0)
+    links = [[] for _ in range(n)]
+    for e, (a, b) in enumerate(edges.tolist()):
+        links[a].append((b, e))
+        links[b].append((a, e))
+    used = np.zeros(len(edges), dtype=bool)
+    order, ptr, closed = [], [0], []
+
+    def walk(v, w, e):
+        chain = [v]
+        while True:
+            used[e] = True
+            chain.append(w)
+            nxt = [(x, f) for x, f in links[w] if not used[f]] if len(links[w]) == 2 else []
+            if not nxt:
+                return chain
+            w, e = nxt[0]
+
+    # Önce dal / uç noktalarından açık zincirler, kalan kenarlar saf döngüler
+    for v in range(n):
+        if len(links[v]) != 2:
+            for w, e in links[v]:
+                if not used[e]:
+                    order += walk(v, w, e)
+                    ptr.append(len(order))
+                    closed.append(False)
+    for e in np.flatnonzero(~used).tolist():
+        if not used[e]:
+            a, b = edges[e].tolist()
+            chain = walk(a, b, e)
+            order += chain[:-1]   # son vertex başlangıca döner
+            ptr.append(len(order))
+            closed.append(True)
+    return np.array(order, dtype=np.int64), np.array(ptr, dtype=np.int64), np.array(closed, dtype=bool)
+
+
+class MeshTopology:
+    """Vertex -> edge and edge -> face adjacency in CSR form."""
+
+    def __init__(self, n_verts: int, edges, loop_edges, loop_faces, n_faces: int):
+        self.n_verts = int(n_verts)
+        self.n_faces = int(n_faces)
+        self.edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+        n_edges = len(self.edges)
+
+        eids = np.arange(n_edges, dtype=np.int32)
+        self.vert_indptr, self.vert_edges = _csr(self.edges.ravel(), np.repeat(eids, 2), self.n_verts)
+        self.edge_indptr, self.edge_faces = _csr(loop_edges, loop_faces, n_edges)
+        self._labels = None
+        self._adj = None
+        self._digest = None
+
+    @classmethod
+    def from_polygons(cls, n_verts: int, edges, loop_edges, loop_start, loop_total):
+        """Build from ``MeshPolygon.loop_start/loop_total`` style arrays."""
+        loop_total = np.asarray(loop_total, dtype=np.int64)
+        # Loop ranges in storage order -> owning polygon of every loop
+        order = np.argsort(np.asarray(loop_start, dtype=np.int64), kind="stable")
+        loop_faces = np.repeat(order.astype(np.int32), loop_total[order])
+        return cls(n_verts, edges, loop_edges, loop_faces, len(loop_total))
+
+    @classmethod
+    def from_faces(cls, n_verts: int, face_verts, face_sizes):
+        """Build from flat face-corner vertex indices + corner counts (OBJ/PLY style).
+
+        Edges are derived from the face boundaries and numbered in order of
+        first appearance, so files give stable edge indices.
+        """
+        face_verts = np.asarray(face_verts, dtype=np.int64)
+        face_sizes = np.asarray(face_sizes, dtype=np.int64)
+        start = np.cumsum(face_sizes) - face_sizes
+        nxt = np.arange(1, len(face_verts) + 1)
+        nxt[start + face_sizes - 1] = start
+        a, b = face_verts, face_verts[nxt]
+        key = np.minimum(a, b) * n_verts + np.maximum(a, b)
+        uniq, first, inv = np.unique(key, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind="stable")
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        edges = np.c_[uniq // n_verts, uniq % n_verts][order]
+        return cls.from_polygons(n_verts, edges, rank[inv.ravel()], start, face_sizes)
+
+    def find_edges(self, pairs) -> np.ndarray:
+        """Edge indices for (a, b) vertex pairs; -1 where no such edge exists."""
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        lo, hi = pairs.min(axis=1), pairs.max(axis=1)
+        e = self.edges.astype(np.int64)
+        ekey = np.minimum(e[:, 0], e[:, 1]) * self.n_verts + np.maximum(e[:, 0], e[:, 1])
+        order = np.argsort(ekey)
+        pos = np.searchsorted(ekey[order], lo * self.n_verts + hi)
+        pos = np.minimum(pos, len(order) - 1)
+        hit = ekey[order][pos] == lo * self.n_verts + hi
+        return np.where(hit, order[pos], -1)
+
+    def digest(self) -> bytes:
+        """Content hash of the edge table (vertex count included), computed once."""
+        if self._digest is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(np.int64(self.n_verts).tobytes())
+            h.update(np.ascontiguousarray(self.edges))
+            self._digest = h.digest()
+        return self._digest
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.edges)
+
+    def vert_edge_list(self, v: int) -> np.ndarray:
+        return self.vert_edges[self.vert_indptr[v]:self.vert_indptr[v + 1]]
+
+    def edge_face_list(self, e: int) -> np.ndarray:
+        return self.edge_faces[self.edge_indptr[e]:self.edge_indptr[e + 1]]
+
+    @property
+    def vert_adj(self) -> np.ndarray:
+        """Neighbour vertex for every entry of :attr:`vert_edges` (same CSR layout)."""
+        if self._adj is None:
+            owner = np.repeat(np.arange(self.n_verts, dtype=np.int64), np.diff(self.vert_indptr))
+            ends = self.edges[self.vert_edges]
+            self._adj = (ends[:, 0] + ends[:, 1] - owner).astype(np.int32)
+        return self._adj
+
+    def _expand(self, verts: np.ndarray):
+        """All (source vertex, neighbour) pairs for ``verts`` via the CSR arrays."""
+        start = self.vert_indptr[verts]
+        count = self.vert_indptr[verts + 1] - start
+        return np.repeat(np.arange(len(verts)), count), self.vert_adj[ranges(start, count)]
+
+    def adjacency(self, verts) -> tuple:
+        """Sparse adjacency rows of ``verts``: ``(row, neighbour)`` pairs, ``row`` = position in ``verts``."""
+        return self._expand(np.asarray(verts, dtype=np.int64))
+
+    def other_vert(self, e: int, v: int) -> int:
+        a, b = self.edges[e]
+        return int(b) if a == v else int(a)
+
+    # -----------------------------
+    # Islands
+    # -----------------------------
+    @property
+    def island_labels(self) -> np.ndarray:
+        """(n_verts,) connected-island label per vertex, computed once."""
+        if self._labels is None:
+            self._labels = connected_components(self.n_verts, self.edges)
+        return self._labels
+
+    def island_mask(self, verts) -> np.ndarray:
+        """Bool mask of every vertex sharing an island with any of ``verts``."""
+        labels = self.island_labels
+        hit = np.zeros(int(labels.max()) + 1 if len(labels) else 0, dtype=bool)
+        hit[labels[np.asarray(verts, dtype=np.int64)]] = True
+        return hit[labels]
+
+    # -----------------------------
+    # Edge loops
+    # -----------------------------
+    def _next_loop_edge(self, e: int, v: int) -> int:
+        """Edge continuing the loop ``e`` through vertex ``v``, or -1 to stop.
+
+        Interior edges continue straight across 4-valent manifold vertices
+        (the one edge sharing no face with ``e``). Boundary edges continue
+        along the boundary across 3-valent vertices. Poles, boundary hits,
+        wire and non-manifold edges end the loop.
+        """
+        ve = self.vert_edge_list(v)
+        fe = set(self.edge_face_list(e).tolist())
+        nf = len(fe)
+
+        if nf == 2:
+            if len(ve) != 4:
+                return -1
+            nxt = -1
+            for c in ve.tolist():
+                if c == e:
+                    continue
+                fc = self.edge_face_list(c).tolist()
+                if len(fc) != 2:
+                    return -1
+                if fe.isdisjoint(fc):
+                    if nxt >= 0:
+                        return -1
+                    nxt = c
+            return nxt
+
+        if nf == 1:
+            if len(ve) != 3:
+                return -1
+            cands = [c for c in ve.tolist() if c != e and len(self.edge_face_list(c)) == 1]
+            return cands[0] if len(cands) == 1 else -1
+
+        return -1
+
+    def walk_edge_loop(self, seed: int):
+        """Grow the edge loop through ``seed`` in both directions.
+
+        Returns ``(verts, edges, closed)``: ordered vertex and edge index
+        lists (``edges[i]`` joins ``verts[i]`` and ``verts[i + 1]``, wrapping
+        when closed).
+        """
+        seed = int(seed)
+        a, b = (int(x) for x in self.edges[seed])
+        seen = {seed}
+
+        def walk(e, v, stop_v):
+            vs, es = [], []
+            while True:
+                nxt = self._next_loop_edge(e, v)
+                if nxt < 0 or nxt in seen:
+                    return vs, es, False
+                seen.add(nxt)
+                es.append(nxt)
+                v = self.other_vert(nxt, v)
+                if v == stop_v:
+                    return vs, es, True
+                vs.append(v)
+                e = nxt
+
+        fwd_v, fwd_e, closed = walk(seed, b, a)
+        if closed:
+            return [a, b] + fwd_v, [seed] + fwd_e, True
+
+        back_v, back_e, _ = walk(seed, a, b)
+        verts = back_v[::-1] + [a, b] + fwd_v
+        edges = back_e[::-1] + [seed] + fwd_e
+        return verts, edges, False
+
+    def _order_chain(self, edge_ids):
+        """Order a connected edge set as a path/cycle; unordered if it branches."""
+        links = {}
+        for e in edge_ids:
+            a, b = (int(x) for x in self.edges[e])
+            links.setdefault(a, []).append(e)
+            links.setdefault(b, []).append(e)
+        if any(len(es) > 2 for es in links.values()):
+            return sorted(links), list(edge_ids), False
+
+        ends = [v for v, es in links.items() if len(es) == 1]
+        v = ends[0] if ends else next(iter(links))
+        verts, edges, used = [v], [], set()
+        while True:
+            nxt = [e for e in links[v] if e not in used]
+            if not nxt:
+                break
+            e = nxt[0]
+            used.add(e)
+            edges.append(e)
+            v = self.other_vert(e, v)
+            if v == verts[0]:
+                return verts, edges, True
+            verts.append(v)
+        return verts, edges, False
+
+    def selected_loops(self, edge_ids):
+        """Split a selected edge set into independent connected loops.
+
+        A piece made of a single edge is grown into its full loop with
+        :meth:`walk_edge_loop` (like selecting ONE edge); longer pieces are
+        taken as they are. Returns a list of ``(verts, edges, closed)``.
+        """
+        edge_ids = np.unique(np.asarray(edge_ids, dtype=np.int64))
+        if len(edge_ids) == 0:
+            return []
+        verts, inv = np.unique(self.edges[edge_ids], return_inverse=True)
+        labels = connected_components(len(verts), inv.reshape(-1, 2))
+        edge_label = labels[inv.reshape(-1, 2)[:, 0]]
+
+        order = np.argsort(edge_label, kind="stable")
+        cuts = np.flatnonzero(np.diff(edge_label[order])) + 1
+        loops = []
+        for es in np.split(edge_ids[order], cuts):
+            es = es.tolist()
+            if len(es) == 1:
+                loops.append(self.walk_edge_loop(es[0]))
+            else:
+                loops.append(self._order_chain(es))
+        return loops
+
+    # -----------------------------
+    # Geodesic (edge-path) distance
+    # -----------------------------
+    def geodesic_distance(self, co, sources, radius: float) -> np.ndarray:
+        """Multi-source shortest edge-path distance, bounded by ``radius``.
+
+        Label-correcting expansion over the CSR adjacency: each round
+        relaxes only the vertices improved in the previous one, and
+        nothing at or beyond ``radius`` is ever enqueued. Yields the same
+        distances as a bounded Dijkstra; vertices not reached are ``inf``.
+        """
+        co = np.asarray(co)
+        dist = np.full(self.n_verts, np.inf)
+        frontier = np.unique(np.asarray(sources, dtype=np.int64))
+        dist[frontier] = 0.0
+        while len(frontier):
+            u, w = self._expand(frontier)
+            u = frontier[u]
+            cand = dist[u] + _edge_len(co, u, w)
+            ok = (cand < radius) & (cand < dist[w])
+            w, cand = w[ok], cand[ok]
+            if len(w) == 0:
+                break
+            np.minimum.at(dist, w, cand)
+            frontier = np.unique(w[cand == dist[w]]).astype(np.int64)
+        return dist
+
+    def geodesic_knn(self, co, sources, radius: float, k: int):
+        """K nearest ``sources`` by edge-path distance for every vertex within ``radius``.
+
+        ``sources`` are vertex indices; source ``j`` is reported as column
+        ``j``. Returns flat ``(rows, cols, dist)`` sorted by vertex then
+        distance, at most ``k`` per vertex, all with ``dist < radius`` (the
+        same layout as ``spatial.LoopIndex.iter_query``).
+        """
+        co = np.asarray(co)
+        sources = np.asarray(sources, dtype=np.int64)
+        k = max(1, int(k))
+
+        # Region = everything the single-label expansion reaches; K labels live only there.
+        region = np.flatnonzero(self.geodesic_distance(co, sources, radius) < radius)
+        local = np.full(self.n_verts, -1, dtype=np.int32)
+        local[region] = np.arange(len(region))
+        D = np.full((len(region), k), np.inf)
+        S = np.full((len(region), k), -1, dtype=np.int64)
+
+        fv = local[sources]
+        fs = np.arange(len(sources), dtype=np.int64)
+        fd = np.zeros(len(sources))
+        D[fv, 0] = 0.0
+        S[fv, 0] = fs
+
+        while len(fv):
+            # Relax every frontier label across its edges
+            i, wg = self._expand(region[fv])
+            ug = region[fv[i]]
+            cand = fd[i] + _edge_len(co, ug, wg)
+            wl = local[wg]
+            ok = wl >= 0
+            ok[ok] &= cand[ok] < np.minimum(radius, D[wl[ok], k - 1])
+            if not ok.any():
+                break
+            nr, ns, nd = wl[ok], fs[i[ok]], cand[ok]
+
+            # Merge with the current labels of the touched vertices (old first on ties)
+            rows_t = np.unique(nr)
+            orow = np.repeat(rows_t, k)
+            os_, od = S[rows_t].ravel(), D[rows_t].ravel()
+            keep = os_ >= 0
+            r = np.concatenate((orow[keep], nr))
+            s = np.concatenate((os_[keep], ns))
+            d = np.concatenate((od[keep], nd))
+            is_new = np.r_[np.zeros(int(keep.sum()), dtype=bool), np.ones(len(nr), dtype=bool)]
+
+            # Best distance per (vertex, source)
+            o = np.argsort(d, kind="stable")
+            o = o[np.argsort(r[o] * len(sources) + s[o], kind="stable")]
+            r, s, d, is_new = r[o], s[o], d[o], is_new[o]
+            first = np.r_[True, (r[1:] != r[:-1]) | (s[1:] != s[:-1])]
+            r, s, d, is_new = r[first], s[first], d[first], is_new[first]
+
+            # K nearest sources per vertex
+            o = np.argsort(d, kind="stable")
+            o = o[np.argsort(r[o], kind="stable")]
+            r, s, d, is_new = r[o], s[o], d[o], is_new[o]
+            starts = np.flatnonzero(np.r_[True, r[1:] != r[:-1]])
+            rank = np.arange(len(r)) - np.repeat(starts, np.diff(np.r_[starts, len(r)]))
+            top = rank < k
+            r, s, d, is_new, rank = r[top], s[top], d[top], is_new[top], rank[top]
+
+            D[rows_t] = np.inf
+            S[rows_t] = -1
+            D[r, rank] = d
+            S[r, rank] = s
+            fv, fs, fd = r[is_new], s[is_new], d[is_new]
+
+        hit = S >= 0
+        rows = np.repeat(region, hit.sum(axis=1))
+        return rows, S[hit].astype(np.int32), D[hit]
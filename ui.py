@@ -1,5 +1,5 @@
 import bpy
-from . import updater
+from . import ops
 
 
 class VIEW3D_PT_edge_straighten(bpy.types.Panel):
@@ -12,11 +12,14 @@ class VIEW3D_PT_edge_straighten(bpy.types.Panel):
         layout = self.layout
 
         # Updater bildirimi (istersen bu satırı yorum satırı yapabilirsin)
+        # (updater ilk çizimde yüklenir; background oturumlarda hiç yüklenmez)
+        from . import updater
         updater.draw_notice(layout)
 
         col = layout.column(align=True)
-        col.label(text="Edit Mode • ONE edge/LOOP selected")
+        col.label(text="Edit Mode • ONE edge/LOOP (or several loops) selected")
         col.operator("mesh.estraighten_loop", text="Straighten Loop & Propagate")
+        col.operator("mesh.estraighten_loop_live", text="Live Straighten (Drag/Wheel)")
 
         box = layout.box()
         box.prop(ctx.scene, "esp_axis")
@@ -24,6 +27,10 @@ class VIEW3D_PT_edge_straighten(bpy.types.Panel):
         box.prop(ctx.scene, "esp_radius")            # 0 = Auto
         box.prop(ctx.scene, "esp_strength")
         box.prop(ctx.scene, "esp_smooth")
+        box.prop(ctx.scene, "esp_falloff_metric")
+        row = box.row()
+        row.active = ctx.scene.esp_falloff_metric == 'EUCLIDEAN'
+        row.prop(ctx.scene, "esp_interpolation")
         box.prop(ctx.scene, "esp_knearest")
         box.prop(ctx.scene, "esp_only_same_island")
         box.prop(ctx.scene, "esp_keep_y_when_y_axis")
@@ -31,6 +38,16 @@ class VIEW3D_PT_edge_straighten(bpy.types.Panel):
         row = box.row(align=True)
         row.active = ctx.scene.esp_use_vgroup
         row.prop_search(ctx.scene, "esp_vgroup_name", ctx.object, "vertex_groups", text="VGroup")
+        box.prop(ctx.scene, "esp_relax")
+        col = box.column(align=True)
+        col.active = ctx.scene.esp_relax != 'NONE'
+        col.prop(ctx.scene, "esp_relax_iterations")
+        col.prop(ctx.scene, "esp_relax_factor")
+        box.prop(ctx.scene, "esp_output")
+        row = box.row()
+        row.active = ctx.scene.esp_output != 'MESH'
+        row.prop(ctx.scene, "esp_output_name")
+        box.prop(ctx.scene, "esp_engine")
 
         op = layout.operator("mesh.estraighten_loop", text="Run with Scene Settings")
         op.axis = ctx.scene.esp_axis
@@ -38,22 +55,92 @@ class VIEW3D_PT_edge_straighten(bpy.types.Panel):
         op.radius = ctx.scene.esp_radius
         op.strength = ctx.scene.esp_strength
         op.smooth = ctx.scene.esp_smooth
+        op.falloff_metric = ctx.scene.esp_falloff_metric
+        op.interpolation = ctx.scene.esp_interpolation
         op.k_nearest = ctx.scene.esp_knearest
         op.only_same_island = ctx.scene.esp_only_same_island
         op.keep_Y_when_Y_axis = ctx.scene.esp_keep_y_when_y_axis
         op.use_vgroup = ctx.scene.esp_use_vgroup
         op.vgroup_name = ctx.scene.esp_vgroup_name
+        op.relax = ctx.scene.esp_relax
+        op.relax_iterations = ctx.scene.esp_relax_iterations
+        op.relax_factor = ctx.scene.esp_relax_factor
+        op.output = ctx.scene.esp_output
+        op.output_name = ctx.scene.esp_output_name
+        op.engine = ctx.scene.esp_engine
+
+        # Son çalıştırmaların faz süreleri (aktif obje)
+        row = layout.row()
+        row.prop(ctx.scene, "esp_show_timings", emboss=False,
+                 icon='TRIA_DOWN' if ctx.scene.esp_show_timings else 'TRIA_RIGHT')
+        if ctx.scene.esp_show_timings and ctx.object is not None:
+            ops.draw_timings(layout, ctx.object.name)
 
 
 class ADDON_PREFERENCES_edge_straighten(bpy.types.AddonPreferences):
-    """Basit tercih alanı (güncelleme butonu)."""
+    """Basit tercih alanı (güncelleme butonu + tanılama)."""
     bl_idname = __package__
     auto_check = bpy.props.BoolProperty(name="Auto check updates", default=True)
+    worker_threads = bpy.props.IntProperty(
+        name="Worker Threads",
+        description="Threads for neighbour queries and delta blending on large meshes "
+                    "(0 = all cores, 1 = single-threaded; results are identical)",
+        default=0,
+        min=0,
+        max=256,
+    )
+    disk_cache = bpy.props.BoolProperty(
+        name="Disk Cache",
+        description="Keep influence weights on disk between sessions; re-running the same setup on the same "
+                    "mesh skips the neighbour queries (Live Straighten does not write to it)",
+        default=False,
+    )
+    disk_cache_dir = bpy.props.StringProperty(
+        name="Cache Folder",
+        description="Where cached weights are stored (empty = .cache_influence inside the add-on folder)",
+        default="",
+        subtype='DIR_PATH',
+    )
+    disk_cache_size_mb = bpy.props.IntProperty(
+        name="Cache Size (MB)",
+        description="Least recently used entries are removed above this size",
+        default=1024,
+        min=16,
+        max=1 << 20,
+    )
+    profile_runs = bpy.props.BoolProperty(
+        name="Profile Runs (cProfile)",
+        description="Run the operator under cProfile and dump the last run's stats to a .prof file",
+        default=False,
+    )
+    profile_dir = bpy.props.StringProperty(
+        name="Profile Folder",
+        description="Where .prof files are written (empty = system temp folder)",
+        default="",
+        subtype='DIR_PATH',
+    )
 
     def draw(self, ctx):
         layout = self.layout
+        from . import updater
         updater.draw_prefs(layout, self)
 
+        box = layout.box()
+        box.label(text="Performance", icon='MEMORY')
+        box.prop(self, "worker_threads")
+        box.prop(self, "disk_cache")
+        col = box.column()
+        col.active = self.disk_cache
+        col.prop(self, "disk_cache_dir")
+        col.prop(self, "disk_cache_size_mb")
+
+        box = layout.box()
+        box.label(text="Diagnostics", icon='TIME')
+        box.prop(self, "profile_runs")
+        row = box.row()
+        row.active = self.profile_runs
+        row.prop(self, "profile_dir")
+
 
 CLASSES = (VIEW3D_PT_edge_straighten, ADDON_PREFERENCES_edge_straighten)
 
@@ -80,8 +167,18 @@ def register():
     bpy.types.Scene.esp_smooth = bpy.props.BoolProperty(
         default=True, name="Smooth Falloff"
     )
+    bpy.types.Scene.esp_falloff_metric = bpy.props.EnumProperty(
+        items=[("EUCLIDEAN", "Euclidean", ""), ("GEODESIC", "Geodesic", "")],
+        default="EUCLIDEAN",
+        name="Falloff Metric",
+    )
+    bpy.types.Scene.esp_interpolation = bpy.props.EnumProperty(
+        items=[("NEAREST", "K Nearest", ""), ("POLYLINE", "Polyline", "")],
+        default="NEAREST",
+        name="Interpolation",
+    )
     bpy.types.Scene.esp_knearest = bpy.props.IntProperty(
-        default=5, min=1, max=12, name="Nearest (KD)"
+        default=5, min=1, max=128, name="Nearest (KD)"
     )
     bpy.types.Scene.esp_only_same_island = bpy.props.BoolProperty(
         default=True, name="Only Same Island"
@@ -95,6 +192,33 @@ def register():
     bpy.types.Scene.esp_vgroup_name = bpy.props.StringProperty(
         default="", name="Vertex Group"
     )
+    bpy.types.Scene.esp_relax = bpy.props.EnumProperty(
+        items=[("NONE", "None", ""), ("LAPLACIAN", "Laplacian", ""), ("TAUBIN", "Taubin", "")],
+        default="NONE",
+        name="Relax",
+    )
+    bpy.types.Scene.esp_relax_iterations = bpy.props.IntProperty(
+        default=3, min=1, max=100, name="Relax Iterations"
+    )
+    bpy.types.Scene.esp_relax_factor = bpy.props.FloatProperty(
+        default=0.5, min=0.0, max=1.0, name="Relax Factor"
+    )
+    bpy.types.Scene.esp_output = bpy.props.EnumProperty(
+        items=[("MESH", "Mesh", ""), ("SHAPE_KEY", "Shape Key", ""), ("ATTRIBUTE", "Attribute", "")],
+        default="MESH",
+        name="Output",
+    )
+    bpy.types.Scene.esp_output_name = bpy.props.StringProperty(
+        default="Straighten", name="Output Name"
+    )
+    bpy.types.Scene.esp_engine = bpy.props.EnumProperty(
+        items=[("NUMPY", "NumPy", ""), ("BMESH", "BMesh", "")],
+        default="NUMPY",
+        name="Engine",
+    )
+    bpy.types.Scene.esp_show_timings = bpy.props.BoolProperty(
+        default=False, name="Timings"
+    )
 
 
 def unregister():
@@ -104,11 +228,20 @@ def unregister():
     del bpy.types.Scene.esp_radius
     del bpy.types.Scene.esp_strength
     del bpy.types.Scene.esp_smooth
+    del bpy.types.Scene.esp_falloff_metric
+    del bpy.types.Scene.esp_interpolation
     del bpy.types.Scene.esp_knearest
     del bpy.types.Scene.esp_only_same_island
     del bpy.types.Scene.esp_keep_y_when_y_axis
     del bpy.types.Scene.esp_use_vgroup
     del bpy.types.Scene.esp_vgroup_name
+    del bpy.types.Scene.esp_relax
+    del bpy.types.Scene.esp_relax_iterations
+    del bpy.types.Scene.esp_relax_factor
+    del bpy.types.Scene.esp_output
+    del bpy.types.Scene.esp_output_name
+    del bpy.types.Scene.esp_engine
+    del bpy.types.Scene.esp_show_timings
 
     for c in reversed(CLASSES):
         bpy.utils.unregister_class(c)
@@ -1,9 +1,11 @@
-import bpy, urllib.request, json, tempfile, os, ssl, time
+import bpy, os
+
+# Hafif tutulur: ağ modülleri (remote -> urllib/ssl), SSL context ve cache klasörü
+# ilk kullanımda kurulur (_checker); background oturumlarda updater hiç yüklenmez.
 
 # --- Cache settings ---
 THIS_DIR = os.path.dirname(__file__)
 CACHE_DIR = os.path.join(THIS_DIR, ".cache_updater")
-os.makedirs(CACHE_DIR, exist_ok=True)
 CACHE_MANIFEST = os.path.join(CACHE_DIR, "manifest.json")
 # Zip cache path template
 ZIP_CACHE_TPL = os.path.join(CACHE_DIR, "edge_straighten_pro_v{ver}.zip")
@@ -18,11 +20,29 @@ BRANCH = "main"
 MANIFEST_URL = f"https://raw.githubusercontent.com/{OWNER}/{REPO}/{BRANCH}/update_manifest.json"
 ZIP_URL      = "https://github.com/{OWNER}/{REPO}/releases/download/v{ver}/edge_straighten_pro_v{ver}.zip".format
 
-# GitHub bazı ortamlarda User-Agent isteyebiliyor; SSL context de ekleyelim:
-_CTX = ssl.create_default_context()
-_HEADERS = {"User-Agent": "EdgeStraightenPro-Updater/1.0"}
+POLL_INTERVAL = 0.25  # seconds between bpy.app.timers polls while a check runs
+_check = None
+_local_version = None
+
+def _checker():
+    """remote.ManifestCheck, built on first use (network imports + cache dir + one cache read)."""
+    global _check
+    if _check is None:
+        from . import remote
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Manifest kontrolü worker thread'de; sonuç bellekte (draw_notice diske/ağa dokunmaz)
+        _check = remote.ManifestCheck(MANIFEST_URL, CACHE_MANIFEST, MANIFEST_TTL)
+        _check.load_cached()
+    return _check
 
 def _get_local_version():
+    """bl_info version of the installed add-on, resolved once per session."""
+    global _local_version
+    if _local_version is None:
+        _local_version = _read_local_version()
+    return _local_version
+
+def _read_local_version():
     try:
         pkg = __package__ if isinstance(__package__, str) and __package__ else None
         if not pkg:
@@ -71,108 +91,135 @@ def _tuple(v): return tuple(v) if isinstance(v,(list,tuple)) else (0,0,0)
 def _newer(a,b): return a > b
 
 def fetch_remote():
-    # Use cached manifest if recent enough
-    try:
-        if os.path.exists(CACHE_MANIFEST):
-            mtime = os.path.getmtime(CACHE_MANIFEST)
-            if time.time() - mtime < MANIFEST_TTL:
-                with open(CACHE_MANIFEST, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                return _tuple(data.get("version", (0, 0, 0))), data.get("notes", "")
-
-        # Otherwise fetch from network and cache
-        req = urllib.request.Request(MANIFEST_URL, headers=_HEADERS)
-        with urllib.request.urlopen(req, timeout=10, context=_CTX) as r:
-            raw = r.read().decode("utf-8")
-            data = json.loads(raw)
-
-        # write cache safely
-        try:
-            with open(CACHE_MANIFEST, "w", encoding="utf-8") as f:
-                json.dump(data, f)
-        except Exception:
-            pass
+    """Blocking manifest fetch (TTL cache + conditional request) -> (version_tuple, notes) or (None, msg).
 
-        return _tuple(data.get("version", (0, 0, 0))), data.get("notes", "")
-    except Exception as e:
+    For scripts; the UI uses :func:`check_async` instead. Updates the same
+    check state the panel reads.
+    """
+    st = _checker().refresh()
+    if st.remote:
         # If network failed but cache exists, fall back to it
-        if os.path.exists(CACHE_MANIFEST):
-            try:
-                with open(CACHE_MANIFEST, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                return _tuple(data.get("version", (0, 0, 0))), data.get("notes", "(cached)")
-            except Exception:
-                pass
-        return None, f"{type(e).__name__}: {e}"
+        return st.remote, st.notes or ("(cached)" if st.error else "")
+    return None, st.error or "No update info"
 
 
 def read_cached_manifest():
-    """Read manifest from local cache only (no network). Returns (version_tuple, notes) or (None, msg)."""
-    try:
-        if os.path.exists(CACHE_MANIFEST):
-            with open(CACHE_MANIFEST, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return _tuple(data.get("version", (0, 0, 0))), data.get("notes", "")
-        return None, "No cached manifest"
-    except Exception as e:
-        return None, f"Cache read error: {type(e).__name__}"
+    """Last known manifest from memory (no disk, no network). Returns (version_tuple, notes) or (None, msg)."""
+    st = _checker().state
+    if st.remote:
+        return st.remote, st.notes
+    return None, st.error or "No cached manifest"
 
-def install_latest():
-    remote, msg = fetch_remote()
-    if not remote:
-        return f"Cannot fetch remote manifest. {msg}"
-    local = _get_local_version()
-    if not _newer(remote, local):
-        return "Already up to date."
 
-    ver = ".".join(map(str, remote))
-    url = ZIP_URL(ver=ver)
+# ---- Background check ----
+def check_async(force=False):
+    """Start a manifest check on a worker thread; a timer repaints the UI when it lands."""
+    if _checker().start(force=force) and not bpy.app.timers.is_registered(_poll_check):
+        bpy.app.timers.register(_poll_check, first_interval=POLL_INTERVAL)
 
-    # Prefer cached zip if available to avoid re-downloading
-    cached_zip = ZIP_CACHE_TPL.format(ver=ver)
-    if os.path.exists(cached_zip):
-        zip_path = cached_zip
-    else:
-        # download to cache
-        zip_path = cached_zip
-        try:
-            req = urllib.request.Request(url, headers=_HEADERS)
-            with urllib.request.urlopen(req, timeout=30, context=_CTX) as r, open(zip_path, "wb") as f:
-                f.write(r.read())
-        except Exception as e:
-            return f"Download failed: {e}"
+def _poll_check():
+    if _checker().busy:
+        return POLL_INTERVAL
+    # Sonuç geldi: N-panel ve Preferences yeniden çizilsin
+    wm = getattr(bpy.context, "window_manager", None)
+    for win in (wm.windows if wm else ()):
+        for area in win.screen.areas:
+            if area.type in {'VIEW_3D', 'PREFERENCES'}:
+                area.tag_redraw()
+    return None
+
+def _auto_check():
+    addon = bpy.context.preferences.addons.get(__package__)
+    if addon is not None and addon.preferences.auto_check:
+        check_async()
+    return None
+
+def _release():
+    """(version string, zip url, cache path, sha256) of a newer release, or an error/status string."""
+    if _checker().busy:
+        return "Update check still running, try again in a moment."
+    latest, msg = read_cached_manifest()
+    if not latest:
+        return f"No update info yet: {msg}. Use Check for Updates first."
+    if not _newer(latest, _get_local_version()):
+        return "Already up to date."
+    ver = ".".join(map(str, latest))
+    sha256 = _checker().state.sha256
+    if not sha256:
+        # Hash'siz bir zip ne doğrulanabilir ne de önbelleğe güvenle alınabilir
+        return f"Release v{ver} has no sha256 in the update manifest; not installing an unverified download."
+    return ver, ZIP_URL(ver=ver), ZIP_CACHE_TPL.format(ver=ver), sha256
+
+def _cached_zip_ok(zip_path, sha256):
+    from . import remote
+    # Önbellekteki zip yalnızca doğrulanmış indirmeden (atomik rename) gelir; yine de hash kontrolü
+    if not os.path.exists(zip_path):
+        return False
+    if remote.sha256_file(zip_path) != sha256:
+        os.remove(zip_path)
+        return False
+    return True
 
+def _install_zip(zip_path, ver, source):
+    from . import remote
+    remote.prune(CACHE_DIR, "edge_straighten_pro_v", keep=zip_path)
     try:
         bpy.ops.preferences.addon_install(filepath=zip_path, overwrite=True)
         bpy.ops.preferences.addon_enable(module=__package__)
-        return f"Updated to v{ver} (installed from {'cache' if os.path.exists(cached_zip) else 'download'})"
+        return f"Updated to v{ver} (installed from {source})"
     except Exception as e:
         return f"Install failed: {e}"
 
+def install_latest():
+    """Blocking manifest check + download + install (for scripts); the UI uses the modal operator below."""
+    # Script yolu: durum boş ya da TTL geçmişse manifest burada (senkron) yenilenir
+    _checker().refresh()
+    rel = _release()
+    if isinstance(rel, str):
+        return rel
+    ver, url, zip_path, sha256 = rel
+    source = "cache"
+    if not _cached_zip_ok(zip_path, sha256):
+        from . import remote
+        try:
+            remote.download(url, zip_path, sha256)
+        except Exception as e:
+            return f"Download failed: {e}"
+        source = "download"
+    return _install_zip(zip_path, ver, source)
+
 # ---- UI helpers ----
 def draw_notice(layout):
-    # IMPORTANT: avoid network calls inside draw() — use cached manifest only.
+    # IMPORTANT: avoid network/disk inside draw() — in-memory check state only.
     try:
-        remote, msg = read_cached_manifest()
+        st = _checker().state
+        latest, msg = read_cached_manifest()
         local = _get_local_version()
 
-        if remote and _newer(remote, local):
+        if st.checking:
+            layout.label(text="Checking for updates...", icon="TIME")
+
+        if latest and _newer(latest, local):
             row = layout.row(); row.alert = True
-            row.label(text=f"Update available (v{'.'.join(map(str,remote))})", icon="IMPORT")
+            row.label(text=f"Update available (v{'.'.join(map(str,latest))})", icon="IMPORT")
             row.operator("wm.estraighten_update", text="Install")
             # allow user to see release notes briefly
             if msg:
                 layout.label(text=str(msg))
             return
 
-        # No cached newer version found — show status and a manual check button
-        if remote:
-            layout.label(text="Up to date (cached)", icon="CHECKMARK")
-        else:
+        # No newer version known — show status and a manual check button
+        if latest:
+            layout.label(text="Up to date" + (" (cached)" if st.source == "cache" else ""), icon="CHECKMARK")
+        elif not st.checking:
             layout.label(text=msg or "No cached update info", icon="INFO")
+        if st.error and latest:
+            layout.label(text=f"Last check failed: {st.error}", icon="ERROR")
 
-        # Manual 'check now' button: this runs the network-fetching operator.
-        layout.operator("wm.estraighten_update", text="Check & Install Latest")
+        # Manual 'check now' button: background check, the panel updates when it lands
+        row = layout.row()
+        row.enabled = not st.checking
+        row.operator("wm.estraighten_check_update", text="Check for Updates")
     except Exception:
         # Keep UI safe — do nothing if anything goes wrong
         try:
@@ -180,15 +227,77 @@ def draw_notice(layout):
         except Exception:
             pass
 
+def draw_prefs(layout, prefs):
+    """Add-on preferences: auto-check toggle + cached status / install button."""
+    layout.prop(prefs, "auto_check")
+    draw_notice(layout)
+
 class WM_OT_estraighten_update(bpy.types.Operator):
+    """Download (in the background, resumable, SHA-256 verified) and install the latest release"""
     bl_idname = "wm.estraighten_update"
     bl_label = "Install Latest Edge Straighten Pro"
     bl_options = {'INTERNAL'}
+
     def execute(self, ctx):
-        self.report({'INFO'}, install_latest())
+        rel = _release()
+        if isinstance(rel, str):
+            self.report({'INFO'}, rel)
+            return {'FINISHED'}
+        self._ver, url, self._zip, sha256 = rel
+        if _cached_zip_ok(self._zip, sha256):
+            self.report({'INFO'}, _install_zip(self._zip, self._ver, "cache"))
+            return {'FINISHED'}
+
+        # İndirme worker thread'de; modal timer ilerlemeyi gösterir, kurulum ana thread'de
+        from . import remote
+        self._job = remote.DownloadJob(url, self._zip, sha256).start()
+        wm = ctx.window_manager
+        self._timer = wm.event_timer_add(POLL_INTERVAL, window=ctx.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, ctx, event):
+        if event.type == 'ESC':
+            self._job.cancel()
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        job = self._job
+        if not job.finished:
+            size = f"{job.done / 1e6:.1f}" + (f" / {job.total / 1e6:.1f} MB" if job.total else " MB")
+            pct = f"{job.fraction * 100.0:.0f}%  " if job.total else ""
+            ctx.workspace.status_text_set(f"Downloading v{self._ver}: {pct}{size}  (Esc: cancel, resumes later)")
+            return {'RUNNING_MODAL'}
+
+        ctx.window_manager.event_timer_remove(self._timer)
+        ctx.workspace.status_text_set(None)
+        if job.error:
+            self.report({'ERROR'}, f"Download failed: {job.error}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, _install_zip(self._zip, self._ver, "download"))
         return {'FINISHED'}
 
-def register(): bpy.utils.register_class(WM_OT_estraighten_update)
+class WM_OT_estraighten_check_update(bpy.types.Operator):
+    """Fetch the update manifest in the background (the UI stays responsive)"""
+    bl_idname = "wm.estraighten_check_update"
+    bl_label = "Check for Updates"
+    bl_options = {'INTERNAL'}
+    def execute(self, ctx):
+        check_async(force=True)
+        return {'FINISHED'}
+
+CLASSES = (WM_OT_estraighten_update, WM_OT_estraighten_check_update)
+
+def register():
+    for c in CLASSES:
+        bpy.utils.register_class(c)
+    # Otomatik kontrol: açılıştan hemen sonra, arka planda (prefs timer içinde okunur)
+    bpy.app.timers.register(_auto_check, first_interval=1.0)
+
 def unregister():
-    try: bpy.utils.unregister_class(WM_OT_estraighten_update)
-    except Exception: pass
+    if bpy.app.timers.is_registered(_auto_check):
+        bpy.app.timers.unregister(_auto_check)
+    if bpy.app.timers.is_registered(_poll_check):
+        bpy.app.timers.unregister(_poll_check)
+    for c in reversed(CLASSES):
+        try: bpy.utils.unregister_class(c)
+        except Exception: pass